@@ -1,10 +1,78 @@
 import os
+import gzip
 import json
 import click
+import numpy
 import pathlib
+import warnings
+from numpy.typing import NDArray
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from concurrent.futures import ProcessPoolExecutor
 # from __future__ import annotations
 from matplotlib import pyplot as plot
 
+FIGURE_SIZE: Tuple[float, float] = (10, 6)
+FIGURE_DPI: int = 100
+# One point per horizontal pixel of the figure is all a line chart can show.
+PIXEL_BUDGET: int = int(FIGURE_SIZE[0] * FIGURE_DPI)
+# Above this many clients, per-client lines turn into percentile bands.
+BAND_THRESHOLD: int = 10
+MARKER_LIMIT: int = 50
+
+
+class HistoryColumns(NamedTuple):
+    rounds: NDArray[numpy.int64]
+    weight_norm: NDArray[numpy.float64]
+    clients: Tuple[str, ...]
+    # rounds x clients, NaN where a client did not report.
+    accuracy: NDArray[numpy.float64]
+
+
+def load_columns(plot_data: Dict[str, Any]) -> HistoryColumns:
+    # One pass over the history; clients are columns in order of first appearance.
+    history: List[Dict[str, Any]] = plot_data["history"]
+    column_of: Dict[str, int] = {}
+    rows: List[int] = []
+    columns: List[int] = []
+    values: List[float] = []
+    for row, entry in enumerate(history):
+        for client, metric in (entry.get("accuracy") or {}).items():
+            rows.append(row)
+            columns.append(column_of.setdefault(client, len(column_of)))
+            values.append(metric["accuracy"])
+
+    accuracy: NDArray[numpy.float64] = numpy.full((len(history), len(column_of)), numpy.nan)
+    accuracy[rows, columns] = values
+    clients: List[str] = sorted(column_of)
+    return HistoryColumns(
+        rounds=numpy.fromiter((entry["round"] for entry in history), dtype=numpy.int64, count=len(history)),
+        weight_norm=numpy.fromiter((entry.get("weight_norm", numpy.nan) for entry in history), dtype=numpy.float64, count=len(history)),
+        clients=tuple(clients),
+        accuracy=accuracy[:, [column_of[client] for client in clients]]
+    )
+
+
+def downsample(
+    x: NDArray,
+    values: NDArray[numpy.float64],
+    budget: int = PIXEL_BUDGET
+) -> Tuple[NDArray[numpy.float64], NDArray[numpy.float64]]:
+    # Averages consecutive points into `budget` bins, ignoring NaN; values may be 2-D (points x series).
+    if len(x) <= budget:
+        return numpy.asarray(x, dtype=numpy.float64), values
+    starts: NDArray[numpy.int64] = numpy.linspace(0, len(x), budget, endpoint=False).astype(numpy.int64)
+    present: NDArray[numpy.bool_] = ~numpy.isnan(values)
+    totals = numpy.add.reduceat(numpy.where(present, values, 0.0), starts, axis=0)
+    counts = numpy.add.reduceat(present, starts, axis=0)
+    sizes: NDArray[numpy.int64] = numpy.diff(numpy.append(starts, len(x)))
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        means = totals / counts
+    return numpy.add.reduceat(numpy.asarray(x, dtype=numpy.float64), starts) / sizes, means
+
+
+def _marker(points: int) -> str | None:
+    return "o" if points <= MARKER_LIMIT else None
+
 
 def _save_chart(dir_path: pathlib.Path):
     dir_path.parent.mkdir(
@@ -13,53 +81,56 @@ def _save_chart(dir_path: pathlib.Path):
     )
 
     plot.tight_layout()
-    plot.savefig(dir_path.as_posix())
+    plot.savefig(dir_path.as_posix(), dpi=FIGURE_DPI)
     plot.close()
 
 
+def _as_columns(plot_data: Dict[str, Any] | HistoryColumns) -> HistoryColumns:
+    return plot_data if isinstance(plot_data, HistoryColumns) else load_columns(plot_data)
+
+
 def plot_accuracy(
-    plot_data: dict,
+    plot_data: Dict[str, Any] | HistoryColumns,
     dir: pathlib.Path,
     prefix: str
 ) -> pathlib.Path:
-    rounds = [
-        history["round"] for history in plot_data["history"]
-    ]
-    clients = sorted(
-        tuple(plot_data["history"][0]["accuracy"].keys())
-    )
-    print(f"CLIENT = {clients}")
-    accuracy_per_client = {
-        client: [
-            history["accuracy"][client]["accuracy"]
-            for history in plot_data["history"]
-        ] for client in clients
-    }
-    average_accuracy = [
-        sum(
-            history["accuracy"][client]["accuracy"] for client in clients
-        ) / len(clients) for history in plot_data["history"]
-    ]
-
-    plot.figure(figsize=(10, 6))
-
-    for client in clients:
-        plot.plot(
-            rounds,
-            accuracy_per_client[client],
-            marker="o",
-            label=client
-        )
-
+    columns: HistoryColumns = _as_columns(plot_data)
+    with warnings.catch_warnings():
+        # Rounds in which nobody reported have no mean or percentiles.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        average_accuracy = numpy.nanmean(columns.accuracy, axis=1) if columns.clients else numpy.full(len(columns.rounds), numpy.nan)
+        banded: bool = len(columns.clients) > BAND_THRESHOLD
+        if banded:
+            percentiles = numpy.nanpercentile(columns.accuracy, [10, 25, 50, 75, 90], axis=1).T
+
+    plot.figure(figsize=FIGURE_SIZE)
+    if banded:
+        rounds, bands = downsample(columns.rounds, percentiles)
+        plot.fill_between(rounds, bands[:, 0], bands[:, 4], color="C0", alpha=0.15, label="p10-p90")
+        plot.fill_between(rounds, bands[:, 1], bands[:, 3], color="C0", alpha=0.3, label="p25-p75")
+        plot.plot(rounds, bands[:, 2], color="C0", label="Median")
+        title: str = f"Client Accuracy per Round ({len(columns.clients)} clients)"
+    else:
+        rounds, per_client = downsample(columns.rounds, columns.accuracy)
+        for index, client in enumerate(columns.clients):
+            plot.plot(
+                rounds,
+                per_client[:, index],
+                marker=_marker(len(rounds)),
+                label=client
+            )
+        title = "Client Accuracies per Round"
+
+    rounds, average = downsample(columns.rounds, average_accuracy)
     plot.plot(
         rounds,
-        average_accuracy,
-        marker="o",
+        average,
+        marker=_marker(len(rounds)),
         linestyle="--",
         label="Average"
     )
 
-    plot.title("Client Accuracies per Round")
+    plot.title(title)
     plot.xlabel("Round")
     plot.ylabel("Accuracy")
     plot.grid(True, linestyle="--", alpha=0.5)
@@ -70,23 +141,18 @@ def plot_accuracy(
 
 
 def plot_weight_normalization(
-    plot_data: dict,
+    plot_data: Dict[str, Any] | HistoryColumns,
     dir: pathlib.Path,
     prefix: str
 ) -> pathlib.Path:
-    rounds = [
-        history["round"] for history in plot_data["history"]
-    ]
+    columns: HistoryColumns = _as_columns(plot_data)
+    rounds, weight_normalization = downsample(columns.rounds, columns.weight_norm)
 
-    weight_normalization = [
-        history["weight_norm"] for history in plot_data["history"]
-    ]
-
-    plot.figure(figsize=(10, 6))
+    plot.figure(figsize=FIGURE_SIZE)
     plot.plot(
         rounds,
         weight_normalization,
-        marker="o"
+        marker=_marker(len(rounds))
     )
     plot.title("Global Weight Normalization Update Over Rounds")
     plot.xlabel("Round")
@@ -98,13 +164,23 @@ def plot_weight_normalization(
 
 
 def plot_final_weight(
-    plot_data: dict,
+    plot_data: Dict[str, Any],
     dir: pathlib.Path,
     prefix: str
 ) -> pathlib.Path:
-    weights = list(plot_data["training_weights"])
-    plot.figure(figsize=(10, 6))
-    plot.bar(range(len(weights)), weights)
+    weights: NDArray[numpy.float64] = numpy.asarray(plot_data["training_weights"], dtype=numpy.float64)
+    plot.figure(figsize=FIGURE_SIZE)
+    if len(weights) <= PIXEL_BUDGET:
+        plot.bar(range(len(weights)), weights)
+    else:
+        # Too many bars to draw: show each pixel's min-max range instead.
+        starts = numpy.linspace(0, len(weights), PIXEL_BUDGET, endpoint=False).astype(numpy.int64)
+        plot.fill_between(
+            starts,
+            numpy.minimum.reduceat(weights, starts),
+            numpy.maximum.reduceat(weights, starts),
+            step="post"
+        )
     plot.axhline(0, linewidth=1)
     plot.title("Final Training Weights [Index vs Value]")
     plot.xlabel("Weight Index")
@@ -115,24 +191,52 @@ def plot_final_weight(
     return output
 
 
+def load_export(file_path: str) -> Dict[str, Any]:
+    # Reads the /export document, or its NDJSON form (model line, then one entry per line), optionally gzipped.
+    opener: Callable = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt", encoding="utf-8") as handle:
+        if ".ndjson" not in os.path.basename(file_path):
+            return json.load(handle)
+        data: Dict[str, Any] = json.loads(handle.readline())
+        data["history"] = [json.loads(line) for line in handle if line.strip()]
+        return data
+
+
+def render_charts(
+    data: Dict[str, Any],
+    outdir: pathlib.Path,
+    prefix: str,
+    workers: int = 3
+) -> List[pathlib.Path]:
+    # The history is converted to columns once; the charts are independent and render in parallel.
+    columns: HistoryColumns = load_columns(data)
+    jobs: List[Tuple[Callable[..., pathlib.Path], Any]] = [
+        (plot_accuracy, columns),
+        (plot_weight_normalization, columns),
+        (plot_final_weight, {"training_weights": data["training_weights"]})
+    ]
+    if workers <= 1:
+        return [chart(chart_data, outdir, prefix) for chart, chart_data in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        futures = [executor.submit(chart, chart_data, outdir, prefix) for chart, chart_data in jobs]
+        return [future.result() for future in futures]
+
+
 @click.command()
-@click.option("--file", "file_path", type=click.Path(exists=True, dir_okay=False, readable=True), default="export.json", show_default=True, help="Path to export.json")
+@click.option("--file", "file_path", type=click.Path(exists=True, dir_okay=False, readable=True), default="export.json", show_default=True, help="Path to export.json (or an NDJSON export, optionally .gz)")
 @click.option("--outdir", type=click.Path(file_okay=False, writable=True), default="reports", show_default=True, help="Directory to save charts")
 @click.option("--prefix", default="", show_default=False, help="Optional filename prefix (e.g., run1_)")
-def cli(file_path: str, outdir: str, prefix: str):
+@click.option("--workers", type=int, default=3, show_default=True, help="Processes rendering charts in parallel (1 = in-process)")
+def cli(file_path: str, outdir: str, prefix: str, workers: int):
     """Generate PNG charts from an export.json."""
     outdir_path = pathlib.Path(outdir)
-    with open(file_path, "r") as f:
-        data = json.load(f)
+    data = load_export(file_path)
 
-    a = plot_accuracy(data, outdir_path, prefix)
-    b = plot_weight_normalization(data, outdir_path, prefix)
-    c = plot_final_weight(data, outdir_path, prefix)
+    outputs = render_charts(data, outdir_path, prefix, workers=workers)
 
     click.echo("Charts saved:")
-    click.echo(f" - {a}")
-    click.echo(f" - {b}")
-    click.echo(f" - {c}")
+    for output in outputs:
+        click.echo(f" - {output}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+import os
+import json
+import click
+import numpy
+import pathlib
+import requests
+import warnings
+from numpy.typing import NDArray
+from typing import Any, Dict, Iterator, List, Tuple
+from matplotlib import pyplot as plot
+from client.client import WIRE_FORMATS, ModelCache
+from models.network import wait_for_status
+from analytics.charts import FIGURE_DPI, PIXEL_BUDGET
+
+PERCENTILES: Tuple[int, ...] = (10, 25, 50, 75, 90)
+DISTRIBUTION_BINS: int = 50
+LIVE_FIGURE_SIZE: Tuple[float, float] = (10, 12)
+
+
+class BinnedSeries:
+    # A fixed number of bins that merge pairwise when full: appending is amortized
+    # O(1) and a redraw touches at most `bins` points, however long the run.
+    def __init__(self, width: int, bins: int = PIXEL_BUDGET) -> None:
+        if bins < 2 or bins % 2:
+            raise ValueError("bins must be an even number >= 2")
+        self.bins: int = bins
+        self.per_bin: int = 1
+        self.size: int = 0
+        self._x: NDArray[numpy.float64] = numpy.zeros(bins)
+        self._sums: NDArray[numpy.float64] = numpy.zeros((bins, width))
+        self._counts: NDArray[numpy.float64] = numpy.zeros((bins, width))
+
+    def append(self, x: float, values: NDArray[numpy.float64]) -> None:
+        index: int = self.size // self.per_bin
+        if index >= self.bins:
+            self._fold()
+            index = self.size // self.per_bin
+        present: NDArray[numpy.bool_] = ~numpy.isnan(values)
+        self._x[index] += x
+        self._sums[index] += numpy.where(present, values, 0.0)
+        self._counts[index] += present
+        self.size += 1
+
+    def _fold(self) -> None:
+        half: int = self.bins // 2
+        for array in (self._x, self._sums, self._counts):
+            array[:half] = array[0::2] + array[1::2]
+            array[half:] = 0.0
+        self.per_bin *= 2
+
+    def series(self) -> Tuple[NDArray[numpy.float64], NDArray[numpy.float64]]:
+        # Bin centres and per-bin means (NaN where a series had no values).
+        used: int = -(-self.size // self.per_bin)
+        sizes: NDArray[numpy.float64] = numpy.full(used, float(self.per_bin))
+        if used:
+            sizes[-1] = self.size - (used - 1) * self.per_bin
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            return self._x[:used] / sizes, self._sums[:used] / self._counts[:used]
+
+
+class LiveDashboard:
+    # Persistent figure whose artists are updated in place each round.
+    def __init__(
+        self,
+        outdir: pathlib.Path,
+        prefix: str = "",
+        bins: int = PIXEL_BUDGET,
+        frames: bool = False
+    ) -> None:
+        self.output: pathlib.Path = outdir / f"{prefix}live.png"
+        self.frames_dir: pathlib.Path | None = outdir / f"{prefix}frames" if frames else None
+        outdir.mkdir(parents=True, exist_ok=True)
+        if self.frames_dir is not None:
+            self.frames_dir.mkdir(parents=True, exist_ok=True)
+        self.round: int = 0
+        self.clients: int = 0
+        # Percentiles then the mean of the round's client accuracies.
+        self.accuracy: BinnedSeries = BinnedSeries(len(PERCENTILES) + 1, bins)
+        self.weight_norm: BinnedSeries = BinnedSeries(1, bins)
+        self.weights: NDArray[numpy.float64] | None = None
+
+        self.figure, (self.accuracy_axes, self.norm_axes, self.weight_axes) = plot.subplots(3, 1, figsize=LIVE_FIGURE_SIZE)
+        self.bands: List[Any] = []
+        (self.median_line,) = self.accuracy_axes.plot([], [], color="C0", label="Median")
+        (self.mean_line,) = self.accuracy_axes.plot([], [], color="C1", linestyle="--", label="Average")
+        self.accuracy_axes.set_ylabel("Accuracy")
+        self.accuracy_axes.grid(True, linestyle="--", alpha=0.5)
+        (self.norm_line,) = self.norm_axes.plot([], [])
+        self.norm_axes.set_xlabel("Round")
+        self.norm_axes.set_ylabel("Weight Normalization")
+        self.norm_axes.grid(True, linestyle="--", alpha=0.5)
+        self.histogram = self.weight_axes.bar(numpy.arange(DISTRIBUTION_BINS), numpy.zeros(DISTRIBUTION_BINS), align="edge")
+        self.weight_axes.set_xlabel("Weight Value")
+        self.weight_axes.set_ylabel("Count")
+
+    def update(self, entry: Dict[str, Any]) -> None:
+        # O(clients in the round); nothing here depends on how many rounds came before.
+        values: NDArray[numpy.float64] = numpy.fromiter(
+            (metric["accuracy"] for metric in (entry.get("accuracy") or {}).values()),
+            dtype=numpy.float64
+        )
+        summary: NDArray[numpy.float64] = numpy.full(len(PERCENTILES) + 1, numpy.nan)
+        if len(values):
+            summary[:-1] = numpy.percentile(values, PERCENTILES)
+            summary[-1] = values.mean()
+        self.round = int(entry["round"])
+        self.clients = len(values)
+        self.accuracy.append(self.round, summary)
+        self.weight_norm.append(self.round, numpy.array([entry.get("weight_norm", numpy.nan)]))
+
+    def set_weights(self, weights: NDArray[numpy.float64]) -> None:
+        self.weights = numpy.asarray(weights, dtype=numpy.float64)
+
+    def render(self) -> pathlib.Path:
+        rounds, summary = self.accuracy.series()
+        for band in self.bands:
+            band.remove()
+        self.bands = [
+            self.accuracy_axes.fill_between(rounds, summary[:, 0], summary[:, 4], color="C0", alpha=0.15, label="p10-p90"),
+            self.accuracy_axes.fill_between(rounds, summary[:, 1], summary[:, 3], color="C0", alpha=0.3, label="p25-p75")
+        ]
+        self.median_line.set_data(rounds, summary[:, 2])
+        self.mean_line.set_data(rounds, summary[:, 5])
+        self.accuracy_axes.set_title(f"Client Accuracy per Round (round {self.round}, {self.clients} clients)")
+        self.accuracy_axes.legend(loc="lower right")
+
+        norm_rounds, norms = self.weight_norm.series()
+        self.norm_line.set_data(norm_rounds, norms[:, 0])
+        for axes in (self.accuracy_axes, self.norm_axes):
+            axes.relim()
+            axes.autoscale_view()
+
+        if self.weights is not None and len(self.weights):
+            counts, edges = numpy.histogram(self.weights, bins=DISTRIBUTION_BINS)
+            for bar, count, left, right in zip(self.histogram, counts, edges[:-1], edges[1:]):
+                bar.set_x(left)
+                bar.set_width(right - left)
+                bar.set_height(count)
+            self.weight_axes.set_xlim(edges[0], edges[-1])
+            self.weight_axes.set_ylim(0, max(int(counts.max()), 1) * 1.05)
+            self.weight_axes.set_title(f"Global Weight Distribution ({len(self.weights)} weights)")
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            self.figure.tight_layout()
+        # Written aside and swapped in, so a viewer never reads a half-written file.
+        temporary: pathlib.Path = self.output.with_name(self.output.name + ".tmp")
+        self.figure.savefig(temporary.as_posix(), dpi=FIGURE_DPI, format="png")
+        os.replace(temporary, self.output)
+        if self.frames_dir is not None:
+            self.figure.savefig((self.frames_dir / f"round_{self.round:06d}.png").as_posix(), dpi=FIGURE_DPI)
+        return self.output
+
+    def close(self) -> None:
+        plot.close(self.figure)
+
+
+def write_gif(frames_dir: pathlib.Path, output: pathlib.Path, duration: int = 200) -> pathlib.Path | None:
+    # Assembled once at the end; frames are streamed from disk rather than held in memory.
+    from PIL import Image
+
+    paths: List[pathlib.Path] = sorted(frames_dir.glob("round_*.png"))
+    if not paths:
+        return None
+    with Image.open(paths[0]) as first:
+        first.save(
+            output.as_posix(),
+            save_all=True,
+            append_images=(Image.open(path) for path in paths[1:]),
+            duration=duration,
+            loop=0
+        )
+    return output
+
+
+def _new_entries(base: str, after: int, session: requests.Session) -> Iterator[Dict[str, Any]]:
+    response: requests.Response = session.get(f"{base}/history", params={"start": after + 1}, stream=True, timeout=30)
+    response.raise_for_status()
+    for line in response.iter_lines():
+        if line:
+            yield json.loads(line)
+
+
+def follow(
+    base: str,
+    dashboard: LiveDashboard,
+    rounds: int | None = None,
+    every: int = 1,
+    wire: str = "json",
+    timeout: float | None = None
+) -> int:
+    # Blocks on the server's round counter, then pulls only the entries it has not seen.
+    session: requests.Session = requests.Session()
+    models: ModelCache = ModelCache(base, wire, session=session)
+    rendered: int = 0
+    while rounds is None or dashboard.round < rounds:
+        status: Dict[str, Any] | None = wait_for_status(
+            f"{base}/status",
+            predicate=lambda snapshot: snapshot.get("round", 0) > dashboard.round,
+            timeout=timeout,
+            session=session,
+            watch="round_epoch"
+        )
+        if status is None:
+            break
+        fresh: int = 0
+        for entry in _new_entries(base, dashboard.round, session):
+            dashboard.update(entry)
+            fresh += 1
+        if not fresh:
+            # The server has rounds without history (e.g. restored without its log); skip past them.
+            dashboard.round = int(status["round"])
+            continue
+        if dashboard.round - rendered >= every or (rounds is not None and dashboard.round >= rounds):
+            dashboard.set_weights(models.fetch()["training_weights"])
+            dashboard.render()
+            rendered = dashboard.round
+            click.echo(f"[live] round {dashboard.round} -> {dashboard.output}")
+    return dashboard.round
+
+
+@click.command()
+@click.option("--server", default="http://127.0.0.1:8000", show_default=True, help="Server base URL")
+@click.option("--outdir", type=click.Path(file_okay=False, writable=True), default="reports", show_default=True, help="Directory for the live chart")
+@click.option("--prefix", default="", show_default=False, help="Optional filename prefix (e.g., run1_)")
+@click.option("--rounds", type=int, default=None, help="Stop after this round (default: follow until --timeout)")
+@click.option("--every", type=int, default=1, show_default=True, help="Re-render every N rounds")
+@click.option("--bins", type=int, default=PIXEL_BUDGET, show_default=True, help="Points kept per series (even)")
+@click.option("--gif", is_flag=True, default=False, help="Keep one frame per render and write an animated GIF on exit")
+@click.option("--wire", type=click.Choice(WIRE_FORMATS), default="json", show_default=True, help="Format used to pull the model weights")
+@click.option("--timeout", type=float, default=None, help="Give up after this many seconds without a new round")
+def cli(server: str, outdir: str, prefix: str, rounds: int | None, every: int, bins: int, gif: bool, wire: str, timeout: float | None):
+    """Follow a running federation and keep its charts up to date."""
+    outdir_path = pathlib.Path(outdir)
+    dashboard = LiveDashboard(outdir_path, prefix, bins=bins, frames=gif)
+    try:
+        follow(server.rstrip("/"), dashboard, rounds=rounds, every=max(every, 1), wire=wire, timeout=timeout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dashboard.close()
+    if gif and dashboard.frames_dir is not None:
+        output = write_gif(dashboard.frames_dir, outdir_path / f"{prefix}live.gif")
+        if output is not None:
+            click.echo(f"GIF saved: {output}")
+
+
+if __name__ == "__main__":
+    cli()
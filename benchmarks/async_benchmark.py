@@ -0,0 +1,170 @@
+import json
+import time
+import click
+import numpy
+import threading
+from numpy.typing import NDArray
+from typing import Any, Dict, List
+from models.models import Logistic
+from models.trainer import LocalTrainer
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.optimizer_benchmark import non_iid_datasets
+from server.model_state import SCHEDULING_MODES, GlobalModelState
+
+
+class _BenchmarkClient:
+    def __init__(
+        self,
+        client_id: str,
+        X_matrix: NDArray[numpy.float64],
+        y: NDArray[numpy.float64],
+        delay: float
+    ) -> None:
+        self.client_id: str = client_id
+        self.model: Logistic = Logistic(X_matrix.shape[1])
+        self.trainer: LocalTrainer = LocalTrainer(self.model, X_matrix, y)
+        # Stands in for slower hardware or a worse link.
+        self.delay: float = delay
+
+    def train(self, weights: NDArray[numpy.float64], learning_rate: float) -> NDArray[numpy.float64]:
+        time.sleep(self.delay)
+        self.model.set_model_weight(weights)
+        return self.trainer.update_local(learning_rate=learning_rate)
+
+
+def _run_sync(
+    state: GlobalModelState,
+    clients: List[_BenchmarkClient],
+    updates: int,
+    learning_rate: float
+) -> None:
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        while sum(entry["received"] for entry in state.history) < updates:
+            training_round, weights = state.model_snapshot()
+            state.configure_training_round([simulated.client_id for simulated in clients])
+            list(executor.map(
+                lambda simulated: state.submit_update(
+                    simulated.client_id,
+                    training_round,
+                    simulated.train(weights, learning_rate)
+                ),
+                clients
+            ))
+            state.finish_round_if_complete()
+
+
+def _run_async(
+    state: GlobalModelState,
+    clients: List[_BenchmarkClient],
+    updates: int,
+    learning_rate: float
+) -> None:
+    submitted: List[int] = [0]
+    counter_lock: threading.Lock = threading.Lock()
+
+    def worker(simulated: _BenchmarkClient) -> None:
+        last_version: int = -1
+        while True:
+            version, weights = state.model_snapshot()
+            with counter_lock:
+                if submitted[0] >= updates:
+                    return
+                if version > last_version:
+                    submitted[0] += 1
+            if version <= last_version:
+                # One update per model version, as client.client sends them.
+                state.wait_for_change(state.round_epoch, timeout=0.05, watch="round_epoch")
+                continue
+            state.submit_update(simulated.client_id, version, simulated.train(weights, learning_rate))
+            last_version = version
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        list(executor.map(worker, clients))
+
+
+def benchmark_scheduling(
+    clients: int = 20,
+    features: int = 12,
+    samples: int = 500,
+    updates: int = 400,
+    buffer_size: int = 5,
+    base_delay: float = 0.01,
+    slowest: float = 10.0,
+    learning_rate: float = 0.5,
+    seed: int = 1234
+) -> List[Dict[str, Any]]:
+    # Client i sleeps base_delay * speed_i per update, speeds spread from 1x to `slowest`x.
+    speeds: NDArray[numpy.float64] = numpy.geomspace(1.0, slowest, clients)
+    # Drifted clients sharing one concept, so the final model's quality depends on the scheduling.
+    X, y = non_iid_datasets(clients, samples, features, seed)
+    X_all: NDArray[numpy.float64] = X.reshape(-1, features)
+    y_all: NDArray[numpy.float64] = y.ravel()
+
+    results: List[Dict[str, Any]] = []
+    for scheduling in SCHEDULING_MODES:
+        state: GlobalModelState = GlobalModelState(
+            feature_weight=features,
+            scheduling=scheduling,
+            buffer_size=buffer_size
+        )
+        simulated: List[_BenchmarkClient] = []
+        for index in range(clients):
+            client_id: str = f"c{index:03d}"
+            state.register(client_id)
+            simulated.append(_BenchmarkClient(client_id, X[index], y[index], base_delay * speeds[index]))
+
+        time_0 = time.perf_counter()
+        (_run_async if scheduling == "async" else _run_sync)(state, simulated, updates, learning_rate)
+        seconds: float = time.perf_counter() - time_0
+
+        final: Logistic = Logistic(features)
+        final.set_model_weight(state.model.get_model_weight())
+        applied: int = sum(entry["received"] for entry in state.history)
+        probabilities: NDArray[numpy.float64] = numpy.clip(final.predict_probability(X_all), 1e-12, 1.0 - 1e-12)
+        results.append(
+            {
+                "scheduling": scheduling,
+                "seconds": seconds,
+                "client_updates": applied,
+                "updates_per_second": applied / seconds,
+                "model_versions": state.round,
+                "versions_per_second": state.round / seconds,
+                "accuracy": float(numpy.mean(final.predict(X_all) == y_all)),
+                "loss": float(-numpy.mean(y_all * numpy.log(probabilities) + (1.0 - y_all) * numpy.log(1.0 - probabilities))),
+                "clients": clients,
+                "buffer_size": buffer_size if scheduling == "async" else clients,
+                "slowest": slowest
+            }
+        )
+    return results
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--clients", type=int, default=20, show_default=True)
+@click.option("--updates", type=int, default=400, show_default=True, help="Client updates to apply in each mode.")
+@click.option("--buffer-size", "buffer_size", type=int, default=5, show_default=True, help="async: updates per model version.")
+@click.option("--base-delay", "base_delay", type=float, default=0.01, show_default=True, help="Seconds of simulated work for the fastest client.")
+@click.option("--slowest", type=float, default=10.0, show_default=True, help="Slowdown of the slowest client relative to the fastest.")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print results as JSON.")
+def async_benchmark_cli(clients: int, updates: int, buffer_size: int, base_delay: float, slowest: float, as_json: bool) -> None:
+    results = benchmark_scheduling(
+        clients=clients,
+        updates=updates,
+        buffer_size=buffer_size,
+        base_delay=base_delay,
+        slowest=slowest
+    )
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+        return
+
+    click.echo(f"{'mode':>6} {'seconds':>8} {'updates/s':>10} {'versions':>9} {'accuracy':>9} {'loss':>7}")
+    for row in results:
+        click.echo(
+            f"{row['scheduling']:>6} {row['seconds']:>8.2f} {row['updates_per_second']:>10.1f} "
+            f"{row['model_versions']:>9} {row['accuracy']:>9.4f} {row['loss']:>7.4f}"
+        )
+
+
+if __name__ == "__main__":
+    async_benchmark_cli()
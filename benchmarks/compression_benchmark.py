@@ -0,0 +1,121 @@
+import json
+import click
+import numpy
+from numpy.typing import NDArray
+from typing import Any, Dict, List
+from models.models import Logistic
+from models.network import encode_frame
+from models.trainer import LocalTrainer
+from client.data import generate_dataset_local
+from client.masking import MaskEngine
+from client.client import prepare_update
+from models.compression import COMPRESSION_SCHEMES, ErrorFeedbackCompressor
+from server.model_state import GlobalModelState
+
+
+def benchmark_compression(
+    schemes: List[str],
+    clients: int = 10,
+    features: int = 200,
+    samples: int = 2_000,
+    rounds: int = 20,
+    learning_rate: float = 0.5,
+    ratio: float = 0.1,
+    seed: int = 1234
+) -> List[Dict[str, Any]]:
+    # Runs the real masking, compression and GlobalModelState aggregation in-process
+    # and reports the size of the binary upload frame against accuracy.
+    client_ids: List[str] = [f"c{index:03d}" for index in range(clients)]
+    datasets = [generate_dataset_local(samples, features, seed + index) for index in range(clients)]
+    X_all: NDArray[numpy.float64] = numpy.concatenate([X for X, _ in datasets])
+    y_all: NDArray[numpy.float64] = numpy.concatenate([y for _, y in datasets]).astype(numpy.float64)
+
+    results: List[Dict[str, Any]] = []
+    for scheme in schemes:
+        state: GlobalModelState = GlobalModelState(
+            feature_weight=features,
+            aggregation="streaming",
+            compression=scheme,
+            compression_ratio=ratio
+        )
+        models: List[Logistic] = [Logistic(features) for _ in client_ids]
+        trainers: List[LocalTrainer] = [
+            LocalTrainer(model, X, y) for model, (X, y) in zip(models, datasets)
+        ]
+        engines: List[MaskEngine] = [
+            MaskEngine(client_id, features + 1, ring=scheme != "none") for client_id in client_ids
+        ]
+        compressors: List[ErrorFeedbackCompressor] = [
+            ErrorFeedbackCompressor(features + 1, seed=index) for index in range(clients)
+        ]
+        for client_id in client_ids:
+            state.register(client_id)
+
+        upload_bytes: int = 0
+        for _ in range(rounds):
+            training_round, weights, compression = state.training_snapshot()
+            state.configure_training_round(client_ids)
+            for index, client_id in enumerate(client_ids):
+                engines[index].update_roster(client_ids, state.mask_nonce)
+                models[index].set_model_weight(weights)
+                delta = trainers[index].update_local(learning_rate=learning_rate)
+                masked = prepare_update(delta, engines[index], compressors[index], compression)
+                frame: bytes = encode_frame(
+                    masked,
+                    round=training_round,
+                    client_id=client_id,
+                    dtype=masked.dtype.name
+                )
+                upload_bytes += len(frame)
+                state.submit_update(client_id, training_round, masked)
+            state.process_and_update_to_global_model()
+
+        final: Logistic = Logistic(features)
+        final.set_model_weight(state.model.get_model_weight())
+        results.append(
+            {
+                "scheme": scheme,
+                "bytes_per_upload": upload_bytes / (rounds * clients),
+                "accuracy": float(numpy.mean(final.predict(X_all) == y_all)),
+                "weight_norm": float(numpy.linalg.norm(final.get_model_weight()))
+            }
+        )
+
+    dense: float = next((row["bytes_per_upload"] for row in results if row["scheme"] == "none"), 0.0)
+    for row in results:
+        row["reduction"] = dense / row["bytes_per_upload"] if dense else None
+        row.update({"clients": clients, "features": features, "rounds": rounds})
+    return results
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--scheme", "schemes", type=click.Choice(COMPRESSION_SCHEMES), multiple=True, default=COMPRESSION_SCHEMES, show_default=True, help="Schemes to compare (repeatable).")
+@click.option("--clients", type=int, default=10, show_default=True)
+@click.option("--features", type=int, default=200, show_default=True)
+@click.option("--samples", type=int, default=2_000, show_default=True, help="Local samples per client.")
+@click.option("--rounds", type=int, default=20, show_default=True)
+@click.option("--ratio", type=float, default=0.1, show_default=True, help="topk fraction of coordinates.")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print results as JSON.")
+def compression_benchmark_cli(schemes: List[str], clients: int, features: int, samples: int, rounds: int, ratio: float, as_json: bool) -> None:
+    results = benchmark_compression(
+        schemes=list(schemes),
+        clients=clients,
+        features=features,
+        samples=samples,
+        rounds=rounds,
+        ratio=ratio
+    )
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+        return
+
+    click.echo(f"{'scheme':>8} {'bytes/upload':>13} {'reduction':>10} {'accuracy':>9}")
+    for row in results:
+        click.echo(
+            f"{row['scheme']:>8} {row['bytes_per_upload']:>13,.0f} "
+            f"{row['reduction'] or 0:>9.1f}x {row['accuracy']:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    compression_benchmark_cli()
@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import click
+import numpy
+import tempfile
+import itertools
+import threading
+import subprocess
+import requests
+from typing import Any, Dict, List, Tuple
+from client.client import WIRE_FORMATS
+from server.server import ROOT_DIRECTORY, SERVING_BACKENDS
+from benchmarks.server_load import _free_port, start_server_process
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+_RSS_UNIT: int = 1 if sys.platform == "darwin" else 1024
+# Runs the coordinator in its own interpreter, so its peak RSS is that of this grid point alone.
+_CONTROLLER_SCRIPT: str = """
+import io, sys, json
+from contextlib import redirect_stdout
+from controller.controller import coordinator
+server, rounds, clients, deadline, out = sys.argv[1:]
+with redirect_stdout(io.StringIO()):
+    seconds = coordinator(server=server, rounds=int(rounds), minimum_clients_registered=int(clients), deadline=float(deadline))
+with open(out, "w", encoding="utf-8") as handle:
+    json.dump(seconds, handle)
+"""
+
+
+def _high_water(pid: int) -> float | None:
+    # VmHWM of the exec'd program in MiB. On Linux, wait4's ru_maxrss also counts the
+    # harness pages the child held between fork and exec, which hides small processes.
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _sample_high_water(processes: List[subprocess.Popen], peaks: Dict[int, float], stop: threading.Event) -> None:
+    # VmHWM only grows, so the last reading before a process exits is its peak.
+    while not stop.wait(0.1):
+        for process in list(processes):
+            value: float | None = _high_water(process.pid)
+            if value is not None:
+                peaks[process.pid] = value
+
+
+def _reap(process: subprocess.Popen, timeout: float, peaks: Dict[int, float] | None = None) -> float | None:
+    # Waits for the process and returns its peak RSS in MiB.
+    deadline: float = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if peaks is not None:
+            value: float | None = _high_water(process.pid)
+            if value is not None:
+                peaks[process.pid] = value
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            if peaks is not None and process.pid in peaks:
+                return peaks[process.pid]
+            return usage.ru_maxrss * _RSS_UNIT / 2 ** 20
+        time.sleep(0.05)
+    process.kill()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return None
+
+
+def _metric_sum(metrics: str, name: str) -> float:
+    # Sum of `name` across all label sets in Prometheus text output.
+    total: float = 0.0
+    for line in metrics.splitlines():
+        if line.startswith(name + "{") or line.startswith(name + " "):
+            total += float(line.rsplit(" ", 1)[1])
+    return total
+
+
+def run_federation(
+    dimensions: int,
+    clients: int,
+    samples: int,
+    rounds: int = 5,
+    wire: str = "float64",
+    backend: str = "waitress",
+    timeout: float = 600.0
+) -> Dict[str, Any]:
+    # One real federation on localhost: server, clients and controller as subprocesses.
+    port: int = _free_port()
+    base: str = f"http://127.0.0.1:{port}"
+    server: subprocess.Popen = start_server_process(
+        port=port,
+        feature_weight=dimensions - 1,
+        aggregation="streaming",
+        backend=backend,
+        threads=max(128, 2 * clients)
+    )
+    client_processes: List[subprocess.Popen] = []
+    controller: subprocess.Popen | None = None
+    watched: List[subprocess.Popen] = [server]
+    peaks: Dict[int, float] = {}
+    stop: threading.Event = threading.Event()
+    threading.Thread(target=_sample_high_water, args=(watched, peaks, stop), daemon=True).start()
+    handle, seconds_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    try:
+        for index in range(clients):
+            client_processes.append(
+                subprocess.Popen(
+                    [
+                        sys.executable, "-m", "client.client",
+                        "--server", base,
+                        "--client-id", f"bench-{index:04d}",
+                        "--samples", str(samples),
+                        "--rounds", str(rounds),
+                        "--wire", wire,
+                        "--seed", str(1234 + index)
+                    ],
+                    cwd=ROOT_DIRECTORY,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            )
+            watched.append(client_processes[-1])
+
+        controller = subprocess.Popen(
+            [sys.executable, "-c", _CONTROLLER_SCRIPT, base, str(rounds), str(clients), str(timeout), seconds_path],
+            cwd=ROOT_DIRECTORY,
+            stdout=subprocess.DEVNULL
+        )
+        watched.append(controller)
+        controller_rss: float | None = _reap(controller, timeout, peaks)
+        if controller.returncode != 0:
+            raise RuntimeError(f"controller exited with {controller.returncode}")
+        with open(seconds_path, "r", encoding="utf-8") as seconds_file:
+            round_seconds: List[float] = json.load(seconds_file)
+        metrics: str = requests.get(f"{base}/metrics", timeout=10).text
+        client_rss: List[float | None] = [_reap(process, timeout, peaks) for process in client_processes]
+    finally:
+        for process in client_processes + ([controller] if controller is not None else []):
+            if process.returncode is None:
+                process.kill()
+                process.wait()
+        server.terminate()
+        os.unlink(seconds_path)
+    server_rss: float | None = _reap(server, 10.0, peaks)
+    stop.set()
+
+    latencies: numpy.ndarray = numpy.asarray(round_seconds, dtype=numpy.float64)
+    measured: List[float] = [rss for rss in client_rss if rss is not None]
+    return {
+        "dimensions": dimensions,
+        "clients": clients,
+        "samples": samples,
+        "rounds": len(round_seconds),
+        "wire": wire,
+        "rounds_per_second": len(latencies) / float(latencies.sum()) if len(latencies) else 0.0,
+        "round_latency_p50": float(numpy.percentile(latencies, 50)) if len(latencies) else None,
+        "round_latency_p99": float(numpy.percentile(latencies, 99)) if len(latencies) else None,
+        "bytes_uploaded": int(_metric_sum(metrics, "skynet_submission_bytes_sum")),
+        "bytes_downloaded": int(_metric_sum(metrics, "skynet_response_bytes_sum")),
+        "peak_rss_mb": {
+            "server": server_rss,
+            "client_max": max(measured) if measured else None,
+            "client_mean": float(numpy.mean(measured)) if measured else None,
+            "controller": controller_rss
+        }
+    }
+
+
+def benchmark_federation(
+    dimensions: List[int],
+    client_counts: List[int],
+    samples: List[int],
+    rounds: int = 5,
+    wire: str = "float64",
+    backend: str = "waitress"
+) -> List[Dict[str, Any]]:
+    grid: List[Tuple[int, int, int]] = list(itertools.product(dimensions, client_counts, samples))
+    return [
+        run_federation(dimension, clients, sample_count, rounds=rounds, wire=wire, backend=backend)
+        for dimension, clients, sample_count in grid
+    ]
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--dim", "dimensions", type=int, multiple=True, default=(13, 1_001), show_default=True, help="Model dimension (features + bias), repeatable.")
+@click.option("--clients", "client_counts", type=int, multiple=True, default=(4, 16), show_default=True, help="Client processes, repeatable.")
+@click.option("--samples", type=int, multiple=True, default=(300,), show_default=True, help="Local samples per client, repeatable.")
+@click.option("--rounds", type=int, default=5, show_default=True)
+@click.option("--wire", type=click.Choice(WIRE_FORMATS), default="float64", show_default=True)
+@click.option("--backend", type=click.Choice(SERVING_BACKENDS), default="waitress", show_default=True)
+@click.option("--out", type=click.Path(dir_okay=False), default=None, help="Also write the JSON results to this file.")
+def federation_benchmark_cli(dimensions: List[int], client_counts: List[int], samples: List[int], rounds: int, wire: str, backend: str, out: str | None) -> None:
+    results = benchmark_federation(
+        dimensions=list(dimensions),
+        client_counts=list(client_counts),
+        samples=list(samples),
+        rounds=rounds,
+        wire=wire,
+        backend=backend
+    )
+    document: str = json.dumps(results, indent=2)
+    if out:
+        with open(out, "w", encoding="utf-8") as handle:
+            handle.write(document + "\n")
+    click.echo(document)
+
+
+if __name__ == "__main__":
+    federation_benchmark_cli()
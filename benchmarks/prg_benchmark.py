@@ -0,0 +1,74 @@
+import json
+import time
+import click
+from typing import Callable, Dict, List
+from models.crypto import (
+    PRG_MODES,
+    pseudo_random_generator,
+    _reference_pseudo_random_generator
+)
+
+
+def _time_generator(
+    generate: Callable[[], object],
+    repeats: int
+) -> float:
+    best: float = float("inf")
+    for _ in range(repeats):
+        time_0 = time.perf_counter()
+        generate()
+        best = min(best, time.perf_counter() - time_0)
+    return best
+
+
+def benchmark_prg(
+    lengths: List[int],
+    repeats: int = 3,
+    include_reference: bool = True
+) -> List[Dict[str, float | int | str]]:
+    seed: bytes = b"skynet-benchmark-seed"
+    results: List[Dict[str, float | int | str]] = []
+
+    for length in lengths:
+        engines: Dict[str, Callable[[], object]] = {
+            mode: (lambda mode=mode: pseudo_random_generator(seed, length, mode=mode))
+            for mode in PRG_MODES
+        }
+        if include_reference:
+            engines["reference"] = lambda: _reference_pseudo_random_generator(seed, length)
+
+        for name, generate in engines.items():
+            seconds: float = _time_generator(generate, repeats)
+            results.append(
+                {
+                    "engine": name,
+                    "length": length,
+                    "seconds": seconds,
+                    "elements_per_second": length / seconds if seconds > 0 else float("inf")
+                }
+            )
+    return results
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--length", "lengths", type=int, multiple=True, default=(1_000, 100_000, 1_000_000), show_default=True, help="Vector length to generate (repeatable).")
+@click.option("--repeats", type=int, default=3, show_default=True, help="Best-of repeats per measurement.")
+@click.option("--skip-reference", is_flag=True, default=False, help="Skip the per-element reference loop (slow for large lengths).")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print results as JSON.")
+def prg_benchmark_cli(lengths: List[int], repeats: int, skip_reference: bool, as_json: bool) -> None:
+    results = benchmark_prg(
+        lengths=list(lengths),
+        repeats=repeats,
+        include_reference=not skip_reference
+    )
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+        return
+
+    click.echo(f"{'engine':<12} {'length':>10} {'seconds':>10} {'elements/s':>14}")
+    for row in results:
+        click.echo(f"{row['engine']:<12} {row['length']:>10} {row['seconds']:>10.4f} {row['elements_per_second']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    prg_benchmark_cli()
@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import time
+import click
+import numpy
+import socket
+import requests
+import subprocess
+from numpy.typing import NDArray
+from typing import Any, Dict, List
+from client.swarm import pooled_session
+from client.client import WIRE_FORMATS, submit_update
+from concurrent.futures import ThreadPoolExecutor
+from server.model_state import AGGREGATION_MODES
+from server.server import ROOT_DIRECTORY, SERVING_BACKENDS
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server_process(
+    port: int,
+    feature_weight: int,
+    aggregation: str,
+    backend: str,
+    threads: int
+) -> subprocess.Popen:
+    process: subprocess.Popen = subprocess.Popen(
+        [
+            sys.executable, "-m", "server.server",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--feature-weight", str(feature_weight),
+            "--aggregation", aggregation,
+            "--backend", backend,
+            "--threads", str(threads)
+        ],
+        cwd=ROOT_DIRECTORY,
+        env={**os.environ, "SKYNET_LOG_SUBMISSIONS": "0"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    base: str = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{base}/status", timeout=1)
+            return process
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not come up")
+
+
+def _measure_submissions(
+    base: str,
+    session: requests.Session,
+    executor: ThreadPoolExecutor,
+    clients: int,
+    dimensions: int,
+    wire: str
+) -> Dict[str, Any]:
+    client_ids: List[str] = [f"load-{clients}-{index:05d}" for index in range(clients)]
+    list(executor.map(
+        lambda client_id: session.post(f"{base}/register", json={"client_id": client_id}),
+        client_ids
+    ))
+    session.post(f"{base}/configure-training-round", json={"participants": client_ids})
+    training_round: int = int(session.get(f"{base}/status").json()["round"])
+    update: NDArray[numpy.float64] = numpy.random.default_rng(clients).normal(size=dimensions)
+
+    time_0 = time.perf_counter()
+    codes: List[int] = list(executor.map(
+        lambda client_id: submit_update(
+            base,
+            client_id=client_id,
+            round=training_round,
+            masked_update=update,
+            metrics={},
+            wire=wire,
+            session=session
+        ).status_code,
+        client_ids
+    ))
+    seconds: float = time.perf_counter() - time_0
+
+    time_finish_0 = time.perf_counter()
+    finished: Dict[str, Any] = session.post(f"{base}/finish-round").json()
+    finish_seconds: float = time.perf_counter() - time_finish_0
+
+    return {
+        "clients": clients,
+        "accepted": sum(1 for code in codes if code == 200),
+        "seconds": seconds,
+        "submissions_per_second": clients / seconds if seconds > 0 else float("inf"),
+        "finish_round_seconds": finish_seconds,
+        "finished": bool(finished.get("OK"))
+    }
+
+
+def benchmark_server_load(
+    client_counts: List[int],
+    dimensions: int = 1_000,
+    aggregation: str = "streaming",
+    backend: str = "waitress",
+    threads: int = 128,
+    concurrency: int = 64,
+    wire: str = "float64"
+) -> List[Dict[str, Any]]:
+    port: int = _free_port()
+    process: subprocess.Popen = start_server_process(
+        port=port,
+        feature_weight=dimensions - 1,
+        aggregation=aggregation,
+        backend=backend,
+        threads=threads
+    )
+    base: str = f"http://127.0.0.1:{port}"
+    session: requests.Session = pooled_session(concurrency)
+
+    results: List[Dict[str, Any]] = []
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for clients in client_counts:
+                result = _measure_submissions(base, session, executor, clients, dimensions, wire)
+                result.update(
+                    {
+                        "dimensions": dimensions,
+                        "aggregation": aggregation,
+                        "backend": backend,
+                        "wire": wire
+                    }
+                )
+                results.append(result)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return results
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--clients", "client_counts", type=int, multiple=True, default=(100, 1_000, 10_000), show_default=True, help="Number of submitting clients per measurement (repeatable).")
+@click.option("--dim", "dimensions", type=int, default=1_000, show_default=True, help="Model dimension (features + bias).")
+@click.option("--aggregation", type=click.Choice(AGGREGATION_MODES), default="streaming", show_default=True)
+@click.option("--backend", type=click.Choice(SERVING_BACKENDS), default="waitress", show_default=True)
+@click.option("--threads", type=int, default=128, show_default=True, help="Server worker threads (waitress).")
+@click.option("--concurrency", type=int, default=64, show_default=True, help="Concurrent submitting connections.")
+@click.option("--wire", type=click.Choice(WIRE_FORMATS), default="float64", show_default=True)
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print results as JSON.")
+def server_load_cli(client_counts: List[int], dimensions: int, aggregation: str, backend: str, threads: int, concurrency: int, wire: str, as_json: bool) -> None:
+    results = benchmark_server_load(
+        client_counts=list(client_counts),
+        dimensions=dimensions,
+        aggregation=aggregation,
+        backend=backend,
+        threads=threads,
+        concurrency=concurrency,
+        wire=wire
+    )
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+        return
+
+    click.echo(f"{'clients':>8} {'accepted':>9} {'seconds':>9} {'subs/s':>10} {'finish(s)':>10}")
+    for row in results:
+        click.echo(
+            f"{row['clients']:>8} {row['accepted']:>9} {row['seconds']:>9.3f} "
+            f"{row['submissions_per_second']:>10,.0f} {row['finish_round_seconds']:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    server_load_cli()
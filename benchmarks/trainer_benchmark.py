@@ -0,0 +1,101 @@
+import json
+import time
+import click
+import numpy
+from typing import Any, Callable, Dict, List
+from models.models import Logistic
+from models.trainer import LocalTrainer
+from client.data import generate_dataset_local
+
+
+def _best_of(run: Callable[[], object], repeats: int) -> float:
+    best: float = float("inf")
+    for _ in range(repeats):
+        time_0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - time_0)
+    return best
+
+
+def benchmark_trainer(
+    rows: int = 1_000_000,
+    features: int = 12,
+    epochs: int = 1,
+    batch_sizes: List[int] | None = None,
+    repeats: int = 3,
+    seed: int = 1234
+) -> List[Dict[str, Any]]:
+    X_matrix, y = generate_dataset_local(rows, features, seed)
+    y = numpy.asarray(y, dtype=numpy.float64).ravel()
+    results: List[Dict[str, Any]] = []
+
+    baseline: Logistic = Logistic(features)
+    results.append(
+        {
+            "engine": "Logistic.update_local",
+            "dtype": "float64",
+            "batch_size": rows,
+            "train_seconds": _best_of(lambda: baseline.update_local(X_matrix, y, epochs=epochs, learning_rate=0.5), repeats),
+            "accuracy_seconds": _best_of(lambda: float(numpy.mean(baseline.predict(X_matrix) == y)), repeats),
+            "accuracy": float(numpy.mean(baseline.predict(X_matrix) == y))
+        }
+    )
+
+    for dtype in ("float64", "float32"):
+        for batch_size in [0] + list(batch_sizes or []):
+            model: Logistic = Logistic(features)
+            trainer: LocalTrainer = LocalTrainer(
+                model,
+                X_matrix,
+                y,
+                batch_size=batch_size or None,
+                dtype=dtype,
+                seed=seed
+            )
+            results.append(
+                {
+                    "engine": "LocalTrainer",
+                    "dtype": dtype,
+                    "batch_size": trainer.batch_size,
+                    "train_seconds": _best_of(lambda: trainer.update_local(epochs=epochs, learning_rate=0.5), repeats),
+                    "accuracy_seconds": _best_of(trainer.accuracy, repeats),
+                    "accuracy": trainer.accuracy()
+                }
+            )
+
+    for row in results:
+        row["rows"] = rows
+        row["epochs"] = epochs
+        row["rows_per_second"] = rows * epochs / row["train_seconds"]
+    return results
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--rows", type=int, default=1_000_000, show_default=True, help="Synthetic rows from generate_dataset_local.")
+@click.option("--features", type=int, default=12, show_default=True)
+@click.option("--epochs", type=int, default=1, show_default=True, help="Local epochs per timed update.")
+@click.option("--batch-size", "batch_sizes", type=int, multiple=True, default=(4_096, 65_536), show_default=True, help="Mini-batch sizes to compare (repeatable).")
+@click.option("--repeats", type=int, default=3, show_default=True)
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print results as JSON.")
+def trainer_benchmark_cli(rows: int, features: int, epochs: int, batch_sizes: List[int], repeats: int, as_json: bool) -> None:
+    results = benchmark_trainer(
+        rows=rows,
+        features=features,
+        epochs=epochs,
+        batch_sizes=list(batch_sizes),
+        repeats=repeats
+    )
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+        return
+
+    click.echo(f"{'engine':<22} {'dtype':<8} {'batch':>9} {'train(s)':>9} {'rows/s':>13} {'acc(s)':>8} {'accuracy':>9}")
+    for row in results:
+        click.echo(
+            f"{row['engine']:<22} {row['dtype']:<8} {row['batch_size']:>9} {row['train_seconds']:>9.4f} "
+            f"{row['rows_per_second']:>13,.0f} {row['accuracy_seconds']:>8.4f} {row['accuracy']:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    trainer_benchmark_cli()
@@ -1,15 +1,242 @@
-import time
 import numpy
 import click
 import requests
 from numpy.typing import NDArray
 from models.models import Logistic
-from typing import Dict, Any, List
-from sklearn.metrics import accuracy_score
+from typing import Dict, Any, Iterable, List
+from models.trainer import COMPUTE_DTYPES, LocalTrainer
 from client.data import generate_dataset_local
-from models.crypto import pseudo_random_generator, derive_pair_seed
+from client.dataset import DEFAULT_CHUNK_ROWS, ChunkedDataset, load_dataset
+from models.crypto import PRG_MODES
+from models.metrics import PhaseTimer
+from client.masking import MaskEngine
+from models.compression import CompressionSpec, ErrorFeedbackCompressor, to_ring
+from models.network import (
+    WIRE_MIMETYPE,
+    WIRE_DTYPE_HEADER,
+    WIRE_DTYPE_CODES,
+    WIRE_RING_DTYPES,
+    decode_frame,
+    encode_frame,
+    wait_for_status
+)
 
-SECRET = b"shared_secret"
+WIRE_FORMATS = ("json",) + tuple(
+    name for name in WIRE_DTYPE_CODES if name not in WIRE_RING_DTYPES
+)
+
+
+def _model_headers(wire: str) -> Dict[str, str]:
+    if wire == "json":
+        return {}
+    return {
+        "Accept": f"{WIRE_MIMETYPE}, application/json;q=0.5",
+        WIRE_DTYPE_HEADER: wire
+    }
+
+
+def _decode_model(response: requests.Response, field: str = "training_weights") -> Dict[str, Any]:
+    if response.headers.get("Content-Type", "").startswith(WIRE_MIMETYPE):
+        frame = decode_frame(response.content)
+        return {
+            **frame.meta,
+            "training_round": frame.round,
+            field: frame.vector,
+            "scheduling": frame.meta.get("scheduling", "sync")
+        }
+    return response.json()
+
+
+def fetch_model(
+    base: str,
+    wire: str = "json",
+    session: requests.Session | None = None
+) -> Dict[str, Any]:
+    http = session or requests
+    return _decode_model(http.get(f"{base}/model", headers=_model_headers(wire)))
+
+
+class ModelCache:
+    # The last model pulled. Later pulls ask /model/delta for what changed since
+    # its model_version: nothing at all (304) while the round is unchanged.
+    def __init__(
+        self,
+        base: str,
+        wire: str = "json",
+        session: requests.Session | None = None
+    ) -> None:
+        self.base: str = base
+        self.wire: str = wire
+        self.session: requests.Session | None = session
+        self.model: Dict[str, Any] | None = None
+
+    def fetch(self) -> Dict[str, Any]:
+        http = self.session or requests
+        version: str | None = self.model.get("model_version") if self.model is not None else None
+        if version is not None:
+            response: requests.Response = http.get(
+                f"{self.base}/model/delta",
+                params={"since": version},
+                headers=_model_headers(self.wire)
+            )
+            if response.status_code == 304:
+                return self._copy()
+            if response.status_code == 200:
+                change: Dict[str, Any] = _decode_model(response, field="delta")
+                weights: NDArray[numpy.float64] = self.model["training_weights"].copy()
+                delta: NDArray[numpy.float64] = numpy.asarray(change.pop("delta"), dtype=numpy.float64)
+                indices = change.pop("indices", None)
+                if indices is None:
+                    weights += delta
+                else:
+                    weights[numpy.asarray(indices, dtype=numpy.intp)] += delta
+                change.pop("base_version", None)
+                self.model = {**change, "training_weights": weights}
+                return self._copy()
+            # 410: the server no longer keeps that version (or restarted); pull it whole.
+
+        model: Dict[str, Any] = fetch_model(self.base, self.wire, session=self.session)
+        model["training_weights"] = numpy.asarray(model["training_weights"], dtype=numpy.float64).ravel()
+        self.model = model
+        return self._copy()
+
+    def _copy(self) -> Dict[str, Any]:
+        return {**self.model, "training_weights": self.model["training_weights"].copy()}
+
+
+def submit_update(
+    base: str,
+    client_id: str,
+    round: int,
+    masked_update: NDArray[numpy.float64] | NDArray[numpy.unsignedinteger],
+    metrics: Dict[str, Any],
+    wire: str = "json",
+    session: requests.Session | None = None,
+    members: Iterable[str] | None = None
+) -> requests.Response:
+    http = session or requests
+    # Compressed updates are ring elements and keep their unsigned dtype on the wire.
+    ring: bool = masked_update.dtype.kind == "u"
+    # Edge aggregators name the clients summed into the update.
+    extra: Dict[str, Any] = {"members": list(members)} if members is not None else {}
+    if wire == "json":
+        return http.post(
+            f"{base}/submit-update",
+            json={
+                "client_id": client_id,
+                "round": round,
+                "masked_update": masked_update.tolist() if ring else masked_update.astype(float).tolist(),
+                "metrics": metrics,
+                **extra
+            },
+            timeout=10
+        )
+
+    return http.post(
+        f"{base}/submit-update",
+        data=encode_frame(
+            masked_update,
+            round=round,
+            client_id=client_id,
+            dtype=masked_update.dtype.name if ring else wire,
+            meta={
+                "metrics": metrics,
+                **extra
+            }
+        ),
+        headers={
+            "Content-Type": WIRE_MIMETYPE
+        },
+        timeout=10
+    )
+
+
+def prepare_update(
+    delta: NDArray[numpy.float64],
+    mask_engine: MaskEngine,
+    compressor: ErrorFeedbackCompressor,
+    compression: Dict[str, Any] | None
+) -> NDArray[numpy.float64] | NDArray[numpy.unsignedinteger]:
+    spec: CompressionSpec | None = CompressionSpec.from_dict(compression)
+    if spec is None:
+        return delta + mask_engine.mask()
+    levels: NDArray[numpy.int64] = compressor.compress(delta, spec)
+    return to_ring(levels, mask_engine.ring_mask(), spec)
+
+
+def prepare_correction(
+    mask_engine: MaskEngine,
+    dropped: Iterable[str],
+    compression: Dict[str, Any] | None
+) -> NDArray[numpy.float64] | NDArray[numpy.unsignedinteger]:
+    spec: CompressionSpec | None = CompressionSpec.from_dict(compression)
+    if spec is None:
+        return mask_engine.correction(dropped)
+    length: int = spec.length(mask_engine.dimensions)
+    return to_ring(numpy.zeros(length, dtype=numpy.int64), mask_engine.correction(dropped, ring=True), spec)
+
+
+def recovery_needed(
+    status: Dict[str, Any],
+    client_id: str,
+    training_round: int
+) -> bool:
+    return (
+        status.get("round") == training_round
+        and status.get("phase") == "recovery"
+        and client_id in status.get("received", [])
+        and client_id not in status.get("recovered", [])
+    )
+
+
+def retry_needed(
+    status: Dict[str, Any],
+    client_id: str,
+    training_round: int
+) -> bool:
+    # The server discarded the round and reopened it; the update has to be sent again.
+    return (
+        status.get("round") == training_round
+        and status.get("phase") == "collecting"
+        and client_id in status.get("expected", [])
+        and client_id not in status.get("received", [])
+    )
+
+
+def submit_recovery(
+    base: str,
+    client_id: str,
+    round: int,
+    correction: NDArray[numpy.float64] | NDArray[numpy.unsignedinteger],
+    wire: str = "json",
+    session: requests.Session | None = None
+) -> requests.Response:
+    http = session or requests
+    ring: bool = correction.dtype.kind == "u"
+    if wire == "json":
+        return http.post(
+            f"{base}/submit-recovery",
+            json={
+                "client_id": client_id,
+                "round": round,
+                "correction": correction.tolist() if ring else correction.astype(float).tolist()
+            },
+            timeout=10
+        )
+
+    return http.post(
+        f"{base}/submit-recovery",
+        data=encode_frame(
+            correction,
+            round=round,
+            client_id=client_id,
+            dtype=correction.dtype.name if ring else wire
+        ),
+        headers={
+            "Content-Type": WIRE_MIMETYPE
+        },
+        timeout=10
+    )
 
 
 def client(
@@ -18,79 +245,164 @@ def client(
     samples: int,
     rounds: int,
     learning_rate: float,
-    seed: int
+    seed: int,
+    prg_mode: str = "sha256-ctr",
+    wire: str = "json",
+    local_epochs: int = 1,
+    batch_size: int | None = None,
+    compute_dtype: str = "float64",
+    data_dir: str | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
 ):
     base = server.rstrip("/")
+    session: requests.Session = requests.Session()
 
-    requests.post(
+    session.post(
         f"{base}/register",
         json={
             "client_id": client_id
         }
     )
 
-    feature_weights = requests.get(f"{base}/model").json()
+    models: ModelCache = ModelCache(base, wire, session=session)
+    feature_weights = models.fetch()
     n_features: int = int(feature_weights["feature_weight"])
-    X_matrix, y = generate_dataset_local(
-        samples,
-        n_features,
-        seed + hash(client_id) % 1000
-    )
-    y = numpy.asarray(y, dtype=numpy.float64).ravel()
     model: Logistic = Logistic(n_features)
+    if data_dir:
+        dataset: ChunkedDataset = load_dataset(data_dir, chunk_rows=chunk_rows)
+        print(f"[{client_id}] streaming {dataset.rows} rows from {data_dir} in {dataset.chunk_count} chunks", flush=True)
+        trainer: LocalTrainer = LocalTrainer.from_dataset(
+            model,
+            dataset,
+            batch_size=batch_size,
+            dtype=compute_dtype,
+            seed=seed
+        )
+    else:
+        X_matrix, y = generate_dataset_local(
+            samples,
+            n_features,
+            seed + hash(client_id) % 1000
+        )
+        y = numpy.asarray(y, dtype=numpy.float64).ravel()
+        trainer = LocalTrainer(
+            model,
+            X_matrix,
+            y,
+            batch_size=batch_size,
+            dtype=compute_dtype,
+            seed=seed
+        )
+    mask_engine: MaskEngine = MaskEngine(
+        client_id=client_id,
+        dimensions=n_features + 1,
+        prg_mode=prg_mode,
+        ring=feature_weights.get("compression") is not None
+    )
+    compressor: ErrorFeedbackCompressor = ErrorFeedbackCompressor(n_features + 1, seed=seed)
 
-    for _ in range(int(rounds)):
-        model_info: Dict[str, Any] = requests.get(f"{base}/model").json()
+    last_async_version: int | None = None
+    # Sampled rounds may skip this client, so it also stops once `rounds` server rounds went by.
+    last_round: int | None = None
+    # Upload time is only known after the response, so it is reported with the next update.
+    last_upload: Dict[str, float] = {}
+    completed_rounds: int = 0
+    while completed_rounds < int(rounds):
+        timer: PhaseTimer = PhaseTimer()
+        if last_async_version is not None:
+            # One update per model version; wait for the buffer to publish a new one.
+            wait_for_status(
+                f"{base}/status",
+                predicate=lambda status: int(status.get("round", -1)) > last_async_version,
+                session=session,
+                watch="round_epoch"
+            )
+        with timer.phase("pull"):
+            model_info: Dict[str, Any] = models.fetch()
         weights: NDArray[numpy.float64] = numpy.asarray(
             model_info["training_weights"],
             dtype=numpy.float64
         ).ravel()
         model.set_model_weight(weights)
 
-        while True:
-            st = requests.get(f"{base}/status").json()
-            if st.get("round") == int(model_info["training_round"]) and client_id in st.get("expected", []):
-                break
-            time.sleep(0.5)
+        training_round: int = int(model_info["training_round"])
+        if model_info.get("scheduling") == "async":
+            # No rounds: train on the latest model and push a delta tagged with its version.
+            with timer.phase("train"):
+                delta = trainer.update_local(
+                    epochs=local_epochs,
+                    learning_rate=float(learning_rate)
+                )
+            with timer.phase("upload"):
+                resp = submit_update(
+                    base,
+                    client_id=client_id,
+                    round=training_round,
+                    masked_update=delta,
+                    metrics={
+                        "accuracy": trainer.accuracy(),
+                        "timings": {**last_upload, **timer.timings}
+                    },
+                    wire=wire,
+                    session=session
+                )
+            last_upload = {"upload": timer.timings["upload"]}
+            print(f"[{client_id}] async update on version {training_round}: status={resp.status_code}", flush=True)
+            last_async_version = training_round
+            completed_rounds += 1
+            continue
 
-        delta: NDArray[numpy.float64] = model.update_local(
-            feature_matrix=X_matrix,
-            binary_targets=y,
-            epochs=1,
-            learning_rate=float(learning_rate)
-        )
-        roster_response: Dict[str, Any] = requests.get(f"{base}/roster").json()
-        roster: List[str] = list(roster_response["clients"])
-        dimensions: int = delta.shape[0]
-        mask: NDArray[numpy.float64] = numpy.zeros(
-            dimensions,
-            dtype=numpy.float64
+        if last_round is None:
+            last_round = training_round + int(rounds)
+        if training_round >= last_round:
+            break
+        round_status: Dict[str, Any] = wait_for_status(
+            f"{base}/status",
+            predicate=lambda status: (
+                status.get("round") != training_round
+                or client_id in status.get("expected", [])
+            ),
+            session=session,
+            watch="round_epoch"
         )
+        if round_status.get("round") != training_round:
+            # Not selected for this round; pull the next model.
+            print(f"[{client_id}] sat out round {training_round}", flush=True)
+            continue
 
-        for peer in roster:
-            if peer == client_id:
-                continue
-            seed_bytes: bytes = derive_pair_seed(
-                client_secret=SECRET,
-                identifier_a=client_id,
-                identifier_b=peer
+        participants: List[str] | None = round_status.get("participants")
+        roster_version: int | None = round_status.get("roster_version")
+        # Pair terms are fresh every round, so the mask is rebuilt while training runs.
+        mask_nonce: str = round_status["mask_nonce"]
+        if participants is not None:
+            # Masks only span this round's participants, so clients left out need no correction.
+            with timer.phase("mask"):
+                mask_engine.prepare(roster=participants, nonce=mask_nonce)
+        elif roster_version is None or roster_version != mask_engine.roster_version:
+            with timer.phase("mask"):
+                roster_response: Dict[str, Any] = session.get(f"{base}/roster").json()
+                mask_engine.prepare(
+                    roster=list(roster_response["clients"]),
+                    nonce=mask_nonce,
+                    version=roster_response.get("roster_version")
+                )
+        else:
+            mask_engine.prepare(roster=mask_engine.peers, nonce=mask_nonce, version=roster_version)
+
+        with timer.phase("train"):
+            delta: NDArray[numpy.float64] = trainer.update_local(
+                epochs=local_epochs,
+                learning_rate=float(learning_rate)
             )
-            vector: NDArray[numpy.float64] = pseudo_random_generator(
-                seed=seed_bytes,
-                length=dimensions
+        # Includes waiting for a mask still being generated in the background.
+        with timer.phase("mask"):
+            masked = prepare_update(
+                delta,
+                mask_engine,
+                compressor,
+                model_info.get("compression")
             )
-            mask = mask + vector if client_id < peer else mask - vector
-
-        masked: List[float] = (delta + mask).astype(float).tolist()
-        accuracy: float = float(accuracy_score(y, model.predict(X_matrix)))
-        send_body: Dict[str, Any] = {
-            "client_id": client_id,
-            "round": int(model_info["training_round"]),
-            "masked_update": masked,
-            "metrics": {
-                "accuracy": accuracy
-            }
-        }
+        accuracy: float = trainer.accuracy()
         print(f"[{client_id}] DEBUG about to POST /submit-update; "
             f"round={model_info['training_round']} len={len(masked)} base={base}", flush=True)
 
@@ -101,7 +413,25 @@ def client(
         #
         # response = response.json() if response.content else {}
         #
-        resp = requests.post(f"{base}/submit-update", json=send_body, timeout=10)
+        with timer.phase("upload"):
+            resp = submit_update(
+                base,
+                client_id=client_id,
+                round=int(model_info["training_round"]),
+                masked_update=masked,
+                metrics={
+                    "accuracy": accuracy,
+                    "timings": {**last_upload, **timer.timings}
+                },
+                wire=wire,
+                session=session
+            )
+        last_upload = {"upload": timer.timings["upload"]}
+        print(
+            f"[{client_id}] round {training_round} timings: "
+            + " ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in timer.timings.items()),
+            flush=True
+        )
         print(f"[{client_id}] DEBUG POST status={resp.status_code}", flush=True)
         try:
             rj = resp.json() if resp.content else {}
@@ -125,20 +455,50 @@ def client(
         #     time.sleep(0.5)
 
         target_round = int(model_info["training_round"]) + 1
+        accepted: bool = resp.status_code == 200
+        recovery_sent: bool = False
+        retried: bool = False
         while True:
-            time.sleep(1) 
-            try:
-                current_model_info: Dict[str, Any] = requests.get(f"{base}/model").json()
-                current_round: int = current_model_info["training_round"]
-                if current_round >= target_round:
-                    break
-            except requests.exceptions.ConnectionError:
-                continue
+            round_status = wait_for_status(
+                f"{base}/status",
+                predicate=lambda status: (
+                    int(status.get("round", -1)) >= target_round
+                    or (not recovery_sent and recovery_needed(status, client_id, target_round - 1))
+                    or (accepted and retry_needed(status, client_id, target_round - 1))
+                ),
+                session=session,
+                watch="round_epoch"
+            )
+            if int(round_status.get("round", -1)) >= target_round:
+                break
+            if accepted and retry_needed(round_status, client_id, target_round - 1):
+                retried = True
+                break
 
+            dropped = mask_engine.peers - set(round_status["received"])
+            print(f"[{client_id}] round closed without {sorted(dropped)}; sending mask correction", flush=True)
+            recovery_response = submit_recovery(
+                base,
+                client_id=client_id,
+                round=target_round - 1,
+                correction=prepare_correction(mask_engine, dropped, model_info.get("compression")),
+                wire=wire,
+                session=session
+            )
+            recovery_sent = True
+            if recovery_response.status_code != 200:
+                print(f"[{client_id}] recovery rejected: {recovery_response.text.strip()}", flush=True)
+
+        if retried:
+            print(f"[{client_id}] round {training_round} was reopened; training it again", flush=True)
+            continue
+        completed_rounds += 1
         # accuracy: float = float(accuracy_score(y, model.predict(X_matrix)))
         print(f"[{client_id}] local accuracy \
         after round {model_info['training_round']}: {accuracy: .3f}")
 
+    mask_engine.close()
+
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
 @click.option("--server", default="http://127.0.0.1:8000", show_default=True, help="Base URL for the server.")
@@ -147,14 +507,28 @@ def client(
 @click.option("--rounds", type=int, default=10, show_default=True, help="Number of federated rounds to participate in.")
 @click.option("--lr", type=float, default=0.5, show_default=True, help="Learning rate for local update.")
 @click.option("--seed", type=int, default=1234, show_default=True, help="Base RNG seed for local data generation.")
-def skynet_cli(server: str, client_id: str, samples: int, rounds: int, lr: float, seed: int) -> None:
+@click.option("--prg-mode", "prg_mode", type=click.Choice(PRG_MODES), default="sha256-ctr", show_default=True, help="Mask PRG engine. Must match across all clients.")
+@click.option("--wire", type=click.Choice(WIRE_FORMATS), default="json", show_default=True, help="Update/model wire format. Updates are always sent in this format, with no JSON fallback.")
+@click.option("--local-epochs", "local_epochs", type=int, default=1, show_default=True, help="Local passes over the dataset per round.")
+@click.option("--batch-size", "batch_size", type=int, default=0, show_default=True, help="Mini-batch size for local SGD (0 = full batch).")
+@click.option("--compute-dtype", "compute_dtype", type=click.Choice(COMPUTE_DTYPES), default="float64", show_default=True, help="Floating point precision for local training.")
+@click.option("--data-dir", "data_dir", type=click.Path(exists=True, file_okay=False), default=None, help="Train on an on-disk dataset (see client.dataset) instead of generating --samples rows.")
+@click.option("--chunk-rows", "chunk_rows", type=int, default=DEFAULT_CHUNK_ROWS, show_default=True, help="Rows per chunk when streaming --data-dir.")
+def skynet_cli(server: str, client_id: str, samples: int, rounds: int, lr: float, seed: int, prg_mode: str, wire: str, local_epochs: int, batch_size: int, compute_dtype: str, data_dir: str | None, chunk_rows: int) -> None:
     client(
         server=server,
         client_id=client_id,
         samples=samples,
         rounds=rounds,
         learning_rate=lr,
-        seed=seed
+        seed=seed,
+        prg_mode=prg_mode,
+        wire=wire,
+        local_epochs=local_epochs,
+        batch_size=batch_size or None,
+        compute_dtype=compute_dtype,
+        data_dir=data_dir,
+        chunk_rows=chunk_rows
     )
 
 
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import click
+import numpy
+import pathlib
+from numpy.typing import NDArray
+from typing import Iterator, Tuple
+
+DATASET_FORMATS = ("npy", "raw")
+DEFAULT_CHUNK_ROWS: int = 65_536
+
+
+class ChunkedDataset:
+    def __init__(
+        self,
+        features: NDArray[numpy.floating],
+        targets: NDArray[numpy.integer] | NDArray[numpy.floating],
+        chunk_rows: int = DEFAULT_CHUNK_ROWS
+    ) -> None:
+        if features.ndim != 2 or features.shape[0] != targets.shape[0]:
+            raise ValueError(f"features {features.shape} do not match targets {targets.shape}")
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be >= 1")
+
+        # Either in-memory arrays or numpy.memmap views; chunks are sliced lazily.
+        self.features = features
+        self.targets = targets
+        self.chunk_rows: int = min(int(chunk_rows), max(features.shape[0], 1))
+
+    @property
+    def rows(self) -> int:
+        return self.features.shape[0]
+
+    @property
+    def n_features(self) -> int:
+        return self.features.shape[1]
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.rows // self.chunk_rows)
+
+    def chunk(
+        self,
+        index: int,
+        dtype: numpy.dtype | str = numpy.float64
+    ) -> Tuple[NDArray[numpy.floating], NDArray[numpy.floating]]:
+        start: int = index * self.chunk_rows
+        stop: int = min(start + self.chunk_rows, self.rows)
+        return (
+            numpy.asarray(self.features[start:stop], dtype=dtype),
+            numpy.asarray(self.targets[start:stop], dtype=dtype).ravel()
+        )
+
+    def chunks(
+        self,
+        dtype: numpy.dtype | str = numpy.float64
+    ) -> Iterator[Tuple[NDArray[numpy.floating], NDArray[numpy.floating]]]:
+        for index in range(self.chunk_count):
+            yield self.chunk(index, dtype)
+
+    def in_memory(self) -> bool:
+        return not isinstance(self.features, numpy.memmap)
+
+
+def load_dataset(
+    path: str | pathlib.Path,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> ChunkedDataset:
+    directory: pathlib.Path = pathlib.Path(path)
+
+    if (directory / "features.npy").exists():
+        return ChunkedDataset(
+            numpy.load(directory / "features.npy", mmap_mode="r"),
+            numpy.load(directory / "targets.npy", mmap_mode="r"),
+            chunk_rows=chunk_rows
+        )
+
+    meta_path: pathlib.Path = directory / "meta.json"
+    if not meta_path.exists():
+        raise FileNotFoundError(f"{directory} has neither features.npy nor meta.json")
+
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    rows, n_features = int(meta["rows"]), int(meta["features"])
+    return ChunkedDataset(
+        numpy.memmap(directory / "features.bin", dtype=meta["dtype"], mode="r", shape=(rows, n_features)),
+        numpy.memmap(directory / "targets.bin", dtype=meta["target_dtype"], mode="r", shape=(rows,)),
+        chunk_rows=chunk_rows
+    )
+
+
+def _open_output(
+    directory: pathlib.Path,
+    name: str,
+    dtype: str,
+    shape: Tuple[int, ...],
+    file_format: str
+) -> numpy.memmap:
+    if file_format == "npy":
+        return numpy.lib.format.open_memmap(directory / f"{name}.npy", mode="w+", dtype=dtype, shape=shape)
+    return numpy.memmap(directory / f"{name}.bin", dtype=dtype, mode="w+", shape=shape)
+
+
+def materialize_dataset(
+    directory: str | pathlib.Path,
+    rows: int,
+    n_features: int,
+    seed: int | None,
+    prevalence: float = 0.12,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    file_format: str = "npy"
+) -> ChunkedDataset:
+    # Streams the same RandomState draws as generate_dataset_local in chunks, so
+    # the on-disk dataset is identical to generate_dataset_local(rows, n_features, seed)
+    # without ever holding it in memory.
+    if file_format not in DATASET_FORMATS:
+        raise ValueError(f"Unknown dataset format {file_format!r}. Expected one of {DATASET_FORMATS}")
+
+    output: pathlib.Path = pathlib.Path(directory)
+    output.mkdir(parents=True, exist_ok=True)
+    features = _open_output(output, "features", "<f8", (rows, n_features), file_format)
+    targets = _open_output(output, "targets", "<i1", (rows,), file_format)
+
+    generate_random_seed = numpy.random.RandomState(seed)
+    for start in range(0, rows, chunk_rows):
+        stop: int = min(start + chunk_rows, rows)
+        features[start:stop] = generate_random_seed.normal(0, 1, size=(stop - start, n_features))
+
+    weight = generate_random_seed.normal(0, 0.7, size=(n_features, ))
+    for start in range(0, rows, chunk_rows):
+        stop = min(start + chunk_rows, rows)
+        log_value = features[start:stop] @ weight
+        draw = generate_random_seed.rand(stop - start)
+        targets[start:stop] = draw < prevalence * 1 / (1 + numpy.exp(-log_value))
+
+    for _ in range(int(rows * 0.02)):
+        index_1, index_2 = generate_random_seed.randint(0, rows), generate_random_seed.randint(0, n_features)
+        features[index_1, index_2] += generate_random_seed.uniform(3, 6)
+        targets[index_1] = 1
+
+    features.flush()
+    targets.flush()
+    if file_format == "raw":
+        with open(output / "meta.json", "w") as f:
+            json.dump(
+                {
+                    "rows": rows,
+                    "features": n_features,
+                    "dtype": "<f8",
+                    "target_dtype": "<i1"
+                },
+                f
+            )
+    del features, targets
+    return load_dataset(output, chunk_rows=chunk_rows)
+
+
+@click.group(context_settings={"help_option_names": ["-h", "--help"]})
+def dataset_cli() -> None:
+    """Materialize and inspect on-disk client datasets."""
+
+
+@dataset_cli.command("materialize")
+@click.option("--out", "out_dir", type=click.Path(file_okay=False, writable=True), required=True, help="Output directory.")
+@click.option("--rows", type=int, required=True, help="Number of rows to generate.")
+@click.option("--features", "n_features", type=int, default=12, show_default=True, help="Number of features.")
+@click.option("--seed", type=int, default=1234, show_default=True, help="RNG seed (same meaning as generate_dataset_local).")
+@click.option("--chunk-rows", "chunk_rows", type=int, default=DEFAULT_CHUNK_ROWS, show_default=True, help="Rows generated per chunk.")
+@click.option("--format", "file_format", type=click.Choice(DATASET_FORMATS), default="npy", show_default=True, help="npy files or raw little-endian binary with meta.json.")
+def materialize_cli(out_dir: str, rows: int, n_features: int, seed: int, chunk_rows: int, file_format: str) -> None:
+    time_0 = time.perf_counter()
+    dataset = materialize_dataset(
+        out_dir,
+        rows=rows,
+        n_features=n_features,
+        seed=seed,
+        chunk_rows=chunk_rows,
+        file_format=file_format
+    )
+    size: int = sum(entry.stat().st_size for entry in os.scandir(out_dir))
+    click.echo(
+        f"Wrote {dataset.rows} x {dataset.n_features} ({size / 2 ** 20:.1f} MiB) "
+        f"to {out_dir} in {time.perf_counter() - time_0:.2f}s"
+    )
+
+
+@dataset_cli.command("info")
+@click.argument("path", type=click.Path(exists=True, file_okay=False))
+def info_cli(path: str) -> None:
+    dataset = load_dataset(path)
+    positives: int = sum(int(numpy.count_nonzero(y)) for _, y in dataset.chunks())
+    click.echo(f"rows={dataset.rows} features={dataset.n_features} positives={positives}")
+
+
+if __name__ == "__main__":
+    dataset_cli()
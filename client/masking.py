@@ -0,0 +1,240 @@
+import numpy
+from threading import Lock
+from numpy.typing import NDArray
+from typing import Dict, Iterable, List, Set
+from concurrent.futures import Future, ThreadPoolExecutor
+from models.crypto import (
+    derive_pair_seed,
+    derive_round_seed,
+    pseudo_random_generator,
+    pseudo_random_stream,
+    stream_to_unit_interval
+)
+
+SECRET = b"shared_secret"
+# Pair streams generated per batch in build_masks.
+MASK_BLOCK_ELEMENTS: int = 1 << 22
+
+
+def pair_mask_term(
+    client_id: str,
+    peer: str,
+    seed_bytes: bytes,
+    dimensions: int,
+    prg_mode: str = "sha256-ctr"
+) -> NDArray[numpy.float64]:
+    vector: NDArray[numpy.float64] = pseudo_random_generator(
+        seed=seed_bytes,
+        length=dimensions,
+        mode=prg_mode
+    )
+    return vector if client_id < peer else -vector
+
+
+def build_mask(
+    client_id: str,
+    roster: List[str],
+    dimensions: int,
+    nonce: str,
+    prg_mode: str = "sha256-ctr"
+) -> NDArray[numpy.float64]:
+    mask: NDArray[numpy.float64] = numpy.zeros(
+        dimensions,
+        dtype=numpy.float64
+    )
+
+    for peer in roster:
+        if peer == client_id:
+            continue
+        seed_bytes: bytes = derive_round_seed(
+            derive_pair_seed(
+                client_secret=SECRET,
+                identifier_a=client_id,
+                identifier_b=peer
+            ),
+            nonce
+        )
+        mask += pair_mask_term(client_id, peer, seed_bytes, dimensions, prg_mode)
+
+    return mask
+
+
+def build_masks(
+    client_ids: List[str],
+    dimensions: int,
+    nonce: str,
+    prg_mode: str = "sha256-ctr",
+    secret: bytes = SECRET
+) -> NDArray[numpy.float64]:
+    # build_mask for every client of the roster at once, shape (K, dimensions).
+    # Each pair stream is generated once: added to the lower id's row, subtracted from the higher's.
+    order: List[int] = sorted(range(len(client_ids)), key=client_ids.__getitem__)
+    masks: NDArray[numpy.float64] = numpy.zeros((len(client_ids), dimensions), dtype=numpy.float64)
+    block: int = max(1, MASK_BLOCK_ELEMENTS // max(dimensions, 1))
+    for position, low in enumerate(order):
+        for start in range(position + 1, len(order), block):
+            highs: List[int] = order[start: start + block]
+            terms: NDArray[numpy.float64] = stream_to_unit_interval(
+                numpy.stack([
+                    pseudo_random_stream(
+                        seed=derive_round_seed(derive_pair_seed(secret, client_ids[low], client_ids[high]), nonce),
+                        length=dimensions,
+                        mode=prg_mode
+                    )
+                    for high in highs
+                ])
+            )
+            masks[low] += terms.sum(axis=0)
+            masks[highs] -= terms
+    return masks
+
+
+class MaskEngine:
+    def __init__(
+        self,
+        client_id: str,
+        dimensions: int,
+        prg_mode: str = "sha256-ctr",
+        secret: bytes = SECRET,
+        ring: bool = False
+    ) -> None:
+        self.client_id: str = client_id
+        self.dimensions: int = dimensions
+        self.prg_mode: str = prg_mode
+        self.secret: bytes = secret
+        self.roster_version: int | None = None
+        # The round nonce from /status the current mask was built for.
+        self.nonce: str | None = None
+        self.peers: Set[str] = set()
+        # Pair seeds are cached across rounds; the streams are not.
+        self._seeds: Dict[str, bytes] = {}
+        self._mask: NDArray[numpy.float64] = numpy.zeros(dimensions, dtype=numpy.float64)
+        # Integer masks for compressed updates, summed modulo 2**64 from the same
+        # PRG stream as the float mask; any 2**bits ring is a reduction of it.
+        self._ring_mask: NDArray[numpy.uint64] | None = (
+            numpy.zeros(dimensions, dtype=numpy.uint64) if ring else None
+        )
+        self._lock: Lock = Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: Future | None = None
+
+    def _seed(self, peer: str) -> bytes:
+        seed_bytes: bytes | None = self._seeds.get(peer)
+        if seed_bytes is None:
+            seed_bytes = derive_pair_seed(
+                client_secret=self.secret,
+                identifier_a=self.client_id,
+                identifier_b=peer
+            )
+            self._seeds[peer] = seed_bytes
+        return seed_bytes
+
+    def _stream(self, peer: str, nonce: str) -> NDArray[numpy.uint64]:
+        return pseudo_random_stream(
+            seed=derive_round_seed(self._seed(peer), nonce),
+            length=self.dimensions,
+            mode=self.prg_mode
+        )
+
+    def _apply(self, peer: str, sign: int) -> None:
+        # sign is +1 when the peer joins the roster and -1 when it leaves.
+        stream: NDArray[numpy.uint64] = self._stream(peer, self.nonce)
+        if self.client_id > peer:
+            sign = -sign
+
+        if sign > 0:
+            self._mask += stream_to_unit_interval(stream)
+            if self._ring_mask is not None:
+                numpy.add(self._ring_mask, stream, out=self._ring_mask)
+        else:
+            self._mask -= stream_to_unit_interval(stream)
+            if self._ring_mask is not None:
+                numpy.subtract(self._ring_mask, stream, out=self._ring_mask)
+
+    def update_roster(
+        self,
+        roster: Iterable[str],
+        nonce: str,
+        version: int | None = None
+    ) -> None:
+        with self._lock:
+            if version is not None and version == self.roster_version and nonce == self.nonce:
+                return
+
+            peers: Set[str] = set(roster) - {self.client_id}
+            joined: Set[str] = peers - self.peers
+            left: Set[str] = self.peers - peers
+            if nonce != self.nonce or len(joined) + len(left) > len(peers):
+                # A new round changes every pair term. Within one round, a roster that
+                # shares few peers with the last one is cheaper to build from zero too.
+                self._mask.fill(0.0)
+                if self._ring_mask is not None:
+                    self._ring_mask.fill(0)
+                joined, left = peers, set()
+            self.nonce = nonce
+            # Only pair terms for peers that joined or left are regenerated.
+            for peer in sorted(joined):
+                self._apply(peer, 1)
+            for peer in sorted(left):
+                self._apply(peer, -1)
+
+            self.peers = peers
+            self.roster_version = version
+
+    def prepare(
+        self,
+        roster: Iterable[str],
+        nonce: str,
+        version: int | None = None
+    ) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"mask-{self.client_id}"
+            )
+        self._pending = self._executor.submit(self.update_roster, list(roster), nonce, version)
+        return self._pending
+
+    def mask(self) -> NDArray[numpy.float64]:
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+        with self._lock:
+            return self._mask.copy()
+
+    def ring_mask(self) -> NDArray[numpy.uint64]:
+        if self._ring_mask is None:
+            raise ValueError("MaskEngine was created without ring=True")
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+        with self._lock:
+            return self._ring_mask.copy()
+
+    def correction(
+        self,
+        dropped: Iterable[str],
+        ring: bool = False
+    ) -> NDArray[numpy.float64] | NDArray[numpy.uint64]:
+        # The pair terms this client added for peers that never reported; the
+        # server subtracts them so the surviving masks still cancel.
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+        with self._lock:
+            peers: List[str] = sorted(self.peers.intersection(dropped))
+            nonce: str | None = self.nonce
+        total = numpy.zeros(self.dimensions, dtype=numpy.uint64 if ring else numpy.float64)
+        for peer in peers:
+            stream: NDArray[numpy.uint64] = self._stream(peer, nonce)
+            term = stream if ring else stream_to_unit_interval(stream)
+            if self.client_id < peer:
+                numpy.add(total, term, out=total)
+            else:
+                numpy.subtract(total, term, out=total)
+        return total
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,126 @@
+import json
+import time
+import click
+import numpy
+from numpy.typing import NDArray
+from typing import Any, Dict, List, Tuple
+from models.crypto import PRG_MODES
+from client.masking import build_masks
+from client.data import generate_dataset_local
+from models.trainer import COMPUTE_DTYPES, BatchedTrainer
+from server.model_state import AGGREGATION_MODES, SUBMIT_ACCEPTED, GlobalModelState
+
+
+def stack_datasets(
+    client_ids: List[str],
+    samples: int,
+    n_features: int,
+    seed: int
+) -> Tuple[NDArray[numpy.float64], NDArray[numpy.float64]]:
+    # One generate_dataset_local draw per client, stacked to (K, n, d) and (K, n).
+    X: NDArray[numpy.float64] = numpy.empty((len(client_ids), samples, n_features), dtype=numpy.float64)
+    y: NDArray[numpy.float64] = numpy.empty((len(client_ids), samples), dtype=numpy.float64)
+    for index in range(len(client_ids)):
+        X[index], y[index] = generate_dataset_local(samples, n_features, seed + index)
+    return X, y
+
+
+def export_document(state: GlobalModelState) -> Dict[str, Any]:
+    # Same document as GET /export.
+    training_round, weights = state.model_snapshot()
+    return {
+        "round": training_round,
+        "feature_weight": state.model._dim - 1,
+        "training_weights": weights.tolist(),
+        "history": list(state.history.entries()),
+        "export_time": time.time()
+    }
+
+
+def simulate(
+    clients: int,
+    samples: int = 300,
+    n_features: int = 12,
+    rounds: int = 10,
+    learning_rate: float = 0.5,
+    local_epochs: int = 1,
+    seed: int = 1234,
+    aggregation: str = "streaming",
+    prg_mode: str = "sha256-ctr",
+    masking: bool = True,
+    compute_dtype: str = "float64",
+    state: GlobalModelState | None = None
+) -> GlobalModelState:
+    # A whole federation in one process: every round trains all clients as one batched
+    # operation, masks the deltas, and feeds them through GlobalModelState as /submit-update would.
+    client_ids: List[str] = [f"sim-{index:05d}" for index in range(clients)]
+    X, y = stack_datasets(client_ids, samples, n_features, seed)
+    trainer: BatchedTrainer = BatchedTrainer(X, y, dtype=compute_dtype)
+    state = state or GlobalModelState(feature_weight=n_features, aggregation=aggregation)
+    for client_id in client_ids:
+        state.register(client_id)
+
+    for _ in range(rounds):
+        state.configure_training_round(client_ids)
+        training_round, weights = state.model_snapshot()
+        updates, local_weights = trainer.update_local(weights, epochs=local_epochs, learning_rate=learning_rate)
+        accuracy: NDArray[numpy.float64] = trainer.accuracy(local_weights)
+        if masking:
+            # Pair terms are seeded with the round's nonce, so the masks are rebuilt every round.
+            updates += build_masks(client_ids, n_features + 1, state.mask_nonce, prg_mode)
+
+        for index, client_id in enumerate(client_ids):
+            outcome: str = state.submit_update(
+                client_id,
+                training_round,
+                updates[index],
+                metric={"accuracy": float(accuracy[index])}
+            )
+            if outcome != SUBMIT_ACCEPTED:
+                raise RuntimeError(f"{client_id} rejected in round {training_round}: {outcome}")
+        if state.finish_round_if_complete() is None:
+            raise RuntimeError(f"round {training_round} did not complete")
+    return state
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--clients", type=int, default=100, show_default=True, help="Simulated clients, all participating every round.")
+@click.option("--samples", type=int, default=300, show_default=True, help="Local samples per client.")
+@click.option("--features", "n_features", type=int, default=12, show_default=True, help="Model features (excluding bias).")
+@click.option("--rounds", type=int, default=10, show_default=True)
+@click.option("--lr", "learning_rate", type=float, default=0.5, show_default=True)
+@click.option("--local-epochs", "local_epochs", type=int, default=1, show_default=True)
+@click.option("--seed", type=int, default=1234, show_default=True, help="Client i draws its data with seed + i.")
+@click.option("--aggregation", type=click.Choice(AGGREGATION_MODES), default="streaming", show_default=True)
+@click.option("--prg-mode", "prg_mode", type=click.Choice(PRG_MODES), default="sha256-ctr", show_default=True)
+@click.option("--masking/--no-masking", default=True, show_default=True, help="Pair masks cost O(clients^2) PRG streams per round; they cancel in the sum either way.")
+@click.option("--compute-dtype", "compute_dtype", type=click.Choice(COMPUTE_DTYPES), default="float64", show_default=True)
+@click.option("--out", type=click.Path(dir_okay=False), default="export.json", show_default=True, help="Where to write the /export document.")
+def simulator_cli(clients: int, samples: int, n_features: int, rounds: int, learning_rate: float, local_epochs: int, seed: int, aggregation: str, prg_mode: str, masking: bool, compute_dtype: str, out: str) -> None:
+    time_0 = time.perf_counter()
+    state = simulate(
+        clients=clients,
+        samples=samples,
+        n_features=n_features,
+        rounds=rounds,
+        learning_rate=learning_rate,
+        local_epochs=local_epochs,
+        seed=seed,
+        aggregation=aggregation,
+        prg_mode=prg_mode,
+        masking=masking,
+        compute_dtype=compute_dtype
+    )
+    elapsed: float = time.perf_counter() - time_0
+
+    with open(out, "w", encoding="utf-8") as handle:
+        json.dump(export_document(state), handle, indent=2)
+    accuracies: List[float] = [metric["accuracy"] for metric in state.history[-1]["accuracy"].values()] if rounds else []
+    click.echo(
+        f"{clients} clients x {rounds} rounds in {elapsed:.2f}s ({rounds / elapsed:.1f} rounds/s); "
+        f"mean accuracy {numpy.mean(accuracies) if accuracies else float('nan'):.3f}; export written to {out}"
+    )
+
+
+if __name__ == "__main__":
+    simulator_cli()
@@ -0,0 +1,304 @@
+import json
+import time
+import click
+import numpy
+import requests
+from numpy.typing import NDArray
+from models.models import Logistic
+from models.crypto import PRG_MODES
+from typing import Any, Dict, List, Set
+from requests.adapters import HTTPAdapter
+from models.network import wait_for_status
+from models.trainer import LocalTrainer
+from concurrent.futures import ThreadPoolExecutor
+from client.data import generate_dataset_local
+from client.masking import MaskEngine
+from models.compression import ErrorFeedbackCompressor
+from client.client import (
+    WIRE_FORMATS,
+    ModelCache,
+    prepare_correction,
+    prepare_update,
+    recovery_needed,
+    submit_recovery,
+    submit_update
+)
+
+
+class SimulatedClient:
+    def __init__(
+        self,
+        client_id: str,
+        samples: int,
+        n_features: int,
+        seed: int,
+        prg_mode: str = "sha256-ctr",
+        ring: bool = False
+    ) -> None:
+        self.client_id: str = client_id
+        X_matrix, y = generate_dataset_local(
+            samples,
+            n_features,
+            seed + hash(client_id) % 1000
+        )
+        self.X_matrix: NDArray[numpy.float64] = X_matrix
+        self.y: NDArray[numpy.float64] = numpy.asarray(y, dtype=numpy.float64).ravel()
+        self.model: Logistic = Logistic(n_features)
+        self.trainer: LocalTrainer = LocalTrainer(self.model, self.X_matrix, self.y)
+        self.mask_engine: MaskEngine = MaskEngine(
+            client_id=client_id,
+            dimensions=n_features + 1,
+            prg_mode=prg_mode,
+            ring=ring
+        )
+        self.compressor: ErrorFeedbackCompressor = ErrorFeedbackCompressor(n_features + 1, seed=seed)
+        self.latencies: List[float] = []
+
+
+def pooled_session(pool_size: int) -> requests.Session:
+    session: requests.Session = requests.Session()
+    adapter: HTTPAdapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        pool_block=True
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(numpy.percentile(values, q)) if values else 0.0
+
+
+def _run_client_round(
+    session: requests.Session,
+    base: str,
+    simulated: SimulatedClient,
+    weights: NDArray[numpy.float64],
+    roster: List[str],
+    roster_version: int | None,
+    mask_nonce: str,
+    training_round: int,
+    round_opened: float,
+    learning_rate: float,
+    wire: str,
+    compression: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    time_0 = time.perf_counter()
+    simulated.model.set_model_weight(weights)
+    delta: NDArray[numpy.float64] = simulated.trainer.update_local(
+        epochs=1,
+        learning_rate=learning_rate
+    )
+    time_trained = time.perf_counter()
+
+    simulated.mask_engine.update_roster(roster, mask_nonce, roster_version)
+    masked = prepare_update(delta, simulated.mask_engine, simulated.compressor, compression)
+    time_masked = time.perf_counter()
+
+    accuracy: float = simulated.trainer.accuracy()
+    response: requests.Response = submit_update(
+        base,
+        client_id=simulated.client_id,
+        round=training_round,
+        masked_update=masked,
+        metrics={
+            "accuracy": accuracy
+        },
+        wire=wire,
+        session=session
+    )
+    time_done = time.perf_counter()
+
+    latency: float = time_done - round_opened
+    simulated.latencies.append(latency)
+    return {
+        "client_id": simulated.client_id,
+        "ok": response.status_code == 200,
+        "train_seconds": time_trained - time_0,
+        "mask_seconds": time_masked - time_trained,
+        "upload_seconds": time_done - time_masked,
+        "latency_seconds": latency
+    }
+
+
+def swarm(
+    server: str,
+    clients: int,
+    samples: int,
+    rounds: int,
+    learning_rate: float,
+    seed: int,
+    prg_mode: str = "sha256-ctr",
+    wire: str = "json",
+    concurrency: int = 32,
+    prefix: str = "sim-"
+) -> Dict[str, Any]:
+    base: str = server.rstrip("/")
+    session: requests.Session = pooled_session(concurrency)
+    client_ids: List[str] = [f"{prefix}{index:05d}" for index in range(clients)]
+
+    models: ModelCache = ModelCache(base, wire, session=session)
+    initial_model: Dict[str, Any] = models.fetch()
+    n_features: int = int(initial_model["feature_weight"])
+    ring: bool = initial_model.get("compression") is not None
+    if initial_model.get("scheduling") == "async":
+        raise ValueError("swarm drives synchronous rounds; run client.client against an async server")
+    simulated: Dict[str, SimulatedClient] = {
+        client_id: SimulatedClient(client_id, samples, n_features, seed, prg_mode, ring)
+        for client_id in client_ids
+    }
+
+    round_reports: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(
+            lambda client_id: session.post(f"{base}/register", json={"client_id": client_id}),
+            client_ids
+        ))
+        print(f"[swarm] registered {len(client_ids)} clients", flush=True)
+
+        ours: Set[str] = set(client_ids)
+        roster: List[str] = []
+        roster_version: int | None = None
+        for _ in range(int(rounds)):
+            model_info: Dict[str, Any] = models.fetch()
+            training_round: int = int(model_info["training_round"])
+            weights: NDArray[numpy.float64] = numpy.asarray(
+                model_info["training_weights"],
+                dtype=numpy.float64
+            ).ravel()
+
+            status: Dict[str, Any] = wait_for_status(
+                f"{base}/status",
+                predicate=lambda status: (
+                    status.get("round") == training_round
+                    and not ours.isdisjoint(status.get("expected", []))
+                ),
+                session=session,
+                watch="round_epoch"
+            )
+            round_opened: float = time.perf_counter()
+            participants: List[str] = sorted(ours.intersection(status["expected"]))
+            if roster_version is None or status.get("roster_version") != roster_version:
+                roster_response: Dict[str, Any] = session.get(f"{base}/roster").json()
+                roster = list(roster_response["clients"])
+                roster_version = roster_response.get("roster_version")
+
+            results: List[Dict[str, Any]] = list(executor.map(
+                lambda client_id: _run_client_round(
+                    session,
+                    base,
+                    simulated[client_id],
+                    weights,
+                    roster,
+                    roster_version,
+                    status["mask_nonce"],
+                    training_round,
+                    round_opened,
+                    float(learning_rate),
+                    wire,
+                    model_info.get("compression")
+                ),
+                participants
+            ))
+
+            recovered: Set[str] = set()
+            while True:
+                status = wait_for_status(
+                    f"{base}/status",
+                    predicate=lambda status: int(status.get("round", -1)) > training_round or any(
+                        recovery_needed(status, client_id, training_round)
+                        for client_id in participants if client_id not in recovered
+                    ),
+                    session=session,
+                    watch="round_epoch"
+                )
+                if int(status.get("round", -1)) > training_round:
+                    break
+
+                survivors: Set[str] = set(status["received"])
+                pending: List[str] = [
+                    client_id for client_id in participants
+                    if client_id not in recovered and recovery_needed(status, client_id, training_round)
+                ]
+                list(executor.map(
+                    lambda client_id: submit_recovery(
+                        base,
+                        client_id=client_id,
+                        round=training_round,
+                        correction=prepare_correction(
+                            simulated[client_id].mask_engine,
+                            simulated[client_id].mask_engine.peers - survivors,
+                            model_info.get("compression")
+                        ),
+                        wire=wire,
+                        session=session
+                    ),
+                    pending
+                ))
+                recovered.update(pending)
+            latencies: List[float] = [result["latency_seconds"] for result in results]
+            round_report: Dict[str, Any] = {
+                "round": training_round,
+                "participants": len(participants),
+                "accepted": sum(1 for result in results if result["ok"]),
+                "round_seconds": time.perf_counter() - round_opened,
+                "latency_p50": _percentile(latencies, 50),
+                "latency_p95": _percentile(latencies, 95),
+                "latency_max": max(latencies, default=0.0),
+                "train_seconds_mean": float(numpy.mean([result["train_seconds"] for result in results])) if results else 0.0,
+                "mask_seconds_mean": float(numpy.mean([result["mask_seconds"] for result in results])) if results else 0.0,
+                "upload_seconds_mean": float(numpy.mean([result["upload_seconds"] for result in results])) if results else 0.0
+            }
+            round_reports.append(round_report)
+            print(
+                f"[swarm] round={training_round} accepted={round_report['accepted']}/{len(participants)} "
+                f"p50={round_report['latency_p50']:.3f}s p95={round_report['latency_p95']:.3f}s "
+                f"round={round_report['round_seconds']:.3f}s",
+                flush=True
+            )
+
+    return {
+        "clients": clients,
+        "rounds": round_reports,
+        "per_client_mean_latency": {
+            client_id: float(numpy.mean(state.latencies)) if state.latencies else None
+            for client_id, state in simulated.items()
+        }
+    }
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--server", default="http://127.0.0.1:8000", show_default=True, help="Base URL for the server.")
+@click.option("--clients", type=int, default=100, show_default=True, help="Number of logical clients to simulate in this process.")
+@click.option("--prefix", default="sim-", show_default=True, help="Client id prefix.")
+@click.option("--samples", type=int, default=300, show_default=True, help="Number of local samples per client.")
+@click.option("--rounds", type=int, default=10, show_default=True, help="Number of federated rounds to participate in.")
+@click.option("--lr", type=float, default=0.5, show_default=True, help="Learning rate for local update.")
+@click.option("--seed", type=int, default=1234, show_default=True, help="Base RNG seed for local data generation.")
+@click.option("--concurrency", type=int, default=32, show_default=True, help="Worker threads and pooled keep-alive connections.")
+@click.option("--prg-mode", "prg_mode", type=click.Choice(PRG_MODES), default="sha256-ctr", show_default=True, help="Mask PRG engine. Must match across all clients.")
+@click.option("--wire", type=click.Choice(WIRE_FORMATS), default="json", show_default=True, help="Update/model wire format.")
+@click.option("--report", "report_path", type=click.Path(dir_okay=False, writable=True), default=None, help="Write the latency report as JSON to this path.")
+def swarm_cli(server: str, clients: int, prefix: str, samples: int, rounds: int, lr: float, seed: int, concurrency: int, prg_mode: str, wire: str, report_path: str | None) -> None:
+    report = swarm(
+        server=server,
+        clients=clients,
+        samples=samples,
+        rounds=rounds,
+        learning_rate=lr,
+        seed=seed,
+        prg_mode=prg_mode,
+        wire=wire,
+        concurrency=concurrency,
+        prefix=prefix
+    )
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Report saved: {report_path}")
+
+
+if __name__ == "__main__":
+    swarm_cli()
@@ -2,54 +2,145 @@ import time
 import click
 import requests
 from typing import Any, Dict, List
+from models.network import wait_for_status
+from server.selection import SELECTION_STRATEGIES
+
+RECOVERY_GRACE_SECONDS: float = 30.0
+# "server" hands the whole run to /schedule-rounds; "controller" drives every round itself.
+ROUND_DRIVERS = ("server", "controller")
+
+
+def follow_schedule(
+    base: str,
+    rounds: int,
+    participants: List[str],
+    quorum: int = 0,
+    deadline: float = 120.0,
+    selection: Dict[str, Any] | None = None
+) -> List[float]:
+    # Sets the policy once; the server finalizes each round on quorum and opens the
+    # next in the same step, so all that is left here is watching the round counter.
+    response: requests.Response = requests.post(
+        f"{base}/schedule-rounds",
+        json={
+            "rounds": rounds,
+            "participants": participants,
+            "quorum": quorum or None,
+            "deadline": deadline or None,
+            "recovery_timeout": RECOVERY_GRACE_SECONDS,
+            "selection": selection
+        }
+    )
+    if response.status_code != 200:
+        print(f"Schedule rejected: {response.text.strip()}")
+        return []
+    schedule: Dict[str, Any] = response.json()["schedule"]
+    until: int = int(schedule["until"])
+    current: int = until - int(rounds)
+    sampled: str = f", {selection['strategy']} selection" if selection else ""
+    print(f"[Schedule] rounds {current}..{until - 1} for {len(participants)} participants{sampled}")
+
+    per_round_time: List[float] = []
+    time_0 = time.perf_counter()
+    while current < until:
+        status: Dict[str, Any] = wait_for_status(
+            f"{base}/status",
+            predicate=lambda snapshot, seen=current: int(snapshot.get("round", -1)) > seen or snapshot.get("schedule") is None,
+            watch="round_epoch"
+        )
+        time_1 = time.perf_counter()
+        finished: int = min(int(status["round"]), until) - current
+        if finished > 0:
+            # Rounds that completed between two polls share the elapsed time.
+            per_round_time.extend([(time_1 - time_0) / finished] * finished)
+            current += finished
+            time_0 = time_1
+            retries: int = int((status.get("schedule") or {}).get("retries", 0))
+            print(f"[Round {current - 1}] aggregated. Now round={current}" + (f" ({retries} retried)" if retries else ""))
+            if selection and current < until:
+                print(f"[Round {current}] selected {status.get('expected', [])}")
+        if status.get("schedule") is None and current < until:
+            print(f"[Schedule] stopped by the server at round {current}: {status.get('schedule_error')}")
+            break
+    return per_round_time
 
 
 def coordinator(
     server: str,
     rounds: int,
-    minimum_clients_registered: int
-):
+    minimum_clients_registered: int,
+    quorum: int = 0,
+    deadline: float = 120.0,
+    driver: str = "server",
+    selection: Dict[str, Any] | None = None
+) -> List[float]:
+    if driver not in ROUND_DRIVERS:
+        raise ValueError(f"Unknown round driver {driver!r}. Expected one of {ROUND_DRIVERS}")
     base: str = server.rstrip("/")
     per_round_time: List[float] = []
     time_total_0 = time.perf_counter()
 
-    while True:
-        roster_response: Dict[str, Any] = requests.get(f"{base}/roster").json()
-        client_roster: List[str] = list(roster_response["clients"])
-        if len(client_roster) >= minimum_clients_registered:
-            print("Roster:", client_roster)
-            break
-        print("💤 Waiting for clients...")
-        time.sleep(1)
-
-    for round in range(int(rounds)):
-        time_0 = time.perf_counter()
-        configure_round: Dict[str, Any] = requests.post(
-            f"{base}/configure-training-round", json={"participants": client_roster}
-        ).json()
-        print(f"[Round {round}] configured {configure_round['participants']}")
+    print("💤 Waiting for clients...")
+    roster_status: Dict[str, Any] = wait_for_status(
+        f"{base}/status",
+        predicate=lambda status: len(status.get("registered", [])) >= minimum_clients_registered
+    )
+    client_roster: List[str] = list(roster_status["registered"])
+    print("Roster:", client_roster)
+    asynchronous: bool = roster_status.get("scheduling") == "async"
+    start_version: int = int(roster_status.get("round", 0))
 
-        time_wait_0 = time.perf_counter()
+    if driver == "server" and not asynchronous:
+        per_round_time = follow_schedule(base, int(rounds), client_roster, quorum, deadline, selection)
+    else:
+        for round in range(int(rounds)):
+            time_0 = time.perf_counter()
+            if asynchronous:
+                # Clients push whenever they are ready; the server publishes a new
+                # model version every buffer_size updates, so only watch for those.
+                version_status: Dict[str, Any] = wait_for_status(
+                    f"{base}/status",
+                    predicate=lambda status, target=start_version + round: int(status.get("round", -1)) > target,
+                    watch="round_epoch"
+                )
+                per_round_time.append(time.perf_counter() - time_0)
+                print(f"[Version {version_status['round']}] published")
+                continue
 
-        while True:
-            status_response: Dict[str, Any] = requests.get(f"{base}/status").json()
-            received: List[str] = list(status_response["received"])
-            expected: List[str] = list(status_response["expected"])
-            print(f"[Round {round}] received {len(received)}/{len(expected)} updates.", end="\r")
-            if set(received) == set(expected):
-                break
+            configure_round: Dict[str, Any] = requests.post(
+                f"{base}/configure-training-round",
+                json={
+                    "participants": client_roster,
+                    "quorum": quorum or None,
+                    "deadline": deadline,
+                    "selection": selection
+                }
+            ).json()
+            print(f"[Round {round}] configured {configure_round['participants']}")
 
-            if time.perf_counter() - time_wait_0 > 120:
-                print(f"\n[Round {round}] timeout waiting for updates -> proceeding...")
-                break
+            def round_ready(status_response: Dict[str, Any]) -> bool:
+                received: List[str] = list(status_response["received"])
+                expected: List[str] = list(status_response["expected"])
+                print(f"[Round {round}] received {len(received)}/{len(expected)} updates ({status_response.get('phase')}).", end="\r")
+                return status_response.get("phase") == "ready"
 
-            time.sleep(0.5)
+            # The server closes the round on quorum or deadline; survivors then send mask corrections.
+            if wait_for_status(f"{base}/status", predicate=round_ready, timeout=deadline + RECOVERY_GRACE_SECONDS) is None:
+                status_response: Dict[str, Any] = requests.get(f"{base}/status").json()
+                if status_response.get("phase") == "collecting":
+                    missing: List[str] = sorted(set(status_response["expected"]) - set(status_response["received"]))
+                    print(f"\n[Round {round}] too few updates by the deadline -> dropping {missing} and proceeding...")
+                    requests.post(f"{base}/drop-participants", json={"participants": missing})
+                if wait_for_status(f"{base}/status", predicate=round_ready, timeout=RECOVERY_GRACE_SECONDS) is None:
+                    print(f"\n[Round {round}] mask recovery did not complete -> aborting round")
+                    requests.post(f"{base}/abort-round")
+                    continue
 
-        completed: Dict[str, Any] = requests.post(f"{base}/finish-round").json()
-        time_1 = time.perf_counter()
-        time_elapsed = time_1 - time_0
-        per_round_time.append(time_elapsed)
-        print(f"\n[Round {round}] aggregated. Now round={completed['round']}")
+            completed: Dict[str, Any] = requests.post(f"{base}/finish-round").json()
+            time_1 = time.perf_counter()
+            time_elapsed = time_1 - time_0
+            per_round_time.append(time_elapsed)
+            print(f"\n[Round {round}] aggregated. Now round={completed['round']}")
 
     time_total_1 = time.perf_counter()
     model = requests.get(f"{base}/model").json()
@@ -59,9 +150,9 @@ def coordinator(
     print("\n===== TRAINING SUMMARY =====")
     print(f"Rounds run           : {rounds}")
     if per_round_time:
-        print(f"Time per round (s)   : {', '.join(f'{second:.2f}' for second in per_round_time)}")
+        print(f"Time per round (s)   : {', '.join(f'{second:.3f}' for second in per_round_time)}")
         print(f"Total time (s)       : {time_total_1 - time_total_0:.2f}")
-        print(f"Avg round time (s)   : {sum(per_round_time)/len(per_round_time):.2f}")
+        print(f"Avg round time (s)   : {sum(per_round_time)/len(per_round_time):.3f}")
     print(f"Final server round   : {model.get('training_round')}")
     print(f"Weight vector length : {len(weight)}")
     print(f"||w||₂               : {weight_normal:.4f}")
@@ -70,17 +161,38 @@ def coordinator(
         print(f"First 5 weights      : [{head}{', …' if len(weight) > 5 else ''}]")
     print(f"Export URL           : {base}/export  (JSON download)\n")
     print("✅ Training finished.")
+    return per_round_time
 
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
 @click.option("--server", default="http://127.0.0.1:8000", show_default=True, help="Base URL of the federated server.")
 @click.option("--rounds", type=int, default=10, show_default=True, help="Number of training rounds to run.")
 @click.option("--min-clients", "min_clients", type=int, default=3, show_default=True, help="Minimum number of clients required to start.")
-def controller_cli(server: str, rounds: int, min_clients: int) -> None:
+@click.option("--quorum", type=int, default=0, show_default=True, help="Close a round as soon as this many updates arrived (0 = wait for every participant).")
+@click.option("--deadline", type=float, default=120.0, show_default=True, help="Seconds after which the server closes a round with the updates it has.")
+@click.option("--driver", type=click.Choice(ROUND_DRIVERS), default="server", show_default=True, help="server: the server runs every round from one schedule; controller: configure and finish each round from here.")
+@click.option("--selection", "strategy", type=click.Choice(SELECTION_STRATEGIES), default="all", show_default=True, help="all: every registered client each round; uniform: a random sample; latency: clients whose past updates arrived fastest.")
+@click.option("--fraction", type=float, default=1.0, show_default=True, help="Share of the roster a round needs (uniform/latency).")
+@click.option("--min-participants", "min_participants", type=int, default=2, show_default=True, help="Lower bound on the clients a round needs (at least 2, so every update stays masked).")
+@click.option("--overprovision", type=float, default=0.0, show_default=True, help="Invite this many more clients (0.3 = 30%) and close the round on the first arrivals.")
+@click.option("--target-seconds", "target_seconds", type=float, default=None, help="latency: sample among clients expected to report within this many seconds.")
+@click.option("--seed", type=int, default=None, help="Seed for reproducible sampling.")
+def controller_cli(server: str, rounds: int, min_clients: int, quorum: int, deadline: float, driver: str, strategy: str, fraction: float, min_participants: int, overprovision: float, target_seconds: float | None, seed: int | None) -> None:
     coordinator(
         server=server,
         rounds=rounds,
-        minimum_clients_registered=min_clients
+        minimum_clients_registered=min_clients,
+        quorum=quorum,
+        deadline=deadline,
+        driver=driver,
+        selection=None if strategy == "all" else {
+            "strategy": strategy,
+            "fraction": fraction,
+            "min_participants": min_participants,
+            "overprovision": overprovision,
+            "target_seconds": target_seconds,
+            "seed": seed
+        }
     )
 
 
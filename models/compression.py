@@ -0,0 +1,187 @@
+import numpy
+from numpy.typing import NDArray
+from typing import Any, Dict, NamedTuple, Tuple
+
+COMPRESSION_SCHEMES = ("none", "topk", "q8", "sign")
+
+# Largest quantization level a single client can send for each scheme.
+QUANTIZATION_LEVELS: Dict[str, int] = {
+    "topk": 127,
+    "q8": 127,
+    "sign": 1,
+}
+DEFAULT_RING_BITS: Dict[str, int] = {
+    "topk": 16,
+    "q8": 16,
+    "sign": 8,
+}
+DEFAULT_SCALES: Dict[str, float] = {
+    "topk": 1.0 / 127,
+    "q8": 1.0 / 127,
+    "sign": 0.05,
+}
+RING_DTYPES: Dict[int, str] = {
+    8: "uint8",
+    16: "uint16",
+    32: "uint32",
+}
+
+
+class CompressionSpec(NamedTuple):
+    scheme: str
+    bits: int
+    scale: float
+    indices: Tuple[int, ...] | None = None
+
+    @property
+    def levels(self) -> int:
+        return QUANTIZATION_LEVELS[self.scheme]
+
+    @property
+    def modulus(self) -> int:
+        return 1 << self.bits
+
+    @property
+    def ring_dtype(self) -> str:
+        return RING_DTYPES[self.bits]
+
+    def length(self, dimensions: int) -> int:
+        return len(self.indices) if self.indices is not None else dimensions
+
+    def max_participants(self) -> int:
+        # Signed sums of levels must stay inside the ring to decode correctly.
+        return (self.modulus // 2 - 1) // self.levels
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "scheme": self.scheme,
+            "bits": self.bits,
+            "scale": self.scale,
+            "indices": list(self.indices) if self.indices is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any] | None) -> "CompressionSpec | None":
+        if not data or data.get("scheme", "none") == "none":
+            return None
+        indices = data.get("indices")
+        return cls(
+            scheme=data["scheme"],
+            bits=int(data["bits"]),
+            scale=float(data["scale"]),
+            indices=tuple(int(index) for index in indices) if indices is not None else None
+        )
+
+
+def make_spec(
+    scheme: str,
+    dimensions: int,
+    bits: int | None = None,
+    scale: float | None = None,
+    ratio: float = 0.1,
+    previous_update: NDArray[numpy.float64] | None = None,
+    round: int = 0
+) -> CompressionSpec | None:
+    if scheme not in COMPRESSION_SCHEMES:
+        raise ValueError(f"Unknown compression scheme {scheme!r}. Expected one of {COMPRESSION_SCHEMES}")
+    if scheme == "none":
+        return None
+
+    bits = bits or DEFAULT_RING_BITS[scheme]
+    if bits not in RING_DTYPES:
+        raise ValueError(f"Unsupported ring width {bits}. Expected one of {tuple(RING_DTYPES)}")
+
+    indices: Tuple[int, ...] | None = None
+    if scheme == "topk":
+        indices = select_coordinates(dimensions, ratio, previous_update, round)
+    return CompressionSpec(scheme, bits, float(scale or DEFAULT_SCALES[scheme]), indices)
+
+
+def select_coordinates(
+    dimensions: int,
+    ratio: float,
+    previous_update: NDArray[numpy.float64] | None,
+    round: int
+) -> Tuple[int, ...]:
+    # Pairwise masks only cancel when every client sends the same coordinates,
+    # so the server picks them: half by magnitude of the last global update, the
+    # rest from a window sliding over a fixed permutation so that every
+    # coordinate is sent at least once every dimensions / (k / 2) rounds.
+    k: int = min(dimensions, max(1, int(numpy.ceil(ratio * dimensions))))
+    chosen: NDArray[numpy.int64] = numpy.empty(0, dtype=numpy.int64)
+    if previous_update is not None and numpy.any(previous_update):
+        top: int = k - k // 2
+        chosen = numpy.argpartition(-numpy.abs(previous_update), top - 1)[:top]
+
+    fill: int = k - len(chosen)
+    order: NDArray[numpy.int64] = numpy.random.RandomState(dimensions).permutation(dimensions)
+    order = numpy.roll(order, -((round * fill) % dimensions))
+    order = order[~numpy.isin(order, chosen)][:fill]
+    return tuple(int(index) for index in numpy.sort(numpy.concatenate([chosen, order])))
+
+
+class ErrorFeedbackCompressor:
+    def __init__(
+        self,
+        dimensions: int,
+        seed: int | None = None
+    ) -> None:
+        self.dimensions: int = dimensions
+        # Whatever quantization or sparsification drops is carried into the next round.
+        self.residual: NDArray[numpy.float64] = numpy.zeros(dimensions, dtype=numpy.float64)
+        self._rng = numpy.random.default_rng(seed)
+
+    def compress(
+        self,
+        delta: NDArray[numpy.float64],
+        spec: CompressionSpec
+    ) -> NDArray[numpy.int64]:
+        corrected: NDArray[numpy.float64] = self.residual + delta
+        values = corrected[list(spec.indices)] if spec.indices is not None else corrected
+
+        if spec.scheme == "sign":
+            levels: NDArray[numpy.int64] = numpy.where(values >= 0, 1, -1).astype(numpy.int64)
+        else:
+            scaled: NDArray[numpy.float64] = values / spec.scale
+            floor: NDArray[numpy.float64] = numpy.floor(scaled)
+            # Stochastic rounding keeps the quantizer unbiased.
+            floor += self._rng.random(scaled.shape) < (scaled - floor)
+            levels = numpy.clip(floor, -spec.levels, spec.levels).astype(numpy.int64)
+
+        self.residual = corrected
+        self.residual -= decompress(levels, spec, self.dimensions)
+        return levels
+
+
+def decompress(
+    levels: NDArray[numpy.integer],
+    spec: CompressionSpec,
+    dimensions: int
+) -> NDArray[numpy.float64]:
+    values: NDArray[numpy.float64] = levels.astype(numpy.float64) * spec.scale
+    if spec.indices is None:
+        return values
+    dense: NDArray[numpy.float64] = numpy.zeros(dimensions, dtype=numpy.float64)
+    dense[list(spec.indices)] = values
+    return dense
+
+
+def to_ring(
+    levels: NDArray[numpy.int64],
+    ring_mask: NDArray[numpy.uint64],
+    spec: CompressionSpec
+) -> NDArray[numpy.unsignedinteger]:
+    # Arithmetic is modulo 2**64; reducing to 2**bits afterwards is consistent
+    # because 2**bits divides 2**64.
+    masked: NDArray[numpy.uint64] = levels.astype(numpy.uint64) + ring_mask[:len(levels)]
+    masked &= numpy.uint64(spec.modulus - 1)
+    return masked.astype(spec.ring_dtype)
+
+
+def ring_sum_to_levels(
+    total: NDArray[numpy.uint64],
+    spec: CompressionSpec
+) -> NDArray[numpy.int64]:
+    reduced: NDArray[numpy.int64] = (total & numpy.uint64(spec.modulus - 1)).astype(numpy.int64)
+    reduced[reduced >= spec.modulus // 2] -= spec.modulus
+    return reduced
@@ -2,14 +2,22 @@ import numpy
 import hashlib
 from numpy.typing import NDArray
 
+PRG_MODES = ("sha256-ctr", "shake256")
+PRG_BLOCK_COUNTERS: int = 4096
+_U64_SCALE: float = float(2 ** 64)
 
-def pseudo_random_generator(
+
+def _check_length(length: int) -> None:
+    if length < 0:
+        raise ValueError("Length invalid. Must be > 0")
+
+
+def _reference_pseudo_random_generator(
     seed: bytes,
     length: int
 ) -> NDArray[numpy.float64]:
 
-    if length < 0:
-        raise ValueError("Length invalid. Must be > 0")
+    _check_length(length)
 
     output: NDArray[numpy.float64] = numpy.empty(length, dtype=numpy.float64)
     counter: int = 0
@@ -32,6 +40,80 @@ def pseudo_random_generator(
     return output
 
 
+def _sha256_counter_stream(
+    seed: bytes,
+    length: int
+) -> NDArray[numpy.uint64]:
+    output: NDArray[numpy.uint64] = numpy.empty(length, dtype=numpy.uint64)
+    if length == 0:
+        return output
+
+    seeded = hashlib.sha256(seed)
+    digests: int = -(-length // 4)
+    index: int = 0
+
+    for block_start in range(0, digests, PRG_BLOCK_COUNTERS):
+        block_end: int = min(block_start + PRG_BLOCK_COUNTERS, digests)
+        block = bytearray()
+        for counter in range(block_start, block_end):
+            hasher = seeded.copy()
+            hasher.update(counter.to_bytes(4, "big"))
+            block += hasher.digest()
+
+        count: int = min(len(block) // 8, length - index)
+        output[index: index + count] = numpy.frombuffer(
+            block,
+            dtype=">u8",
+            count=count
+        )
+        index += count
+
+    return output
+
+
+def _shake256_stream(
+    seed: bytes,
+    length: int
+) -> NDArray[numpy.uint64]:
+    return numpy.frombuffer(
+        hashlib.shake_256(b"skynet|prg|" + seed).digest(8 * length),
+        dtype="<u8",
+        count=length
+    )
+
+
+def pseudo_random_stream(
+    seed: bytes,
+    length: int,
+    mode: str = "sha256-ctr"
+) -> NDArray[numpy.uint64]:
+
+    _check_length(length)
+
+    if mode == "sha256-ctr":
+        return _sha256_counter_stream(seed, length)
+    if mode == "shake256":
+        return _shake256_stream(seed, length)
+    raise ValueError(f"Unknown PRG mode {mode!r}. Expected one of {PRG_MODES}")
+
+
+def stream_to_unit_interval(stream: NDArray[numpy.uint64]) -> NDArray[numpy.float64]:
+    # uint64 -> float64 rounds to nearest and the division by 2**64 is exact,
+    # so this matches the per-element `int / 2**64` of the reference loop.
+    output: NDArray[numpy.float64] = stream.astype(numpy.float64)
+    output /= _U64_SCALE
+    output -= 0.5
+    return output
+
+
+def pseudo_random_generator(
+    seed: bytes,
+    length: int,
+    mode: str = "sha256-ctr"
+) -> NDArray[numpy.float64]:
+    return stream_to_unit_interval(pseudo_random_stream(seed, length, mode))
+
+
 def derive_pair_seed(
     client_secret: bytes,
     identifier_a: str,
@@ -41,3 +123,13 @@ def derive_pair_seed(
     low, high = sorted([identifier_a, identifier_b])
     material: bytes = client_secret + b"|pair|" + low.encode() + b"|" + high.encode()
     return hashlib.sha256(material).digest()
+
+
+def derive_round_seed(
+    pair_seed: bytes,
+    nonce: str
+) -> bytes:
+
+    # A fresh stream per round attempt: a correction revealing one round's pair
+    # term says nothing about the same pair's term in any other round.
+    return hashlib.sha256(pair_seed + b"|round|" + nonce.encode()).digest()
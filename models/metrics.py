@@ -0,0 +1,155 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+PROMETHEUS_MIMETYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+LOCK_BUCKETS: Tuple[float, ...] = (
+    0.000001, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0
+)
+BYTES_BUCKETS: Tuple[float, ...] = tuple(float(4 ** power) for power in range(5, 15))
+CLIENT_PHASES = ("pull", "train", "mask", "upload")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs: List[str] = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    # Cumulative buckets in the Prometheus text format, one series per label set.
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+        labels: Tuple[str, ...] = ()
+    ) -> None:
+        self.name: str = name
+        self.help: str = help
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.labels: Tuple[str, ...] = labels
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index: int = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series: List[float] | None = self._series.get(label_values)
+            if series is None:
+                # Bucket counts, then +Inf, sum.
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        time_0: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - time_0, *label_values)
+
+    def count(self, *label_values: str) -> int:
+        with self._lock:
+            series: List[float] | None = self._series.get(label_values)
+            return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines: List[str] = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            cumulative: float = 0.0
+            for bound, bucket in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += bucket
+                le: str = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {int(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {int(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+        labels: Tuple[str, ...] = ()
+    ) -> Histogram:
+        # Returns the existing histogram when the name is already registered.
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, help, buckets, labels)
+            return self._histograms[name]
+
+    def render(self) -> str:
+        with self._lock:
+            histograms: List[Histogram] = list(self._histograms.values())
+        return "\n".join(line for histogram in histograms for line in histogram.render()) + "\n"
+
+
+REGISTRY: MetricsRegistry = MetricsRegistry()
+
+
+class TimedLock:
+    # A Lock that records how long callers wait for it and how long they hold it.
+    # Also usable as the lock of a threading.Condition.
+    def __init__(self, wait: Histogram, hold: Histogram) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._wait: Histogram = wait
+        self._hold: Histogram = hold
+        self._owner: int | None = None
+        self._acquired_at: float = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        time_0: float = time.perf_counter()
+        acquired: bool = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self._acquired_at = time.perf_counter()
+            self._owner = threading.get_ident()
+            self._wait.observe(self._acquired_at - time_0)
+        return acquired
+
+    def release(self) -> None:
+        held: float = time.perf_counter() - self._acquired_at
+        self._owner = None
+        self._lock.release()
+        self._hold.observe(held)
+
+    def _is_owned(self) -> bool:
+        return self._owner == threading.get_ident()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+class PhaseTimer:
+    # Wall-clock seconds per named phase of one round.
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        time_0: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - time_0
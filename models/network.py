@@ -1,22 +1,162 @@
+import json
 import time
+import numpy
+import struct
 import requests
-from typing import Any, Mapping
+from numpy.typing import NDArray
+from typing import Any, Callable, Dict, Mapping, NamedTuple
 
+LONG_POLL_SECONDS: float = 25.0
 
-def wait_for_key(
+WIRE_MIMETYPE: str = "application/x-skynet-tensor"
+WIRE_DTYPE_HEADER: str = "X-Skynet-Dtype"
+WIRE_MAGIC: bytes = b"SKYT"
+WIRE_VERSION: int = 1
+
+# code -> (name, little-endian numpy dtype)
+WIRE_DTYPES: Dict[int, tuple] = {
+    1: ("float64", "<f8"),
+    2: ("float32", "<f4"),
+    3: ("float16", "<f2"),
+    4: ("uint8", "<u1"),
+    5: ("uint16", "<u2"),
+    6: ("uint32", "<u4"),
+}
+# Unsigned codes carry ring elements of compressed updates, never model weights.
+WIRE_RING_DTYPES = ("uint8", "uint16", "uint32")
+WIRE_DTYPE_CODES: Dict[str, int] = {
+    name: code for code, (name, _) in WIRE_DTYPES.items()
+}
+
+# magic, version, dtype code, client_id length, round, dims, meta length
+_HEADER = struct.Struct("<4sBBHqQI")
+
+
+class WireFrame(NamedTuple):
+    round: int
+    client_id: str
+    dtype: str
+    vector: NDArray[numpy.float64]
+    meta: Dict[str, Any]
+
+
+def encode_frame(
+    vector: NDArray[numpy.float64],
+    round: int,
+    client_id: str = "",
+    dtype: str = "float64",
+    meta: Dict[str, Any] | None = None
+) -> bytes:
+    if dtype not in WIRE_DTYPE_CODES:
+        raise ValueError(f"Unsupported wire dtype {dtype!r}. Expected one of {tuple(WIRE_DTYPE_CODES)}")
+
+    code: int = WIRE_DTYPE_CODES[dtype]
+    body: bytes = numpy.ascontiguousarray(
+        numpy.ravel(vector),
+        dtype=WIRE_DTYPES[code][1]
+    ).tobytes()
+    client_bytes: bytes = client_id.encode("utf-8")
+    meta_bytes: bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8") if meta else b""
+    header: bytes = _HEADER.pack(
+        WIRE_MAGIC,
+        WIRE_VERSION,
+        code,
+        len(client_bytes),
+        int(round),
+        numpy.size(vector),
+        len(meta_bytes)
+    )
+    return b"".join((header, client_bytes, meta_bytes, body))
+
+
+def decode_frame(payload: bytes) -> WireFrame:
+    if len(payload) < _HEADER.size:
+        raise ValueError("Frame too short")
+
+    magic, version, code, client_length, round, dims, meta_length = _HEADER.unpack_from(payload, 0)
+    if magic != WIRE_MAGIC or version != WIRE_VERSION:
+        raise ValueError("Bad frame magic/version")
+    if code not in WIRE_DTYPES:
+        raise ValueError(f"Unknown wire dtype code {code}")
+
+    name, numpy_dtype = WIRE_DTYPES[code]
+    offset: int = _HEADER.size
+    client_id: str = bytes(payload[offset: offset + client_length]).decode("utf-8")
+    offset += client_length
+    meta: Dict[str, Any] = json.loads(bytes(payload[offset: offset + meta_length])) if meta_length else {}
+    offset += meta_length
+
+    expected: int = offset + dims * numpy.dtype(numpy_dtype).itemsize
+    if len(payload) != expected:
+        raise ValueError(f"Frame length {len(payload)} does not match header ({expected})")
+
+    vector = numpy.frombuffer(payload, dtype=numpy_dtype, count=dims, offset=offset)
+    if name in WIRE_RING_DTYPES:
+        vector = vector.astype(numpy.uint64)
+    elif name != "float64":
+        vector = vector.astype(numpy.float64)
+
+    return WireFrame(
+        round=round,
+        client_id=client_id,
+        dtype=name,
+        vector=vector,
+        meta=meta
+    )
+
+
+def wait_for_status(
     url: str,
-    key: str,
-    expected: Any,
-    poll_interval: float = 0.5
-) -> bool:
+    predicate: Callable[[Dict[str, Any]], bool],
+    timeout: float | None = None,
+    poll_interval: float = 0.5,
+    session: requests.Session | None = None,
+    watch: str = "epoch"
+) -> Dict[str, Any] | None:
+    http = session or requests
+    deadline: float | None = None if timeout is None else time.perf_counter() + timeout
+    since: int | None = None
+
     while True:
+        wait_seconds: float = LONG_POLL_SECONDS
+        if deadline is not None:
+            wait_seconds = min(wait_seconds, max(deadline - time.perf_counter(), 0.0))
+
         try:
-            response: requests.Response = requests.get(url=url)
+            response: requests.Response = http.get(
+                url=url,
+                params={} if since is None else {"since": since, "timeout": wait_seconds, "watch": watch},
+                timeout=wait_seconds + 10
+            )
             response_data: Any = response.json()
-            if isinstance(response_data, Mapping) and response_data.get(key) == expected:
-                return True
+            if isinstance(response_data, Mapping):
+                if predicate(response_data):
+                    return dict(response_data)
+
+                # Servers that long-poll report an epoch; block on it instead of sleeping.
+                if watch in response_data:
+                    since = int(response_data[watch])
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        return None
+                    continue
 
         except Exception:
             pass
 
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
         time.sleep(poll_interval)
+
+
+def wait_for_key(
+    url: str,
+    key: str,
+    expected: Any,
+    poll_interval: float = 0.5
+) -> bool:
+    wait_for_status(
+        url=url,
+        predicate=lambda response_data: response_data.get(key) == expected,
+        poll_interval=poll_interval
+    )
+    return True
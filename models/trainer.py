@@ -0,0 +1,219 @@
+import numpy
+from numpy.typing import NDArray
+from models.models import Logistic
+from typing import Any, Iterator, Tuple
+
+COMPUTE_DTYPES = ("float64", "float32")
+
+
+def _sigmoid_inplace(z: NDArray[numpy.floating]) -> NDArray[numpy.floating]:
+    numpy.negative(z, out=z)
+    numpy.exp(z, out=z)
+    z += 1.0
+    numpy.reciprocal(z, out=z)
+    return z
+
+
+class LocalTrainer:
+    def __init__(
+        self,
+        model: Logistic,
+        feature_matrix: NDArray[numpy.float64] | None,
+        binary_targets: NDArray[numpy.float64] | None,
+        batch_size: int | None = None,
+        shuffle: bool = True,
+        dtype: str = "float64",
+        seed: int | None = None,
+        dataset: Any = None
+    ) -> None:
+        if dtype not in COMPUTE_DTYPES:
+            raise ValueError(f"Unknown compute dtype {dtype!r}. Expected one of {COMPUTE_DTYPES}")
+
+        self.model: Logistic = model
+        self.dtype = numpy.dtype(dtype)
+        # A chunked dataset (client.dataset.ChunkedDataset) is streamed chunk by chunk;
+        # in-memory arrays are converted once and treated as a single chunk.
+        self.dataset = dataset
+        if dataset is None:
+            # The bias column is never materialised: logits are X @ w[:-1] + w[-1].
+            self.X = numpy.asarray(feature_matrix, dtype=self.dtype)
+            self.y = numpy.asarray(binary_targets, dtype=self.dtype).ravel()
+            if self.X.ndim != 2 or self.X.shape[0] != self.y.shape[0]:
+                raise ValueError(f"feature matrix {self.X.shape} does not match targets {self.y.shape}")
+            rows, n_features, chunk_rows = self.X.shape[0], self.X.shape[1], self.X.shape[0]
+        else:
+            self.X = self.y = None
+            rows, n_features, chunk_rows = dataset.rows, dataset.n_features, dataset.chunk_rows
+        if n_features + 1 != model._dim:
+            raise ValueError(f"weight size {model._dim} != features+1 {n_features + 1}")
+
+        self.rows: int = rows
+        self.batch_size: int = rows if not batch_size or batch_size >= rows else int(batch_size)
+        self.shuffle: bool = shuffle
+        self._rng = numpy.random.default_rng(seed)
+        self._scratch: NDArray[numpy.floating] = numpy.empty(chunk_rows, dtype=self.dtype)
+        self._gradient: NDArray[numpy.floating] = numpy.empty(n_features, dtype=self.dtype)
+        self._gradient_sum: NDArray[numpy.floating] = numpy.empty(n_features, dtype=self.dtype)
+        # Shuffled mini-batches are gathered through a row permutation into these.
+        self._X_batch: NDArray[numpy.floating] = numpy.empty((self.batch_size, n_features), dtype=self.dtype)
+        self._y_batch: NDArray[numpy.floating] = numpy.empty(self.batch_size, dtype=self.dtype)
+
+    @classmethod
+    def from_dataset(
+        cls,
+        model: Logistic,
+        dataset: Any,
+        batch_size: int | None = None,
+        shuffle: bool = True,
+        dtype: str = "float64",
+        seed: int | None = None
+    ) -> "LocalTrainer":
+        return cls(model, None, None, batch_size, shuffle, dtype, seed, dataset=dataset)
+
+    def _chunks(self, shuffle: bool = False) -> Iterator[Tuple[NDArray[numpy.floating], NDArray[numpy.floating]]]:
+        if self.dataset is None:
+            yield self.X, self.y
+            return
+
+        order: NDArray[numpy.int64] = numpy.arange(self.dataset.chunk_count)
+        if shuffle and len(order) > 1:
+            self._rng.shuffle(order)
+        for index in order:
+            yield self.dataset.chunk(int(index), self.dtype)
+
+    def _probabilities(
+        self,
+        X: NDArray[numpy.floating],
+        weight: NDArray[numpy.floating],
+        out: NDArray[numpy.floating]
+    ) -> NDArray[numpy.floating]:
+        numpy.matmul(X, weight[:-1], out=out)
+        out += weight[-1]
+        return _sigmoid_inplace(out)
+
+    def update_local(
+        self,
+        epochs: int = 1,
+        learning_rate: float = 0.3
+    ) -> NDArray[numpy.float64]:
+        w0: NDArray[numpy.float64] = self.model.get_model_weight()
+        weight: NDArray[numpy.floating] = w0.astype(self.dtype)
+        full_batch: bool = self.batch_size >= self.rows
+
+        for _ in range(epochs):
+            if full_batch:
+                # One step per epoch; gradients are accumulated across chunks.
+                self._gradient_sum.fill(0)
+                bias_gradient: float = 0.0
+                for X_chunk, y_chunk in self._chunks():
+                    residual = self._probabilities(X_chunk, weight, self._scratch[:X_chunk.shape[0]])
+                    residual -= y_chunk
+                    self._gradient_sum += numpy.matmul(residual, X_chunk, out=self._gradient)
+                    bias_gradient += residual.sum()
+                self._gradient_sum /= self.rows
+                weight[:-1] -= learning_rate * self._gradient_sum
+                weight[-1] -= learning_rate * (bias_gradient / self.rows)
+                continue
+
+            for X_chunk, y_chunk in self._chunks(shuffle=self.shuffle):
+                # A fresh row order every epoch, so batches mix different samples each time.
+                order: NDArray[numpy.int64] | None = (
+                    self._rng.permutation(X_chunk.shape[0]) if self.shuffle else None
+                )
+                for start in range(0, X_chunk.shape[0], self.batch_size):
+                    if order is None:
+                        X_batch = X_chunk[start: start + self.batch_size]
+                        y_batch = y_chunk[start: start + self.batch_size]
+                    else:
+                        rows_index: NDArray[numpy.int64] = order[start: start + self.batch_size]
+                        X_batch = numpy.take(X_chunk, rows_index, axis=0, out=self._X_batch[:len(rows_index)])
+                        y_batch = numpy.take(y_chunk, rows_index, out=self._y_batch[:len(rows_index)])
+                    rows: int = X_batch.shape[0]
+
+                    residual = self._probabilities(X_batch, weight, self._scratch[:rows])
+                    residual -= y_batch
+                    numpy.matmul(residual, X_batch, out=self._gradient)
+                    self._gradient /= rows
+                    weight[:-1] -= learning_rate * self._gradient
+                    weight[-1] -= learning_rate * (residual.sum() / rows)
+
+        new_weight: NDArray[numpy.float64] = weight.astype(numpy.float64)
+        delta: NDArray[numpy.float64] = new_weight - w0
+        self.model.set_model_weight(new_weight)
+        return delta
+
+    def predict_probability(self) -> NDArray[numpy.floating]:
+        weight: NDArray[numpy.floating] = self.model.weight.astype(self.dtype)
+        if self.dataset is None:
+            return self._probabilities(self.X, weight, self._scratch)
+        return numpy.concatenate([
+            self._probabilities(X_chunk, weight, self._scratch[:X_chunk.shape[0]]).copy()
+            for X_chunk, _ in self._chunks()
+        ])
+
+    def accuracy(self) -> float:
+        weight: NDArray[numpy.floating] = self.model.weight.astype(self.dtype)
+        correct: int = 0
+        for X_chunk, y_chunk in self._chunks():
+            probabilities = self._probabilities(X_chunk, weight, self._scratch[:X_chunk.shape[0]])
+            correct += int(numpy.count_nonzero((probabilities >= 0.5) == (y_chunk >= 0.5)))
+        return correct / self.rows if self.rows else 0.0
+
+
+class BatchedTrainer:
+    # Full-batch update_local for K clients at once over stacked (K, n, d) data;
+    # the bias column is left implicit as in LocalTrainer.
+    def __init__(
+        self,
+        feature_matrices: NDArray[numpy.float64],
+        binary_targets: NDArray[numpy.float64],
+        dtype: str = "float64"
+    ) -> None:
+        if dtype not in COMPUTE_DTYPES:
+            raise ValueError(f"Unknown compute dtype {dtype!r}. Expected one of {COMPUTE_DTYPES}")
+
+        self.dtype = numpy.dtype(dtype)
+        self.X = numpy.asarray(feature_matrices, dtype=self.dtype)
+        self.y = numpy.asarray(binary_targets, dtype=self.dtype)
+        if self.X.ndim != 3 or self.y.shape != self.X.shape[:2]:
+            raise ValueError(f"feature matrices {self.X.shape} do not match targets {self.y.shape}")
+        self.clients, self.rows, n_features = self.X.shape
+        self.dim: int = n_features + 1
+        self._scratch: NDArray[numpy.floating] = numpy.empty((self.clients, self.rows), dtype=self.dtype)
+        self._gradient: NDArray[numpy.floating] = numpy.empty((self.clients, 1, n_features), dtype=self.dtype)
+
+    def _probabilities(
+        self,
+        weights: NDArray[numpy.floating],
+        out: NDArray[numpy.floating]
+    ) -> NDArray[numpy.floating]:
+        # (K, n, d) @ (K, d, 1) -> (K, n, 1), plus each client's bias.
+        numpy.matmul(self.X, weights[:, :-1, None], out=out[:, :, None])
+        out += weights[:, -1:]
+        return _sigmoid_inplace(out)
+
+    def update_local(
+        self,
+        weight: NDArray[numpy.float64],
+        epochs: int = 1,
+        learning_rate: float = 0.3
+    ) -> Tuple[NDArray[numpy.float64], NDArray[numpy.float64]]:
+        # Every client starts from `weight`; returns the (K, d+1) deltas and local weights.
+        w0: NDArray[numpy.float64] = numpy.asarray(weight, dtype=numpy.float64)
+        if w0.shape != (self.dim,):
+            raise ValueError(f"weight size {w0.size} != features+1 {self.dim}")
+        weights: NDArray[numpy.floating] = numpy.tile(w0.astype(self.dtype), (self.clients, 1))
+
+        for _ in range(epochs):
+            residual = self._probabilities(weights, self._scratch)
+            residual -= self.y
+            numpy.matmul(residual[:, None, :], self.X, out=self._gradient)
+            weights[:, :-1] -= (learning_rate / self.rows) * self._gradient[:, 0, :]
+            weights[:, -1] -= (learning_rate / self.rows) * residual.sum(axis=1)
+
+        local: NDArray[numpy.float64] = weights.astype(numpy.float64)
+        return local - w0, local
+
+    def accuracy(self, weights: NDArray[numpy.float64]) -> NDArray[numpy.float64]:
+        probabilities = self._probabilities(numpy.asarray(weights, dtype=self.dtype), self._scratch)
+        return numpy.count_nonzero((probabilities >= 0.5) == (self.y >= 0.5), axis=1) / self.rows
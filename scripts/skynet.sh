@@ -14,6 +14,14 @@ MIN_CLIENTS="${MIN_CLIENTS:-3}"
 CLIENT_SAMPLES="${CLIENT_SAMPLES:-300}"
 CLIENT_ROUNDS="${CLIENT_ROUNDS:-5}"
 CLIENT_LR="${CLIENT_LR:-0.5}"
+AGGREGATION="${AGGREGATION:-buffered}"
+SERVER_BACKEND="${SERVER_BACKEND:-dev}"
+SERVER_THREADS="${SERVER_THREADS:-128}"
+COMPRESSION="${COMPRESSION:-none}"
+EDGES="${EDGES:-0}"
+CHECKPOINT_DIR="${CHECKPOINT_DIR:-}"
+LIVE="${LIVE:-0}"
+LIVE_EVERY="${LIVE_EVERY:-1}"
 
 CLIENTS="${CLIENTS:-A B C}"
 
@@ -30,6 +38,8 @@ mkdir -p "${EXPORT_DIR}"
 SERVER_PID_FILE="${PID_DIR}/server.pid"
 CONTROLLER_PID_FILE="${PID_DIR}/controller.pid"
 CLIENT_PIDS_FILE="${PID_DIR}/clients.pids"
+EDGE_PIDS_FILE="${PID_DIR}/edges.pids"
+LIVE_PID_FILE="${PID_DIR}/live.pid"
 
 PYTHON="${VENV_DIR}/bin/python"
 
@@ -100,17 +110,61 @@ start_server() {
   echo "[*] Starting server ..."
   ( cd "${PROJECT_ROOT}" && \
     nohup "${PYTHON}" -u -m server.server \
+      --host "${SERVER_HOST}" \
+      --port "${SERVER_PORT}" \
+      --aggregation "${AGGREGATION}" \
+      --backend "${SERVER_BACKEND}" \
+      --threads "${SERVER_THREADS}" \
+      --compression "${COMPRESSION}" \
+      ${CHECKPOINT_DIR:+--checkpoint-dir "${CHECKPOINT_DIR}"} \
       > "${LOG_DIR}/server.out" 2> "${LOG_DIR}/server.err" & echo $! > "${SERVER_PID_FILE}" )
   wait_for_server
 }
 
+edge_url() {
+  echo "http://${SERVER_HOST}:$(( SERVER_PORT + $1 ))"
+}
+
+start_edges() {
+  : > "${EDGE_PIDS_FILE}"
+  (( EDGES > 0 )) || return 0
+  local clients=(${CLIENTS}) i
+  echo "[*] Starting ${EDGES} edge aggregators ..."
+  for (( i = 1; i <= EDGES; i++ )); do
+    # Clients are spread round-robin; each edge joins the root once its share has registered.
+    local members=$(( (${#clients[@]} - i + EDGES) / EDGES ))
+    ( cd "${PROJECT_ROOT}" && \
+      nohup "${PYTHON}" -u -m server.edge \
+        --root "${SERVER_URL}" \
+        --edge-id "edge${i}" \
+        --host "${SERVER_HOST}" \
+        --port "$(( SERVER_PORT + i ))" \
+        --min-clients "${members}" \
+        --backend "${SERVER_BACKEND}" \
+        --threads "${SERVER_THREADS}" \
+        > "${LOG_DIR}/edge${i}.out" 2> "${LOG_DIR}/edge${i}.err" & echo $! >> "${EDGE_PIDS_FILE}" )
+  done
+  for (( i = 1; i <= EDGES; i++ )); do
+    for _ in {1..30}; do
+      curl -fsS "$(edge_url "${i}")/status" > /dev/null 2>&1 && break
+      sleep 1
+    done
+  done
+}
+
 start_clients() {
   : > "${CLIENT_PIDS_FILE}"
   echo "[*] Starting clients: ${CLIENTS}"
+  local index=0 url
   for cid in ${CLIENTS}; do
+    url="${SERVER_URL}"
+    if (( EDGES > 0 )); then
+      url="$(edge_url $(( index % EDGES + 1 )))"
+    fi
+    index=$((index+1))
     ( cd "${PROJECT_ROOT}" && \
       nohup "${PYTHON}" -u -m client.client \
-        --server "${SERVER_URL}" \
+        --server "${url}" \
         --client-id "${cid}" \
         --samples "${CLIENT_SAMPLES}" \
         --rounds "${CLIENT_ROUNDS}" \
@@ -125,15 +179,33 @@ start_controller() {
     echo "[INFO] Controller already running (pid $(cat "${CONTROLLER_PID_FILE}"))"
     return 0
   fi
-  echo "[*] Starting controller (rounds=${ROUNDS}, min_clients=${MIN_CLIENTS}) ..."
+  local min_clients="${MIN_CLIENTS}"
+  # The root only sees edges, each standing in for its clients.
+  (( EDGES > 0 )) && min_clients="${EDGES}"
+  echo "[*] Starting controller (rounds=${ROUNDS}, min_clients=${min_clients}) ..."
   ( cd "${PROJECT_ROOT}" && \
     nohup "${PYTHON}" -u -m controller.controller \
       --server "${SERVER_URL}" \
       --rounds "${ROUNDS}" \
-      --min-clients "${MIN_CLIENTS}" \
+      --min-clients "${min_clients}" \
       > "${LOG_DIR}/controller.out" 2> "${LOG_DIR}/controller.err" & echo $! > "${CONTROLLER_PID_FILE}" )
 }
 
+start_live() {
+  [[ "${LIVE}" = "1" ]] || return 0
+  local last_round=$(( ${START_ROUND:-0} + ROUNDS ))
+  echo "[*] Starting live dashboard (${EXPORT_DIR}/live.png, every ${LIVE_EVERY} rounds) ..."
+  ( cd "${PROJECT_ROOT}" && \
+    nohup "${PYTHON}" -u -m analytics.live \
+      --server "${SERVER_URL}" \
+      --outdir "${EXPORT_DIR}" \
+      --rounds "${last_round}" \
+      --every "${LIVE_EVERY}" \
+      --timeout 60 \
+      --gif \
+      > "${LOG_DIR}/live.out" 2> "${LOG_DIR}/live.err" & echo $! > "${LIVE_PID_FILE}" )
+}
+
 stop_pids_in_file() {
   local pidfile="$1"
   if [[ -f "$pidfile" ]]; then
@@ -153,6 +225,12 @@ stop_all() {
   echo "[*] Stopping clients ..."
   stop_pids_in_file "${CLIENT_PIDS_FILE}"
 
+  echo "[*] Stopping edges ..."
+  stop_pids_in_file "${EDGE_PIDS_FILE}"
+
+  echo "[*] Stopping live dashboard ..."
+  stop_pids_in_file "${LIVE_PID_FILE}"
+
   echo "[*] Stopping server ..."
   stop_pids_in_file "${SERVER_PID_FILE}"
 }
@@ -196,6 +274,10 @@ tail_logs() {
     "${LOG_DIR}/server.err" \
     "${LOG_DIR}/controller.out" \
     "${LOG_DIR}/controller.err" \
+    "${LOG_DIR}/live.out" \
+    "${LOG_DIR}/live.err" \
+    "${LOG_DIR}"/edge*.out \
+    "${LOG_DIR}"/edge*.err \
     "${LOG_DIR}"/client_*.out \
     "${LOG_DIR}"/client_*.err 2>/dev/null || true
 }
@@ -287,6 +369,11 @@ wait_and_export_after_controller() {
   fi
 
 
+  if is_running "${LIVE_PID_FILE}"; then
+    echo "[INFO] Waiting for the live dashboard to write its last frame ..."
+    wait_pid_exit "$(cat "${LIVE_PID_FILE}")"
+  fi
+
   if [[ "${AUTO_STOP}" = "1" ]]; then
     echo "[INFO] AUTO_STOP is enabled → stopping all processes"
     stop_all
@@ -303,6 +390,7 @@ Commands:
   setup             Create venv and install requirements
   start             Start server, clients, and controller; export JSON; (AUTO_STOP=1 stops all)
   start-server      Start only the server
+  start-edges       Start only the edge aggregators (EDGES > 0)
   start-clients     Start only clients
   start-controller  Start only controller
   stop              Stop all components
@@ -311,7 +399,11 @@ Commands:
 
 Environment overrides:
   ROUNDS, MIN_CLIENTS, CLIENTS, CLIENT_SAMPLES, CLIENT_ROUNDS, CLIENT_LR
-  SERVER_HOST, SERVER_PORT
+  SERVER_HOST, SERVER_PORT, AGGREGATION (buffered|streaming)
+  SERVER_BACKEND (dev|waitress), SERVER_THREADS, COMPRESSION (none|topk|q8|sign)
+  CHECKPOINT_DIR (default: unset; save every round and resume from it)
+  EDGES (default: 0; edge i listens on SERVER_PORT+i and serves every EDGES-th client)
+  LIVE (default: 0; 1 keeps EXPORT_DIR/live.png current and writes live.gif), LIVE_EVERY (default: 1)
   EXPORT_DIR, EXPORT_BASENAME (default: model_state_summary.json), AUTO_STOP (default: 1)
   SETTLE_TIMEOUT (default: 2s)
 EOF
@@ -325,6 +417,7 @@ case "${cmd}" in
   start)
     ensure_venv
     start_server
+    start_edges
     start_clients
 
     if START_ROUND="$(get_training_round)"; then
@@ -333,6 +426,7 @@ case "${cmd}" in
       echo "[INFO] Could not read starting training_round; proceeding with fallback wait"
       START_ROUND=""
     fi
+    start_live
     start_controller
     status
     wait_and_export_after_controller
@@ -341,6 +435,10 @@ case "${cmd}" in
     ensure_venv
     start_server
     ;;
+  start-edges)
+    ensure_venv
+    start_edges
+    ;;
   start-clients)
     ensure_venv
     start_clients
@@ -0,0 +1,150 @@
+import os
+import json
+import queue
+import numpy
+import threading
+from numpy.typing import NDArray
+from server.history import HistoryStore
+from models.network import decode_frame, encode_frame
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+SNAPSHOT_FILE: str = "snapshot.bin"
+HISTORY_FILE: str = "history.ndjson"
+
+
+class Checkpoint(NamedTuple):
+    round: int
+    weights: NDArray[numpy.float64]
+    registered: List[str]
+    members: Dict[str, List[str]]
+    roster_version: int
+    compression: Dict[str, Any] | None
+    history: HistoryStore
+    optimizer: Dict[str, Any] | None = None
+    optimizer_state: NDArray[numpy.float64] | None = None
+
+
+class Checkpointer:
+    # Snapshots and history lines are written by one background thread, so
+    # finalizing a round only pays for copying the weights.
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        self.snapshot_path: str = os.path.join(directory, SNAPSHOT_FILE)
+        self.history_path: str = os.path.join(directory, HISTORY_FILE)
+        os.makedirs(directory, exist_ok=True)
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._closed: bool = False
+
+    def exists(self) -> bool:
+        return os.path.exists(self.snapshot_path)
+
+    def save(
+        self,
+        round: int,
+        weights: NDArray[numpy.float64],
+        meta: Dict[str, Any],
+        entry: Dict[str, Any] | None,
+        slots: NDArray[numpy.float64] | None = None
+    ) -> None:
+        if self._closed:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+        # Server optimizer buffers ride in the same frame, after the weights.
+        vector: NDArray[numpy.float64] = numpy.concatenate([weights, *slots]) if slots is not None and len(slots) else weights.copy()
+        self._queue.put((round, vector, meta, entry))
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def close(self) -> None:
+        # Writes whatever is queued, then ends the writer thread; later saves are dropped.
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def _write_loop(self) -> None:
+        closing: bool = False
+        while not closing:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                return
+            pending: List[Tuple[int, NDArray[numpy.float64], Dict[str, Any], Dict[str, Any] | None]] = [first]
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.task_done()
+                    closing = True
+                    break
+                pending.append(item)
+            try:
+                # History lines go first; the snapshot records how much of the log it covers.
+                lines: str = "".join(
+                    json.dumps(entry, separators=(",", ":")) + "\n"
+                    for _, _, _, entry in pending if entry is not None
+                )
+                with open(self.history_path, "a", encoding="utf-8") as history:
+                    history.write(lines)
+                    history.flush()
+                    os.fsync(history.fileno())
+                    history_bytes: int = history.tell()
+
+                # Only the newest snapshot matters when several rounds queued up.
+                round, weights, meta, _ = pending[-1]
+                self._write_snapshot(round, weights, {**meta, "history_bytes": history_bytes})
+            except OSError as error:
+                print(f"[checkpoint] write failed: {error}", flush=True)
+            finally:
+                for _ in pending:
+                    self._queue.task_done()
+
+    def _write_snapshot(
+        self,
+        round: int,
+        weights: NDArray[numpy.float64],
+        meta: Dict[str, Any]
+    ) -> None:
+        temporary: str = self.snapshot_path + ".tmp"
+        with open(temporary, "wb") as snapshot:
+            snapshot.write(encode_frame(weights, round=round, dtype="float64", meta=meta))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, self.snapshot_path)
+
+    def load(self) -> Checkpoint:
+        with open(self.snapshot_path, "rb") as snapshot:
+            frame = decode_frame(snapshot.read())
+        meta: Dict[str, Any] = frame.meta
+
+        raw: bytes = b""
+        history_bytes: int = int(meta.get("history_bytes", 0))
+        if os.path.exists(self.history_path):
+            with open(self.history_path, "r+b") as log:
+                # Lines written after the snapshot belong to a round it does not cover.
+                log.truncate(history_bytes)
+                raw = log.read()
+
+        optimizer: Dict[str, Any] | None = meta.get("optimizer")
+        rows: NDArray[numpy.float64] = numpy.array(frame.vector, dtype=numpy.float64).reshape(
+            1 + int((optimizer or {}).get("slots", 0)),
+            -1
+        )
+        return Checkpoint(
+            round=frame.round,
+            weights=rows[0],
+            registered=list(meta.get("registered", [])),
+            members={edge: list(members) for edge, members in meta.get("members", {}).items()},
+            roster_version=int(meta.get("roster_version", 0)),
+            compression=meta.get("compression"),
+            history=HistoryStore.from_ndjson(raw),
+            optimizer=optimizer,
+            optimizer_state=rows[1:] if optimizer is not None else None
+        )
@@ -0,0 +1,296 @@
+import time
+import click
+import numpy
+import requests
+import threading
+import server.server as server_module
+from numpy.typing import NDArray
+from models.compression import CompressionSpec
+from client.client import ModelCache, fetch_model, recovery_needed, retry_needed, submit_recovery, submit_update
+from server.model_state import AGGREGATION_MODES, SUBMIT_ACCEPTED, GlobalModelState
+from typing import Any, Dict, List, Tuple
+
+EDGE_POLL_SECONDS: float = 25.0
+
+
+class EdgeModelState(GlobalModelState):
+    # Serves one root round to a subgroup of clients. Pair masks span the leaves of
+    # the root round's participants, so the local sum stays masked and is only forwarded.
+    def __init__(
+        self,
+        feature_weight: int = 12,
+        aggregation: str = "buffered",
+        shards: int = 8
+    ) -> None:
+        super().__init__(
+            feature_weight=feature_weight,
+            aggregation=aggregation,
+            shards=shards
+        )
+        self.root_roster: List[str] = []
+        self.root_roster_version: int = 0
+        self.root_participants: List[str] | None = None
+        self.root_mask_nonce: str | None = None
+        self.root_reported: List[str] = []
+
+    def set_root_roster(self, version: int, clients: List[str]) -> None:
+        with self.lock:
+            self.root_roster_version = version
+            self.root_roster = list(clients)
+            self._notify_changed()
+
+    def set_root_round(self, participants: List[str] | None, mask_nonce: str | None) -> None:
+        with self.lock:
+            self.root_participants = list(participants) if participants is not None else None
+            self.root_mask_nonce = mask_nonce
+
+    def roster_snapshot(self) -> Tuple[int, List[str]]:
+        with self.lock:
+            return self.root_roster_version, list(self.root_roster)
+
+    def status_snapshot(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = super().status_snapshot()
+        with self.lock:
+            snapshot["roster_version"] = self.root_roster_version
+            # Leaves mask with the root round's nonce, not this edge's own.
+            snapshot["mask_nonce"] = self.root_mask_nonce
+            if self.root_participants is not None:
+                snapshot["participants"] = list(self.root_participants)
+            else:
+                # A root without per-round participants: clients mask against /roster.
+                snapshot.pop("participants", None)
+            if snapshot["phase"] == "recovery":
+                # Clients correct for every leaf the root did not hear from.
+                snapshot["received"] = list(self.root_reported)
+        return snapshot
+
+    def _close_round(self) -> None:
+        # Recovery is decided by the root once every edge has reported.
+        self.closed = True
+        self._cancel_deadline()
+        self._notify_changed(round_changed=True)
+
+    def mirror(
+        self,
+        round: int,
+        weights: NDArray[numpy.float64],
+        compression: Dict[str, Any] | None
+    ) -> None:
+        with self.lock:
+            self._wait_for_pending()
+            self.round = round
+            self.model.set_model_weight(weights)
+            if self._versions[-1][0] == round:
+                self._versions.pop()
+            self._versions.append((round, self.model.get_model_weight()))
+            self.compression_spec = CompressionSpec.from_dict(compression)
+            self.expected.clear()
+            self.round_participants = set()
+            self.metrics = {}
+            self._reset_round_buffers()
+            self._notify_changed(round_changed=True)
+
+    def begin_recovery(self, reported: List[str]) -> None:
+        with self.lock:
+            self.root_reported = list(reported)
+            self.recovery_pending = set(self.contributors)
+            self._notify_changed(round_changed=True)
+
+    def collect(self) -> Tuple[List[str], NDArray[numpy.float64] | NDArray[numpy.unsignedinteger], Dict[str, Any]]:
+        # The local sum as one update for the root, still masked.
+        with self.lock:
+            self._wait_for_pending()
+            accuracies: List[float] = [
+                float(metric["accuracy"]) for metric in self.metrics.get(self.round, {}).values()
+            ]
+            metrics: Dict[str, Any] = {"accuracy": float(numpy.mean(accuracies))} if accuracies else {}
+            return sorted(self.contributors), self._to_wire(self._raw_total()), metrics
+
+    def recovery_total(self) -> NDArray[numpy.float64] | NDArray[numpy.unsignedinteger]:
+        with self.lock:
+            return self._to_wire(self.recovery_sum.copy())
+
+    def _to_wire(
+        self,
+        total: NDArray[numpy.float64] | NDArray[numpy.uint64]
+    ) -> NDArray[numpy.float64] | NDArray[numpy.unsignedinteger]:
+        spec: CompressionSpec | None = self.compression_spec
+        if spec is None:
+            return total
+        total &= numpy.uint64(spec.modulus - 1)
+        return total.astype(spec.ring_dtype)
+
+
+class EdgeUplink:
+    # Acts as a single client of the root on behalf of the local subgroup.
+    def __init__(
+        self,
+        state: EdgeModelState,
+        root: str,
+        edge_id: str,
+        deadline: float | None = None,
+        min_clients: int = 1
+    ) -> None:
+        self.state: EdgeModelState = state
+        self.root: str = root.rstrip("/")
+        self.edge_id: str = edge_id
+        self.deadline: float | None = deadline
+        # The edge joins the root roster only once its subgroup is this large.
+        self.min_clients: int = min_clients
+        self.session: requests.Session = requests.Session()
+        self.models: ModelCache = ModelCache(self.root, "float64", session=self.session)
+        self.root_status: Dict[str, Any] = {}
+        self.announced: List[str] | None = None
+        self.mirrored_round: int | None = None
+        self.configured_round: int | None = None
+        self.forwarded_round: int | None = None
+        self.recovery_round: int | None = None
+        self.corrected_round: int | None = None
+        self._step_lock: threading.Lock = threading.Lock()
+
+    def start(self) -> None:
+        self._announce()
+        self.root_status = self.session.get(f"{self.root}/status").json()
+        self.step()
+        for target in (self._watch_root, self._watch_local):
+            threading.Thread(target=target, daemon=True).start()
+
+    def _watch_root(self) -> None:
+        watcher: requests.Session = requests.Session()
+        while True:
+            try:
+                self.root_status = watcher.get(
+                    f"{self.root}/status",
+                    params={"since": self.root_status.get("epoch", 0), "timeout": EDGE_POLL_SECONDS},
+                    timeout=EDGE_POLL_SECONDS + 10
+                ).json()
+                self.step()
+            except requests.RequestException as error:
+                print(f"[edge {self.edge_id}] root unreachable: {error}", flush=True)
+                time.sleep(1.0)
+
+    def _watch_local(self) -> None:
+        epoch: int = self.state.epoch
+        while True:
+            epoch = self.state.wait_for_change(since=epoch, timeout=EDGE_POLL_SECONDS)
+            try:
+                self.step()
+            except requests.RequestException as error:
+                print(f"[edge {self.edge_id}] root unreachable: {error}", flush=True)
+
+    def _announce(self) -> None:
+        members: List[str] = self.state.registered_clients()
+        if len(members) >= self.min_clients and members != self.announced:
+            self.session.post(
+                f"{self.root}/register",
+                json={"client_id": self.edge_id, "members": members}
+            ).raise_for_status()
+            self.announced = members
+
+    def step(self) -> None:
+        with self._step_lock:
+            self._announce()
+            status: Dict[str, Any] = self.root_status
+            if not status:
+                return
+            root_round: int = int(status["round"])
+
+            if status.get("roster_version") != self.state.root_roster_version:
+                roster: Dict[str, Any] = self.session.get(f"{self.root}/roster").json()
+                self.state.set_root_roster(roster["roster_version"], roster["clients"])
+
+            aborted: bool = (
+                (status.get("phase") == "idle" and self.configured_round == root_round)
+                or (self.forwarded_round == root_round and retry_needed(status, self.edge_id, root_round))
+            )
+            if root_round != self.mirrored_round or aborted:
+                model_info: Dict[str, Any] = self.models.fetch()
+                if int(model_info["training_round"]) != root_round:
+                    # The root moved on since this status; its next status catches up.
+                    return
+                self.state.mirror(root_round, model_info["training_weights"], model_info.get("compression"))
+                self.mirrored_round = root_round
+                self.configured_round = self.forwarded_round = self.recovery_round = self.corrected_round = None
+
+            expected: bool = self.edge_id in status.get("expected", [])
+            if expected and status.get("phase") == "collecting" and self.configured_round != root_round:
+                participants: List[str] | None = status.get("participants")
+                masked_with: List[str] = participants if participants is not None else self.state.root_roster
+                members: List[str] = [
+                    client_id for client_id in self.state.registered_clients()
+                    if client_id in masked_with
+                ]
+                self.state.set_root_round(participants, status.get("mask_nonce"))
+                self.state.configure_training_round(members, deadline=self.deadline)
+                self.configured_round = root_round
+                print(f"[edge {self.edge_id}] round {root_round}: collecting from {members}", flush=True)
+
+            if self.configured_round == root_round and self.state.closed and self.forwarded_round != root_round:
+                self._forward(root_round)
+
+            if recovery_needed(status, self.edge_id, root_round) and self.recovery_round != root_round:
+                self.state.begin_recovery(status.get("reported", []))
+                self.recovery_round = root_round
+
+            if (
+                self.recovery_round == root_round
+                and self.corrected_round != root_round
+                and self.state.status_snapshot()["phase"] == "ready"
+            ):
+                response = submit_recovery(
+                    self.root,
+                    client_id=self.edge_id,
+                    round=root_round,
+                    correction=self.state.recovery_total(),
+                    wire="float64",
+                    session=self.session
+                )
+                self.corrected_round = root_round
+                print(f"[edge {self.edge_id}] round {root_round}: forwarded mask correction status={response.status_code}", flush=True)
+
+    def _forward(self, root_round: int) -> None:
+        members, total, metrics = self.state.collect()
+        self.forwarded_round = root_round
+        if not members:
+            return
+        response = submit_update(
+            self.root,
+            client_id=self.edge_id,
+            round=root_round,
+            masked_update=total,
+            metrics=metrics,
+            wire="float64",
+            session=self.session,
+            members=members
+        )
+        outcome: str = SUBMIT_ACCEPTED if response.ok else response.json().get("error", str(response.status_code))
+        print(f"[edge {self.edge_id}] round {root_round}: forwarded sum of {members}: {outcome}", flush=True)
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--root", default="http://127.0.0.1:8000", show_default=True, help="Base URL of the root server.")
+@click.option("--edge-id", "edge_id", required=True, help="Identifier the edge registers with at the root.")
+@click.option("--host", default="0.0.0.0", show_default=True, help="Bind address for local clients.")
+@click.option("--port", type=int, default=8001, show_default=True, help="Bind port for local clients.")
+@click.option("--min-clients", "min_clients", type=int, default=1, show_default=True, help="Local clients to wait for before joining the root.")
+@click.option("--deadline", type=float, default=None, help="Seconds to wait for local clients before forwarding a partial sum.")
+@click.option("--aggregation", type=click.Choice(AGGREGATION_MODES), default="buffered", show_default=True, help="How the edge sums local updates.")
+@click.option("--backend", type=click.Choice(server_module.SERVING_BACKENDS), default="dev", show_default=True, help="HTTP server: Flask dev server or waitress.")
+@click.option("--threads", type=int, default=128, show_default=True, help="Worker threads for the waitress backend.")
+def edge_cli(root: str, edge_id: str, host: str, port: int, min_clients: int, deadline: float | None, aggregation: str, backend: str, threads: int) -> None:
+    model_info: Dict[str, Any] = fetch_model(root.rstrip("/"), "float64")
+    if model_info.get("scheduling", "sync") != "sync":
+        raise click.ClickException("edge aggregators need a root with sync scheduling")
+
+    state: EdgeModelState = EdgeModelState(
+        feature_weight=int(model_info["feature_weight"]),
+        aggregation=aggregation
+    )
+    # The edge serves the root's routes unchanged, backed by its own state.
+    server_module.model_state = state
+    EdgeUplink(state, root, edge_id, deadline=deadline, min_clients=min_clients).start()
+    server_module.serve(host=host, port=port, backend=backend, threads=threads)
+
+
+if __name__ == "__main__":
+    edge_cli()
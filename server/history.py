@@ -0,0 +1,115 @@
+import json
+import zlib
+import bisect
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Tuple
+
+HISTORY_CHUNK_ROUNDS: int = 1024
+
+
+def _encode(entry: Dict[str, Any]) -> bytes:
+    return json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class HistoryStore:
+    # Round history in fixed-size chunks. Full chunks are sealed as zlib-compressed
+    # NDJSON, so a long run costs a few bytes per round in memory and a round-range
+    # query only inflates the chunks it touches.
+    def __init__(self, chunk_rounds: int = HISTORY_CHUNK_ROUNDS) -> None:
+        if chunk_rounds < 1:
+            raise ValueError("chunk_rounds must be >= 1")
+        self.chunk_rounds: int = chunk_rounds
+        self._sealed: List[Tuple[int, int, bytes]] = []
+        self._sealed_firsts: List[int] = []
+        self._sealed_entries: int = 0
+        self._open: List[Dict[str, Any]] = []
+        self._open_lines: List[bytes] = []
+        self._lock: Lock = Lock()
+
+    @classmethod
+    def from_ndjson(cls, raw: bytes, chunk_rounds: int = HISTORY_CHUNK_ROUNDS) -> "HistoryStore":
+        # Whole chunks are compressed straight from the log; only their first line is parsed.
+        store: HistoryStore = cls(chunk_rounds)
+        lines: List[bytes] = raw.splitlines(keepends=True)
+        full: int = len(lines) - len(lines) % chunk_rounds
+        for start in range(0, full, chunk_rounds):
+            chunk: List[bytes] = lines[start: start + chunk_rounds]
+            store._seal(int(json.loads(chunk[0])["round"]), chunk)
+        for line in lines[full:]:
+            store._open.append(json.loads(line))
+            store._open_lines.append(line)
+        return store
+
+    def _seal(self, first_round: int, lines: List[bytes]) -> None:
+        self._sealed.append((first_round, len(lines), zlib.compress(b"".join(lines), 1)))
+        self._sealed_firsts.append(first_round)
+        self._sealed_entries += len(lines)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._open.append(entry)
+            self._open_lines.append(_encode(entry))
+            if len(self._open) >= self.chunk_rounds:
+                self._seal(int(self._open[0]["round"]), self._open_lines)
+                self._open = []
+                self._open_lines = []
+
+    def __len__(self) -> int:
+        return self._sealed_entries + len(self._open)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.entries()
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        with self._lock:
+            size: int = self._sealed_entries + len(self._open)
+            if index < 0:
+                index += size
+            if not 0 <= index < size:
+                raise IndexError("history index out of range")
+            if index >= self._sealed_entries:
+                return self._open[index - self._sealed_entries]
+            position: int = index
+            for _, count, compressed in self._sealed:
+                if position < count:
+                    return json.loads(zlib.decompress(compressed).splitlines()[position])
+                position -= count
+        raise IndexError("history index out of range")
+
+    def _view(self, start: int | None) -> Tuple[List[Tuple[int, int, bytes]], List[bytes]]:
+        # Chunks that can hold rounds >= start, read under the lock and used without it.
+        with self._lock:
+            first: int = 0
+            if start is not None:
+                first = max(bisect.bisect_right(self._sealed_firsts, start) - 1, 0)
+            return self._sealed[first:], list(self._open_lines)
+
+    def ndjson(self, start: int | None = None, stop: int | None = None) -> Iterator[bytes]:
+        # Entries with start <= round < stop, one JSON document per line.
+        sealed, open_lines = self._view(start)
+        for index, (first_round, _, compressed) in enumerate(sealed):
+            if stop is not None and first_round >= stop:
+                return
+            next_first: int | None = sealed[index + 1][0] if index + 1 < len(sealed) else None
+            if (start is None or first_round >= start) and (
+                stop is None or (next_first is not None and next_first <= stop)
+            ):
+                # Rounds only grow, so the whole chunk is in range.
+                yield zlib.decompress(compressed)
+                continue
+            yield from self._filter(zlib.decompress(compressed).splitlines(keepends=True), start, stop)
+        yield from self._filter(open_lines, start, stop)
+
+    @staticmethod
+    def _filter(lines: List[bytes], start: int | None, stop: int | None) -> Iterator[bytes]:
+        for line in lines:
+            round: int = int(json.loads(line)["round"])
+            if stop is not None and round >= stop:
+                return
+            if start is None or round >= start:
+                yield line
+
+    def entries(self, start: int | None = None, stop: int | None = None) -> Iterator[Dict[str, Any]]:
+        for block in self.ndjson(start, stop):
+            for line in block.splitlines():
+                yield json.loads(line)
@@ -1,39 +1,711 @@
 import time
 import numpy
-from threading import Lock
+import secrets
+from collections import deque
+from threading import Condition, Lock, Timer
 from numpy.typing import NDArray
 from models.models import Logistic
-from typing import Dict, Iterable, List, Set
+from models.compression import (
+    CompressionSpec,
+    decompress,
+    make_spec,
+    ring_sum_to_levels
+)
+from server.checkpoint import Checkpoint, Checkpointer
+from server.optimizers import ServerOptimizer
+from server.selection import MIN_SURVIVORS, ClientSelection, smooth_latency
+from server.history import HistoryStore
+from models.metrics import LOCK_BUCKETS, REGISTRY, MetricsRegistry, TimedLock
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+AGGREGATION_MODES = ("buffered", "streaming")
+SCHEDULING_MODES = ("sync", "async")
+SUBMIT_ACCEPTED: str = "accepted"
+WATCH_COUNTERS = ("epoch", "round_epoch")
+ROUND_PHASES = ("idle", "collecting", "recovery", "ready", "async")
+RECOVERY_TIMEOUT_SECONDS: float = 30.0
+# Consecutive failed attempts at one round before a schedule gives up.
+SCHEDULE_MAX_RETRIES: int = 3
+# Past model versions kept so /model/delta can answer clients a few rounds behind.
+MODEL_VERSIONS_KEPT: int = 16
+
+
+class RoundSchedule(NamedTuple):
+    # Policy for rounds the server runs on its own; participants=None means
+    # everyone registered when each round opens.
+    until: int
+    participants: Tuple[str, ...] | None = None
+    quorum: int | None = None
+    deadline: float | None = None
+    recovery_timeout: float = RECOVERY_TIMEOUT_SECONDS
+    max_retries: int = SCHEDULE_MAX_RETRIES
+    # Samples each round's participants from the candidates above; None takes them all.
+    selection: ClientSelection | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        document: Dict[str, Any] = self._asdict()
+        document["participants"] = list(self.participants) if self.participants is not None else None
+        document["selection"] = self.selection.as_dict() if self.selection is not None else None
+        return document
 
 
 class GlobalModelState:
-    def __init__(self, feature_weight: int = 12) -> None:
+    def __init__(
+        self,
+        feature_weight: int = 12,
+        aggregation: str = "buffered",
+        shards: int = 8,
+        compression: str = "none",
+        compression_bits: int | None = None,
+        compression_scale: float | None = None,
+        compression_ratio: float = 0.1,
+        scheduling: str = "sync",
+        buffer_size: int = 10,
+        staleness_exponent: float = 0.5,
+        max_staleness: int | None = None,
+        max_clients: int | None = None,
+        optimizer: str = "fedavg",
+        server_lr: float | None = None,
+        server_momentum: float = 0.9,
+        server_beta2: float = 0.99,
+        server_tau: float = 1e-3,
+        checkpointer: Checkpointer | None = None,
+        registry: MetricsRegistry | None = None
+    ) -> None:
+        if aggregation not in AGGREGATION_MODES:
+            raise ValueError(f"Unknown aggregation mode {aggregation!r}. Expected one of {AGGREGATION_MODES}")
+        if scheduling not in SCHEDULING_MODES:
+            raise ValueError(f"Unknown scheduling mode {scheduling!r}. Expected one of {SCHEDULING_MODES}")
+        if shards < 1 or buffer_size < 1:
+            raise ValueError("shards and buffer_size must be >= 1")
+        if max_clients is not None and max_clients < 1:
+            raise ValueError("max_clients must be >= 1")
+        if scheduling == "async" and compression != "none":
+            # Staleness weights are applied per update, which needs plaintext deltas.
+            raise ValueError("async scheduling does not support compression")
+
         self.model: Logistic = Logistic(feature_weight)
+        self.optimizer: ServerOptimizer = ServerOptimizer(
+            optimizer,
+            self.model._dim,
+            learning_rate=server_lr,
+            momentum=server_momentum,
+            beta2=server_beta2,
+            tau=server_tau
+        )
+        self.compression: str = compression
+        self._compression_options: Dict[str, Any] = {
+            "bits": compression_bits,
+            "scale": compression_scale,
+            "ratio": compression_ratio
+        }
+        # Announced with the model; clients quantize into this ring before masking.
+        self.compression_spec: CompressionSpec | None = make_spec(
+            compression,
+            self.model._dim,
+            **self._compression_options
+        )
         self.round: int = 0
+        # Distinguishes this state's model versions from those of an earlier process,
+        # so a client cache never matches weights the server no longer has.
+        self.generation: str = secrets.token_hex(6)
+        self._versions: Deque[Tuple[int, NDArray[numpy.float64]]] = deque(
+            [(0, self.model.get_model_weight())],
+            maxlen=MODEL_VERSIONS_KEPT
+        )
+        # In async mode `round` is the model version; every `buffer_size` arrivals
+        # are folded in, each weighted by 1 / (1 + staleness) ** staleness_exponent.
+        self.scheduling: str = scheduling
+        self.buffer_size: int = int(buffer_size)
+        self.staleness_exponent: float = float(staleness_exponent)
+        self.max_staleness: int | None = max_staleness
+        self.async_sum: NDArray[numpy.float64] = numpy.zeros(self.model._dim, dtype=numpy.float64)
+        self.async_contributors: List[Tuple[str, int]] = []
+        # Newest base version accepted from each client; unlike the buffer it outlives a flush.
+        self.async_versions: Dict[str, int] = {}
         self.registered: List[str] = []
+        self._registered_set: Set[str] = set()
+        self.max_clients: int | None = max_clients
+        self.roster_version: int = 0
+        # Edge aggregators register with the clients behind them; pair masks span those clients.
+        self.members: Dict[str, List[str]] = {}
         self.expected: Set[str] = set()
+        self.round_participants: Set[str] = set()
+        # Mixed into every pair seed; drawn afresh whenever a round opens, retries included,
+        # so a mask correction never reveals a pair term that is used again.
+        self.mask_nonce: str = secrets.token_hex(8)
+        # Smoothed seconds from a round opening to each client's update arriving.
+        self.latency: Dict[str, float] = {}
+        self._round_opened: float = time.monotonic()
+        self.aggregation: str = aggregation
+        self.contributors: Set[str] = set()
+        self.reported_by: Dict[str, List[str]] = {}
+        self.pending: Set[str] = set()
         self.updates: Dict[str, NDArray[numpy.float64]] = {}
-        self.lock: Lock = Lock()
-        self.history: List[dict] = []
+        self.quorum: int | None = None
+        self.deadline: float | None = None
+        self._deadline_timer: Timer | None = None
+        # Set by schedule_rounds: a ready round is finalized and the next one opened
+        # in the same lock hold, without a controller round trip in between.
+        self.schedule: RoundSchedule | None = None
+        self.schedule_retries: int = 0
+        self.round_retries: int = 0
+        # Why the last schedule stopped before reaching `until`, if it did.
+        self.schedule_error: str | None = None
+        # Once closed, late updates are refused. Contributors then send corrections
+        # for the pair masks they share with registered peers that did not report.
+        self.closed: bool = False
+        self.recovery_pending: Set[str] = set()
+        self.recovered: Set[str] = set()
+        # Streaming sums are split across shards so concurrent submissions only
+        # contend on their own shard while the numpy add runs.
+        self.shards: List[Tuple[Lock, NDArray[numpy.float64] | NDArray[numpy.uint64]]] = [
+            (Lock(), self._round_buffer())
+            for _ in range(shards)
+        ]
+        self.recovery_sum: NDArray[numpy.float64] | NDArray[numpy.uint64] = self._round_buffer()
+        registry = registry or REGISTRY
+        self.lock: TimedLock = TimedLock(
+            wait=registry.histogram("skynet_state_lock_wait_seconds", "Time spent waiting for the GlobalModelState lock.", LOCK_BUCKETS),
+            hold=registry.histogram("skynet_state_lock_hold_seconds", "Time the GlobalModelState lock is held per acquisition.", LOCK_BUCKETS)
+        )
+        self.changed: Condition = Condition(self.lock)
+        self._aggregation_seconds = registry.histogram(
+            "skynet_aggregation_seconds",
+            "Time to combine a round's updates into the model update.",
+            labels=("mode",)
+        )
+        self.epoch: int = 0
+        self.round_epoch: int = 0
+        self.history: HistoryStore = HistoryStore()
         self.metrics: Dict[int, Dict[str, dict]] = {}
+        # Persists every finalized round; an unfinished round is not saved.
+        self.checkpointer: Checkpointer | None = checkpointer
+
+    def close(self) -> None:
+        # Detaches the checkpointer and stops the schedule and deadline timer, so
+        # requests still in flight can no longer write or reopen rounds.
+        with self.lock:
+            checkpointer: Checkpointer | None = self.checkpointer
+            self.checkpointer = None
+            self.schedule = None
+            self._cancel_deadline()
+            self.deadline = None
+            self._notify_changed()
+        if checkpointer is not None:
+            checkpointer.close()
+
+    def restore(self, checkpoint: Checkpoint) -> None:
+        if checkpoint.weights.shape != (self.model._dim,):
+            raise ValueError(
+                f"checkpoint has {checkpoint.weights.shape[0]} weights, expected {self.model._dim}"
+            )
+        with self.lock:
+            self._wait_for_pending()
+            self.round = checkpoint.round
+            self.model.set_model_weight(checkpoint.weights)
+            if checkpoint.optimizer_state is not None and (checkpoint.optimizer or {}).get("name") == self.optimizer.name:
+                self.optimizer.load(checkpoint.optimizer_state, checkpoint.optimizer.get("steps", 0))
+            self._versions.clear()
+            self._versions.append((self.round, self.model.get_model_weight()))
+            self.registered = list(checkpoint.registered)
+            self._registered_set = set(self.registered)
+            self.members = dict(checkpoint.members)
+            self.roster_version = checkpoint.roster_version
+            self.history = checkpoint.history
+            spec: CompressionSpec | None = CompressionSpec.from_dict(checkpoint.compression)
+            if spec is not None and spec.scheme == self.compression:
+                self.compression_spec = spec
+            self.expected.clear()
+            self.round_participants = set()
+            self._reset_round_buffers()
+            self._notify_changed(round_changed=True)
 
-    def register(self, client_id: str) -> None:
+    def register(
+        self,
+        client_id: str,
+        members: Iterable[str] | None = None
+    ) -> None:
         with self.lock:
-            if client_id not in self.registered:
+            changed: bool = False
+            if client_id not in self._registered_set:
+                if self.max_clients is not None and len(self.registered) >= self.max_clients:
+                    raise ValueError(f"roster is full ({self.max_clients} clients)")
+                self._registered_set.add(client_id)
                 self.registered.append(client_id)
+                changed = True
+            if members is not None and list(members) != self.members.get(client_id):
+                self.members[client_id] = list(members)
+                changed = True
+            if changed:
+                self.roster_version += 1
+                self._notify_changed()
+
+    def _leaves(self, client_ids: Iterable[str]) -> List[str]:
+        leaves: List[str] = []
+        for client_id in client_ids:
+            leaves.extend(self.members[client_id] if client_id in self.members else [client_id])
+        return leaves
+
+    def _reported(self) -> Set[str]:
+        return {leaf for members in self.reported_by.values() for leaf in members}
+
+    def _contributor_count(self) -> int:
+        return sum(len(members) for members in self.reported_by.values()) or len(self.contributors)
+
+    def _check_capacity(self, participants: Set[str]) -> None:
+        spec: CompressionSpec | None = self.compression_spec
+        if spec is not None and len(self._leaves(participants)) > spec.max_participants():
+            raise ValueError(
+                f"{len(self._leaves(participants))} participants overflow the {spec.bits}-bit ring "
+                f"(max {spec.max_participants()}); raise the compression bits"
+            )
+
+    def _select(
+        self,
+        candidates: Set[str],
+        selection: ClientSelection | None,
+        quorum: int | None,
+        attempt: int = 0
+    ) -> Tuple[Set[str], int | None]:
+        if selection is None:
+            return candidates, quorum
+        if len(candidates) < MIN_SURVIVORS:
+            raise ValueError(f"{len(candidates)} candidates cannot fill a sampled round of at least {MIN_SURVIVORS}")
+        rng: numpy.random.Generator = numpy.random.default_rng(
+            None if selection.seed is None else (selection.seed, self.round, attempt)
+        )
+        chosen, cutoff = selection.select(sorted(candidates), self.latency, rng)
+        if quorum:
+            quorum = min(int(quorum), cutoff or len(chosen))
+        return set(chosen), quorum or cutoff
+
+    def _check_quorum(self, quorum: int | None, participants: int) -> None:
+        if quorum and participants > 1 and int(quorum) < MIN_SURVIVORS:
+            raise ValueError(f"quorum must be >= {MIN_SURVIVORS}: a lone reporter's correction would unmask its update")
+
+    def configure_training_round(
+        self,
+        participants: Iterable[str],
+        quorum: int | None = None,
+        deadline: float | None = None,
+        selection: ClientSelection | None = None
+    ) -> List[str]:
+        if self.scheduling == "async":
+            raise ValueError("async scheduling has no rounds to configure")
+        participants = set(participants)
+        self._check_quorum(quorum, len(participants))
+        with self.lock:
+            self._wait_for_pending()
+            participants, quorum = self._select(participants, selection, quorum)
+            self._check_capacity(participants)
+            self._open_round(participants, quorum, deadline)
+            return sorted(participants)
+
+    def _open_round(
+        self,
+        participants: Set[str],
+        quorum: int | None,
+        deadline: float | None
+    ) -> None:
+        self.expected = participants
+        self.round_participants = set(participants)
+        self.mask_nonce = secrets.token_hex(8)
+        self._reset_round_buffers()
+        self._round_opened = time.monotonic()
+        self.quorum = quorum or None
+        if deadline:
+            self._arm_deadline(deadline)
+        self._notify_changed(round_changed=True)
+
+    def _arm_deadline(self, seconds: float) -> None:
+        self._cancel_deadline()
+        self.deadline = time.monotonic() + seconds
+        self._deadline_timer = Timer(seconds, self._close_if_due)
+        self._deadline_timer.daemon = True
+        self._deadline_timer.start()
+
+    def schedule_rounds(
+        self,
+        rounds: int,
+        participants: Iterable[str] | None = None,
+        quorum: int | None = None,
+        deadline: float | None = None,
+        recovery_timeout: float = RECOVERY_TIMEOUT_SECONDS,
+        selection: ClientSelection | None = None,
+        max_retries: int = SCHEDULE_MAX_RETRIES
+    ) -> RoundSchedule:
+        if self.scheduling == "async":
+            raise ValueError("async scheduling has no rounds to schedule")
+        if rounds < 1:
+            raise ValueError("rounds must be >= 1")
+        if recovery_timeout <= 0:
+            raise ValueError("recovery_timeout must be > 0")
+        if max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
+        with self.lock:
+            self._wait_for_pending()
+            chosen: Set[str] = set(participants) if participants is not None else set(self.registered)
+            if not chosen:
+                raise ValueError("no participants to schedule")
+            self._check_quorum(quorum, len(chosen))
+            if selection is None:
+                self._check_capacity(chosen)
+            elif len(chosen) < MIN_SURVIVORS:
+                raise ValueError(f"a sampled schedule needs at least {MIN_SURVIVORS} candidates")
+            self.schedule = RoundSchedule(
+                until=self.round + int(rounds),
+                participants=tuple(sorted(chosen)) if participants is not None else None,
+                quorum=quorum or None,
+                deadline=deadline or None,
+                recovery_timeout=float(recovery_timeout),
+                max_retries=int(max_retries),
+                selection=selection
+            )
+            self.schedule_retries = self.round_retries = 0
+            self.schedule_error = None
+            # A round the caller already opened keeps running under the new policy.
+            if self._round_phase() == "idle":
+                self._open_scheduled_round()
+            elif self._round_ready():
+                self._advance_schedule()
+            self._notify_changed()
+            return self.schedule
+
+    def cancel_schedule(self) -> bool:
+        # The open round stays open; /finish-round can still complete it.
+        with self.lock:
+            if self.schedule is None:
+                return False
+            self.schedule = None
+            self._notify_changed()
+            return True
+
+    def _open_scheduled_round(self) -> None:
+        schedule: RoundSchedule | None = self.schedule
+        if schedule is None:
+            return
+        if self.round >= schedule.until:
+            self.schedule = None
+            return
+        participants: Set[str] = set(schedule.participants) if schedule.participants is not None else set(self.registered)
+        try:
+            # A retried round draws a fresh sample, which sees the stragglers' updated latencies.
+            participants, quorum = self._select(participants, schedule.selection, schedule.quorum, self.schedule_retries)
+            self._check_capacity(participants)
+        except ValueError as error:
+            self._stop_schedule(str(error))
+            return
+        self._open_round(participants, quorum, schedule.deadline)
+
+    def _stop_schedule(self, reason: str) -> None:
+        print(f"[server] schedule stopped at round {self.round}: {reason}")
+        self.schedule = None
+        self.schedule_error = reason
+        self._notify_changed(round_changed=True)
+
+    def _advance_schedule(self) -> None:
+        if self.schedule is None or not self._round_ready():
+            return
+        self._finalize_round()
+        self.round_retries = 0
+        self._open_scheduled_round()
+
+    def _retry_round(self) -> None:
+        # Too few updates by the deadline, or a recovery that never completed: the
+        # round is discarded and reopened under the same number.
+        summary: str = (
+            f"{len(self.contributors)}/{len(self.expected)} updates, "
+            f"{len(self.recovery_pending)} corrections missing"
+        )
+        self.expected.clear()
+        self._reset_round_buffers()
+        if self.schedule is not None and self.round_retries >= self.schedule.max_retries:
+            self._stop_schedule(f"round {self.round} failed {self.round_retries + 1} times ({summary})")
+            return
+        self.schedule_retries += 1
+        self.round_retries += 1
+        print(f"[server] retrying round {self.round}: {summary}")
+        self._open_scheduled_round()
+
+    def _close_if_due(self) -> None:
+        with self.lock:
+            self._wait_for_pending()
+            self._maybe_close()
+            if (
+                self.schedule is not None
+                and self.deadline is not None
+                and time.monotonic() >= self.deadline
+                and not self._round_ready()
+            ):
+                self._retry_round()
+
+    def _maybe_close(self) -> None:
+        if self.closed or not self.expected or self.pending:
+            return
+
+        received: int = len(self.contributors)
+        survivors: int = min(MIN_SURVIVORS, len(self.expected))
+        due: bool = (
+            self._all_received()
+            or (self.quorum is not None and received >= max(self.quorum, survivors))
+            or (
+                self.deadline is not None
+                and time.monotonic() >= self.deadline
+                and received >= survivors
+            )
+        )
+        if due:
+            self._close_round()
+
+    def _close_round(self) -> None:
+        self.closed = True
+        self._cancel_deadline()
+        self.deadline = None
+        elapsed: float = time.monotonic() - self._round_opened
+        for client_id in self.round_participants - self.contributors:
+            # A straggler cut off here is only known to be slower than the cutoff.
+            self._observe_latency(client_id, max(elapsed, self.latency.get(client_id, elapsed)))
+        # Every contributor masked against the leaves of this round's participants.
+        if self.contributors and set(self._leaves(self.round_participants)) - self._reported():
+            self.recovery_pending = set(self.contributors)
+        self._notify_changed(round_changed=True)
+        if self.schedule is not None:
+            if self.recovery_pending:
+                self._arm_deadline(self.schedule.recovery_timeout)
+            else:
+                self._advance_schedule()
+
+    def _observe_latency(self, client_id: str, seconds: float) -> None:
+        self.latency[client_id] = smooth_latency(self.latency.get(client_id), seconds)
+
+    def _cancel_deadline(self) -> None:
+        if self._deadline_timer is not None:
+            self._deadline_timer.cancel()
+            self._deadline_timer = None
+
+    def _notify_changed(self, round_changed: bool = False) -> None:
+        self.epoch += 1
+        if round_changed:
+            self.round_epoch += 1
+        self.changed.notify_all()
+
+    def _wait_for_pending(self) -> None:
+        self.changed.wait_for(lambda: not self.pending)
+
+    def wait_for_change(
+        self,
+        since: int,
+        timeout: float,
+        watch: str = "epoch"
+    ) -> int:
+        if watch not in WATCH_COUNTERS:
+            raise ValueError(f"Unknown counter {watch!r}. Expected one of {WATCH_COUNTERS}")
+
+        with self.lock:
+            self.changed.wait_for(
+                lambda: getattr(self, watch) != since,
+                timeout=timeout
+            )
+            return getattr(self, watch)
+
+    def _round_buffer(self) -> NDArray[numpy.float64] | NDArray[numpy.uint64]:
+        if self.compression_spec is None:
+            return numpy.zeros(self.model._dim, dtype=numpy.float64)
+        return numpy.zeros(self.compression_spec.length(self.model._dim), dtype=numpy.uint64)
+
+    def _reset_round_buffers(self) -> None:
+        self.contributors = set()
+        self.reported_by = {}
+        self.updates = {}
+        self.async_sum.fill(0.0)
+        self.async_contributors = []
+        self.closed = False
+        self.recovery_pending = set()
+        self.recovered = set()
+        self._cancel_deadline()
+        self.deadline = None
+        fresh = self._round_buffer()
+        self.recovery_sum = fresh.copy()
+        for index, (shard_lock, shard_sum) in enumerate(self.shards):
+            with shard_lock:
+                if shard_sum.shape == fresh.shape and shard_sum.dtype == fresh.dtype:
+                    shard_sum.fill(0)
+                else:
+                    self.shards[index] = (shard_lock, fresh.copy())
+
+    def _coerce_update(
+        self,
+        delta: NDArray[numpy.float64] | NDArray[numpy.uint64]
+    ) -> NDArray[numpy.float64] | NDArray[numpy.uint64]:
+        spec: CompressionSpec | None = self.compression_spec
+        if spec is None:
+            if numpy.shape(delta) != (self.model._dim,):
+                raise ValueError(f"update has shape {numpy.shape(delta)}, expected {(self.model._dim,)}")
+            return delta
+
+        length: int = spec.length(self.model._dim)
+        if numpy.shape(delta) != (length,):
+            raise ValueError(f"compressed update has shape {numpy.shape(delta)}, expected {(length,)}")
+        ring = numpy.asarray(delta)
+        if ring.dtype.kind == "f" and not numpy.all((ring >= 0) & (ring == numpy.floor(ring))):
+            raise ValueError("compressed update must contain non-negative integers")
+        ring = ring.astype(numpy.uint64)
+        if numpy.any(ring >= spec.modulus):
+            raise ValueError(f"compressed update has values outside the {spec.bits}-bit ring")
+        return ring
+
+    def _accept(
+        self,
+        client_id: str,
+        delta: NDArray[numpy.float64],
+        round: int | None = None,
+        members: List[str] | None = None,
+        metric: dict | None = None
+    ) -> str:
+        delta = self._coerce_update(delta)
+        if self.scheduling == "async":
+            return self._accept_async(client_id, delta, round, metric)
 
-    def configure_training_round(self, participants: Iterable[str]) -> None:
         with self.lock:
-            self.expected = set(participants)
-            self.updates = {}
+            if round is not None:
+                if not self.expected:
+                    return "round_not_configured"
+                if client_id not in self.expected:
+                    return "not_expected"
+                if round != self.round:
+                    return "wrong_round"
+                if members is not None and not set(members) <= set(self.members.get(client_id, ())):
+                    return "not_expected"
+            if client_id in self.contributors or client_id in self.pending:
+                return "duplicate"
+            if self.closed:
+                return "round_closed"
+            # Recorded with the update, before a quorum can finalize the round.
+            if metric is not None:
+                self.metrics.setdefault(self.round, {})[client_id] = metric
+
+            if self.aggregation == "buffered":
+                self.updates[client_id] = delta
+                self.contributors.add(client_id)
+                self._observe_latency(client_id, time.monotonic() - self._round_opened)
+                self.reported_by[client_id] = list(members) if members is not None else [client_id]
+                self._notify_changed()
+                self._maybe_close()
+                return SUBMIT_ACCEPTED
+
+            self.pending.add(client_id)
+
+        shard_lock, shard_sum = self.shards[hash(client_id) % len(self.shards)]
+        with shard_lock:
+            numpy.add(shard_sum, delta, out=shard_sum)
+
+        with self.lock:
+            self.pending.discard(client_id)
+            self.contributors.add(client_id)
+            self._observe_latency(client_id, time.monotonic() - self._round_opened)
+            self.reported_by[client_id] = list(members) if members is not None else [client_id]
+            self._notify_changed()
+            self._maybe_close()
+        return SUBMIT_ACCEPTED
+
+    def _accept_async(
+        self,
+        client_id: str,
+        delta: NDArray[numpy.float64],
+        round: int | None,
+        metric: dict | None = None
+    ) -> str:
+        with self.lock:
+            if client_id not in self._registered_set:
+                return "not_expected"
+            base_version: int = self.round if round is None else int(round)
+            staleness: int = self.round - base_version
+            if staleness < 0 or (self.max_staleness is not None and staleness > self.max_staleness):
+                return "stale" if staleness > 0 else "wrong_round"
+            if base_version <= self.async_versions.get(client_id, -1):
+                return "duplicate"
+
+            weight: float = (1.0 + staleness) ** -self.staleness_exponent
+            self.async_sum += weight * delta
+            self.async_contributors.append((client_id, base_version))
+            self.async_versions[client_id] = base_version
+            self.contributors.add(client_id)
+            if metric is not None:
+                self.metrics.setdefault(self.round, {})[client_id] = metric
+            if len(self.async_contributors) >= self.buffer_size:
+                self._finalize_round()
+            else:
+                self._notify_changed()
+            return SUBMIT_ACCEPTED
+
+    def submit_recovery(
+        self,
+        client_id: str,
+        round: int,
+        correction: NDArray[numpy.float64] | NDArray[numpy.uint64]
+    ) -> str:
+        correction = self._coerce_update(correction)
+
+        with self.lock:
+            if round != self.round:
+                return "wrong_round"
+            if client_id in self.recovered:
+                return "duplicate"
+            if client_id not in self.recovery_pending:
+                return "not_expected"
+
+            numpy.add(self.recovery_sum, correction, out=self.recovery_sum)
+            self.recovery_pending.discard(client_id)
+            self.recovered.add(client_id)
+            self._notify_changed(round_changed=not self.recovery_pending)
+            self._advance_schedule()
+            return SUBMIT_ACCEPTED
 
     def add_client_data_to_current_model(
         self,
         client_id: str,
         delta: NDArray[numpy.float64]
-    ) -> None:
+    ) -> bool:
+        return self._accept(client_id, delta) == SUBMIT_ACCEPTED
+
+    def submit_update(
+        self,
+        client_id: str,
+        round: int,
+        delta: NDArray[numpy.float64],
+        members: List[str] | None = None,
+        metric: dict | None = None
+    ) -> str:
+        return self._accept(client_id, delta, round=round, members=members, metric=metric)
+
+    def drop_participant(self, client_id: str) -> bool:
+        with self.lock:
+            if client_id not in self.expected:
+                return False
+
+            if client_id in self.contributors or client_id in self.pending:
+                if self.closed:
+                    raise ValueError(f"{client_id} already counted in a closed round")
+                if self.aggregation == "streaming":
+                    raise ValueError(f"{client_id} already folded into the streaming sum")
+                self.contributors.discard(client_id)
+                self.reported_by.pop(client_id, None)
+                self.updates.pop(client_id, None)
+
+            self.expected.discard(client_id)
+            self._notify_changed(round_changed=True)
+            self._maybe_close()
+            return True
+
+    def abort_round(self) -> None:
+        # Discards a round whose recovery cannot complete; the model is unchanged.
         with self.lock:
-            self.updates[client_id] = delta
+            self._wait_for_pending()
+            self.expected.clear()
+            self._reset_round_buffers()
+            self._notify_changed(round_changed=True)
+            self._open_scheduled_round()
 
     def add_client_metrics(
         self,
@@ -44,34 +716,204 @@ class GlobalModelState:
             metric_bucket = self.metrics.setdefault(self.round, {})
             metric_bucket[client_id] = metric
 
-    def check_all_data_received(self) -> bool:
+    def registered_clients(self) -> List[str]:
         with self.lock:
-            return set(self.updates.keys()) == self.expected
+            return list(self.registered)
 
-    def process_and_update_to_global_model(self) -> int:
+    def roster_snapshot(self) -> Tuple[int, List[str]]:
+        with self.lock:
+            return self.roster_version, self._leaves(self.registered)
+
+    def latency_snapshot(self) -> Dict[str, float]:
+        with self.lock:
+            return dict(self.latency)
+
+    def received_clients(self) -> List[str]:
         with self.lock:
-            mats_array: NDArray[numpy.float64] = numpy.stack(
-                list(self.updates.values()),
-                axis=0
+            return sorted(self.contributors)
+
+    def expected_clients(self) -> List[str]:
+        with self.lock:
+            return sorted(self.expected)
+
+    def status_snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            snapshot: Dict[str, Any] = {
+                "epoch": self.epoch,
+                "round_epoch": self.round_epoch,
+                "round": self.round,
+                "roster_version": self.roster_version,
+                "registered": list(self.registered),
+                "expected": sorted(self.expected),
+                # The leaves this round's pair masks span.
+                "participants": sorted(self._leaves(self.round_participants)),
+                "mask_nonce": self.mask_nonce,
+                "received": sorted(self.contributors),
+                "phase": self._round_phase(),
+                "scheduling": self.scheduling,
+                "recovered": sorted(self.recovered),
+                "schedule": self._schedule_status(),
+                "schedule_error": self.schedule_error
+            }
+            if self.members:
+                snapshot["reported"] = sorted(self._reported())
+            return snapshot
+
+    def _schedule_status(self) -> Dict[str, Any] | None:
+        if self.schedule is None:
+            return None
+        return {**self.schedule.as_dict(), "retries": self.schedule_retries}
+
+    def schedule_snapshot(self) -> Dict[str, Any] | None:
+        with self.lock:
+            return self._schedule_status()
+
+    def _round_phase(self) -> str:
+        if self.scheduling == "async":
+            return "async"
+        if not self.expected and not self.contributors:
+            return "idle"
+        if not self.closed:
+            return "collecting"
+        return "recovery" if self.recovery_pending else "ready"
+
+    def model_snapshot(self) -> Tuple[int, NDArray[numpy.float64]]:
+        with self.lock:
+            return self.round, self.model.get_model_weight()
+
+    def model_delta(self, since: int) -> Tuple[int, NDArray[numpy.float64] | None, Dict[str, Any] | None]:
+        # Current weights minus those of version `since`; None once that version is no longer kept.
+        with self.lock:
+            spec: CompressionSpec | None = self.compression_spec
+            document: Dict[str, Any] | None = spec.as_dict() if spec is not None else None
+            for version, weights in self._versions:
+                if version == since:
+                    return self.round, self.model.weight - weights, document
+            return self.round, None, document
+
+    def training_snapshot(self) -> Tuple[int, NDArray[numpy.float64], Dict[str, Any] | None]:
+        # Weights and compression spec of one round, read together.
+        with self.lock:
+            spec: CompressionSpec | None = self.compression_spec
+            return (
+                self.round,
+                self.model.get_model_weight(),
+                spec.as_dict() if spec is not None else None
             )
-            aggregate: NDArray[numpy.float64] = mats_array.mean(axis=0)
-            self.model.set_model_weight(
-                self.model.get_model_weight() + aggregate
+
+    def progress(self) -> Tuple[int, int, bool]:
+        with self.lock:
+            return len(self.contributors), len(self.expected), self._all_received()
+
+    def _all_received(self) -> bool:
+        return (
+            not self.pending
+            and len(self.contributors) == len(self.expected)
+            and self.contributors == self.expected
+        )
+
+    def _round_ready(self) -> bool:
+        return self.closed and not self.recovery_pending
+
+    def check_all_data_received(self) -> bool:
+        with self.lock:
+            return self._all_received()
+
+    def _raw_total(self) -> NDArray[numpy.float64] | NDArray[numpy.uint64]:
+        # Sum of the accepted updates as received: floats, or ring elements modulo 2**64.
+        if self.aggregation == "streaming":
+            total = self._round_buffer()
+            for shard_lock, shard_sum in self.shards:
+                with shard_lock:
+                    total += shard_sum
+            return total
+        if not self.updates:
+            return self._round_buffer()
+        stacked = numpy.stack(list(self.updates.values()), axis=0)
+        if self.compression_spec is not None:
+            return stacked.sum(axis=0, dtype=numpy.uint64)
+        return stacked.sum(axis=0)
+
+    def _aggregate(self) -> NDArray[numpy.float64]:
+        if self.scheduling == "async":
+            return self.async_sum / max(len(self.async_contributors), 1)
+        if not self.contributors:
+            return numpy.zeros(self.model._dim, dtype=numpy.float64)
+
+        total = self._raw_total()
+        if self.recovered:
+            # Removes the pair masks shared with peers that never reported.
+            numpy.subtract(total, self.recovery_sum, out=total)
+
+        if self.compression_spec is not None:
+            # Masks cancel modulo 2**bits, leaving the signed sum of quantized levels.
+            total = decompress(
+                ring_sum_to_levels(total, self.compression_spec),
+                self.compression_spec,
+                self.model._dim
             )
+        return total / self._contributor_count()
+
+    def process_and_update_to_global_model(self) -> int:
+        with self.lock:
+            self._wait_for_pending()
+            return self._finalize_round()
 
-            current_round_metrics = self.metrics.pop(self.round, {})
-            weight = self.model.get_model_weight()
-            self.history.append(
-                {
-                    "round": self.round + 1,
-                    "timestamp_utc": time.time(),
-                    "participants": sorted(list(self.updates.keys())),
-                    "received": len(self.updates),
-                    "weight_norm": float(numpy.linalg.norm(weight)),
-                    "accuracy": current_round_metrics,
-                }
+    def finish_round_if_complete(self) -> int | None:
+        with self.lock:
+            self._wait_for_pending()
+            self._maybe_close()
+            if not self._round_ready():
+                return None
+            return self._finalize_round()
+
+    def _finalize_round(self) -> int:
+        with self._aggregation_seconds.time("async" if self.scheduling == "async" else self.aggregation):
+            aggregate: NDArray[numpy.float64] = self._aggregate()
+        numpy.add(self.model.weight, self.optimizer.step(aggregate), out=self.model.weight)
+
+        current_round_metrics = self.metrics.pop(self.round, {})
+        weight = self.model.get_model_weight()
+        entry: Dict[str, Any] = {
+            "round": self.round + 1,
+            "timestamp_utc": time.time(),
+            "participants": sorted(self.contributors),
+            "received": len(self.contributors),
+            "dropped": sorted(self.round_participants - self.contributors),
+            "weight_norm": float(numpy.linalg.norm(weight)),
+            "accuracy": current_round_metrics,
+        }
+        if self.members:
+            entry["reported"] = sorted(self._reported())
+        if self.scheduling == "async":
+            entry["received"] = len(self.async_contributors)
+            entry["staleness"] = [self.round - version for _, version in self.async_contributors]
+        self.history.append(entry)
+        self.round += 1
+        self._versions.append((self.round, weight))
+        self.expected.clear()
+        self.round_participants = set()
+        self.compression_spec = make_spec(
+            self.compression,
+            self.model._dim,
+            previous_update=aggregate,
+            round=self.round,
+            **self._compression_options
+        )
+        self._reset_round_buffers()
+        if self.checkpointer is not None:
+            self.checkpointer.save(
+                self.round,
+                weight,
+                meta={
+                    "registered": list(self.registered),
+                    "members": {edge: list(members) for edge, members in self.members.items()},
+                    "roster_version": self.roster_version,
+                    "compression": self.compression_spec.as_dict() if self.compression_spec is not None else None,
+                    "optimizer": self.optimizer.as_dict()
+                },
+                entry=entry,
+                slots=self.optimizer.slots
             )
-            self.round += 1
-            self.expected.clear()
-            self.updates.clear()
-            return self.round
+        self._notify_changed(round_changed=True)
+        return self.round
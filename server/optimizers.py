@@ -0,0 +1,103 @@
+import numpy
+from numpy.typing import NDArray
+from typing import Any, Dict
+
+SERVER_OPTIMIZERS = ("fedavg", "fedavgm", "fedadam", "fedyogi")
+# Buffers each optimizer carries from round to round.
+OPTIMIZER_SLOTS: Dict[str, int] = {
+    "fedavg": 0,
+    "fedavgm": 1,
+    "fedadam": 2,
+    "fedyogi": 2,
+}
+DEFAULT_SERVER_LR: Dict[str, float] = {
+    "fedavg": 1.0,
+    "fedavgm": 1.0,
+    "fedadam": 0.1,
+    "fedyogi": 0.1,
+}
+
+
+class ServerOptimizer:
+    # Treats the round's mean client delta as a pseudo-gradient and turns it into
+    # the step applied to the global model (Reddi et al., "Adaptive Federated Optimization").
+    # Every buffer is allocated once; step() only writes into them.
+    def __init__(
+        self,
+        name: str,
+        dimensions: int,
+        learning_rate: float | None = None,
+        momentum: float = 0.9,
+        beta2: float = 0.99,
+        tau: float = 1e-3
+    ) -> None:
+        if name not in SERVER_OPTIMIZERS:
+            raise ValueError(f"Unknown server optimizer {name!r}. Expected one of {SERVER_OPTIMIZERS}")
+        if not 0.0 <= momentum < 1.0 or not 0.0 <= beta2 < 1.0:
+            raise ValueError("server momentum and beta2 must be in [0, 1)")
+        if tau <= 0:
+            raise ValueError("server tau must be > 0")
+        self.name: str = name
+        self.learning_rate: float = float(learning_rate if learning_rate is not None else DEFAULT_SERVER_LR[name])
+        if self.learning_rate <= 0:
+            raise ValueError("server learning rate must be > 0")
+        self.momentum: float = float(momentum)
+        self.beta2: float = float(beta2)
+        self.tau: float = float(tau)
+        self.steps: int = 0
+        # Row 0 is the momentum (first moment), row 1 the second moment.
+        self.slots: NDArray[numpy.float64] = numpy.zeros((OPTIMIZER_SLOTS[name], dimensions), dtype=numpy.float64)
+        self._step: NDArray[numpy.float64] = numpy.zeros(dimensions, dtype=numpy.float64)
+        self._scratch: NDArray[numpy.float64] = numpy.zeros(dimensions, dtype=numpy.float64)
+
+    def step(self, pseudo_gradient: NDArray[numpy.float64]) -> NDArray[numpy.float64]:
+        # The returned array is reused by the next call.
+        out: NDArray[numpy.float64] = self._step
+        if self.name == "fedavg":
+            numpy.multiply(pseudo_gradient, self.learning_rate, out=out)
+        elif self.name == "fedavgm":
+            momentum: NDArray[numpy.float64] = self.slots[0]
+            momentum *= self.momentum
+            momentum += pseudo_gradient
+            numpy.multiply(momentum, self.learning_rate, out=out)
+        else:
+            first, second = self.slots
+            scratch: NDArray[numpy.float64] = self._scratch
+            first *= self.momentum
+            numpy.multiply(pseudo_gradient, 1.0 - self.momentum, out=scratch)
+            first += scratch
+            numpy.multiply(pseudo_gradient, pseudo_gradient, out=scratch)
+            if self.name == "fedadam":
+                second *= self.beta2
+                scratch *= 1.0 - self.beta2
+                second += scratch
+            else:
+                # Yogi moves v towards g**2 by a fixed fraction of g**2, so v grows slowly.
+                numpy.subtract(second, scratch, out=out)
+                numpy.sign(out, out=out)
+                out *= scratch
+                out *= 1.0 - self.beta2
+                second -= out
+            numpy.sqrt(second, out=out)
+            out += self.tau
+            numpy.divide(first, out, out=out)
+            out *= self.learning_rate
+        self.steps += 1
+        return out
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "learning_rate": self.learning_rate,
+            "momentum": self.momentum,
+            "beta2": self.beta2,
+            "tau": self.tau,
+            "steps": self.steps,
+            "slots": len(self.slots)
+        }
+
+    def load(self, slots: NDArray[numpy.float64], steps: int) -> None:
+        if slots.shape != self.slots.shape:
+            raise ValueError(f"optimizer state has shape {slots.shape}, expected {self.slots.shape}")
+        self.slots[...] = slots
+        self.steps = int(steps)
@@ -0,0 +1,86 @@
+import math
+import numpy
+from numpy.typing import NDArray
+from typing import Any, Dict, List, Mapping, NamedTuple, Sequence, Tuple
+
+SELECTION_STRATEGIES = ("all", "uniform", "latency")
+# Fewest clients a round may close with: a lone client has no peers to mask against,
+# and its mask correction would reveal its update.
+MIN_SURVIVORS: int = 2
+# Weight of the newest observation in a client's response-time estimate.
+LATENCY_SMOOTHING: float = 0.3
+
+
+class ClientSelection(NamedTuple):
+    # Which registered clients take part in a round. `fraction` of the candidates
+    # (at least `min_participants`) are needed; `overprovision` invites that many
+    # more and closes the round on the first arrivals, cutting off the stragglers.
+    strategy: str
+    fraction: float = 1.0
+    min_participants: int = 2
+    overprovision: float = 0.0
+    target_seconds: float | None = None
+    seed: int | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+    def needed(self, candidates: int) -> int:
+        return min(candidates, max(self.min_participants, math.ceil(self.fraction * candidates)))
+
+    def select(
+        self,
+        candidates: Sequence[str],
+        latency: Mapping[str, float],
+        rng: numpy.random.Generator
+    ) -> Tuple[List[str], int | None]:
+        # Returns the participants and the quorum that closes the round (None: wait for all).
+        needed: int = self.needed(len(candidates))
+        invited: int = min(len(candidates), math.ceil(needed * (1.0 + self.overprovision)))
+        if self.strategy == "uniform":
+            chosen: NDArray[numpy.int64] = rng.choice(len(candidates), size=invited, replace=False)
+        else:
+            # Clients never measured count as fastest, so every client is timed at least once.
+            estimates: NDArray[numpy.float64] = numpy.array([latency.get(client_id, 0.0) for client_id in candidates])
+            fastest: NDArray[numpy.int64] = numpy.lexsort((rng.random(len(candidates)), estimates))
+            chosen = fastest[:invited]
+            if self.target_seconds is not None:
+                # Spread the rounds over every client fast enough, not just the very fastest.
+                eligible: NDArray[numpy.int64] = fastest[estimates[fastest] <= self.target_seconds]
+                if len(eligible) >= invited:
+                    chosen = rng.choice(eligible, size=invited, replace=False)
+        return sorted(candidates[index] for index in chosen), needed if invited > needed else None
+
+
+def make_selection(
+    strategy: str = "all",
+    fraction: float = 1.0,
+    min_participants: int = 2,
+    overprovision: float = 0.0,
+    target_seconds: float | None = None,
+    seed: int | None = None
+) -> ClientSelection | None:
+    if strategy not in SELECTION_STRATEGIES:
+        raise ValueError(f"Unknown selection strategy {strategy!r}. Expected one of {SELECTION_STRATEGIES}")
+    if not 0.0 < fraction <= 1.0:
+        raise ValueError("fraction must be in (0, 1]")
+    if min_participants < MIN_SURVIVORS or overprovision < 0:
+        raise ValueError(f"min_participants must be >= {MIN_SURVIVORS} and overprovision >= 0")
+    if target_seconds is not None and target_seconds <= 0:
+        raise ValueError("target_seconds must be > 0")
+    if strategy == "all":
+        return None
+    return ClientSelection(
+        strategy,
+        float(fraction),
+        int(min_participants),
+        float(overprovision),
+        float(target_seconds) if target_seconds is not None else None,
+        int(seed) if seed is not None else None
+    )
+
+
+def smooth_latency(previous: float | None, observed: float) -> float:
+    if previous is None:
+        return observed
+    return previous + LATENCY_SMOOTHING * (observed - previous)
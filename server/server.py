@@ -2,161 +2,689 @@ import io
 import os
 import time
 import json
+import zlib
+import click
 import numpy
 from numpy.typing import NDArray
-from server.model_state import GlobalModelState
-from typing import Any, Dict, Iterable, Tuple
-from flask import Flask, request, jsonify, Response, send_file
+from models.compression import COMPRESSION_SCHEMES
+from server.checkpoint import Checkpointer
+from server.optimizers import SERVER_OPTIMIZERS
+from server.selection import ClientSelection, make_selection
+from server.tenants import (
+    DEFAULT_MODEL_ID,
+    Tenant,
+    TenantLimitError,
+    TenantLimits,
+    TenantRegistry
+)
+from models.metrics import (
+    BYTES_BUCKETS,
+    CLIENT_PHASES,
+    PROMETHEUS_MIMETYPE,
+    REGISTRY
+)
+from server.model_state import (
+    AGGREGATION_MODES,
+    SCHEDULING_MODES,
+    RECOVERY_TIMEOUT_SECONDS,
+    SCHEDULE_MAX_RETRIES,
+    SUBMIT_ACCEPTED,
+    WATCH_COUNTERS,
+    GlobalModelState,
+    RoundSchedule
+)
+from models.network import (
+    WIRE_MIMETYPE,
+    WIRE_DTYPE_HEADER,
+    WIRE_DTYPE_CODES,
+    WIRE_RING_DTYPES,
+    decode_frame,
+    encode_frame
+)
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+from flask import Flask, g, request, jsonify, Response, send_file, stream_with_context
 
 ROOT_DIRECTORY: str = os.path.dirname(os.path.dirname(__file__))
+LONG_POLL_MAX_SECONDS: float = 30.0
+# auto sends the sparse form when fewer than half the weights changed.
+DELTA_ENCODINGS = ("auto", "dense", "sparse")
+LOG_SUBMISSIONS: bool = os.environ.get("SKYNET_LOG_SUBMISSIONS", "1") != "0"
 
 server = Flask(
     __name__,
     static_folder=None
 )
 
-model_state: GlobalModelState = GlobalModelState(feature_weight=12)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "skynet_request_seconds",
+    "Request latency per route; /status includes long-poll waits.",
+    labels=("route", "status")
+)
+SUBMISSION_BYTES = REGISTRY.histogram(
+    "skynet_submission_bytes",
+    "Request body size of update and recovery submissions.",
+    BYTES_BUCKETS,
+    labels=("route",)
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    "skynet_response_bytes",
+    "Response body size per route (streamed responses are not counted).",
+    BYTES_BUCKETS,
+    labels=("route",)
+)
+CLIENT_PHASE_SECONDS = REGISTRY.histogram(
+    "skynet_client_phase_seconds",
+    "Client-reported time per round phase (pull, train, mask, upload).",
+    labels=("phase",)
+)
+
+
+@server.before_request
+def _start_timer() -> None:
+    g.request_started = time.perf_counter()
+
+
+@server.after_request
+def _record_request(response: Response) -> Response:
+    route: str = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, route, str(response.status_code))
+    if route.endswith(("/submit-update", "/submit-recovery")) and request.content_length:
+        SUBMISSION_BYTES.observe(float(request.content_length), route)
+    if response.content_length:
+        RESPONSE_BYTES.observe(float(response.content_length), route)
+    return response
+
+
+def attach_checkpoint(state: GlobalModelState, directory: str) -> GlobalModelState:
+    checkpointer: Checkpointer = Checkpointer(directory)
+    if checkpointer.exists():
+        time_0 = time.perf_counter()
+        state.restore(checkpointer.load())
+        print(
+            f"[server] resumed round {state.round} with {len(state.history)} history entries "
+            f"from {directory} in {time.perf_counter() - time_0:.3f}s",
+            flush=True
+        )
+    state.checkpointer = checkpointer
+    return state
+
+
+def _env_limit(name: str) -> int | None:
+    value: str = os.environ.get(name, "")
+    return int(value) if value else None
+
+
+def _env_float(name: str) -> float | None:
+    value: str = os.environ.get(name, "")
+    return float(value) if value else None
+
+
+model_state: GlobalModelState = GlobalModelState(
+    feature_weight=int(os.environ.get("SKYNET_FEATURE_WEIGHT", 12)),
+    aggregation=os.environ.get("SKYNET_AGGREGATION", "buffered"),
+    compression=os.environ.get("SKYNET_COMPRESSION", "none"),
+    scheduling=os.environ.get("SKYNET_SCHEDULING", "sync"),
+    max_clients=_env_limit("SKYNET_MAX_CLIENTS"),
+    optimizer=os.environ.get("SKYNET_SERVER_OPTIMIZER", "fedavg"),
+    server_lr=_env_float("SKYNET_SERVER_LR"),
+    server_momentum=float(os.environ.get("SKYNET_SERVER_MOMENTUM", 0.9)),
+    server_beta2=float(os.environ.get("SKYNET_SERVER_BETA2", 0.99)),
+    server_tau=float(os.environ.get("SKYNET_SERVER_TAU", 1e-3))
+)
+# Named federations next to model_state, served under /models/<model_id>/...
+tenants: TenantRegistry = TenantRegistry(
+    TenantLimits(
+        max_models=_env_limit("SKYNET_MAX_MODELS"),
+        max_feature_weight=_env_limit("SKYNET_MAX_FEATURE_WEIGHT"),
+        max_clients=_env_limit("SKYNET_MAX_CLIENTS"),
+        max_inflight=_env_limit("SKYNET_MAX_INFLIGHT")
+    ),
+    checkpoint_dir=os.environ.get("SKYNET_CHECKPOINT_DIR") or None,
+    attach=attach_checkpoint
+)
+if os.environ.get("SKYNET_CHECKPOINT_DIR") and __name__ != "__main__":
+    # WSGI entry points; server_cli attaches its own.
+    attach_checkpoint(model_state, os.environ["SKYNET_CHECKPOINT_DIR"])
+    tenants.restore()
+
+TENANT_PREFIX: str = "/models/<model_id>"
+
+
+def federation_route(rule: str, **options: Any) -> Callable:
+    # Registers the route twice: as is for model_state, and under TENANT_PREFIX for a named model.
+    def decorator(view: Callable) -> Callable:
+        server.add_url_rule(rule, view_func=view, **options)
+        server.add_url_rule(TENANT_PREFIX + rule, endpoint=f"tenant_{view.__name__}", view_func=view, **options)
+        return view
+    return decorator
+
+
+@server.url_value_preprocessor
+def _pull_model_id(endpoint: str | None, values: Dict[str, Any] | None) -> None:
+    g.model_id = values.pop("model_id", None) if values else None
+
+
+@server.before_request
+def _enter_tenant() -> Tuple[Response, int] | None:
+    model_id: str | None = g.get("model_id")
+    if model_id is None or model_id == DEFAULT_MODEL_ID:
+        return None
+    tenant: Tenant | None = tenants.get(model_id)
+    if tenant is None:
+        return jsonify({"OK": False, "error": "unknown_model", "error_message": f"no model {model_id!r}"}), 404
+    if request.endpoint != "delete_model":
+        if not tenant.try_enter():
+            return jsonify({"OK": False, "error": "too_many_requests", "error_message": f"model {model_id!r} is at its request limit"}), 429
+        g.tenant = tenant
+    return None
+
+
+@server.teardown_request
+def _leave_tenant(_: BaseException | None) -> None:
+    tenant: Tenant | None = g.pop("tenant", None)
+    if tenant is not None:
+        tenant.leave()
+
+
+def _state() -> GlobalModelState:
+    tenant: Tenant | None = g.get("tenant")
+    return model_state if tenant is None else tenant.state
 
 
-@server.route("/register", methods=["POST"])
-def register() -> Response:
+def _wants_binary() -> bool:
+    return any(
+        mimetype == WIRE_MIMETYPE for mimetype, _ in request.accept_mimetypes
+    )
+
+
+def _wire_dtype() -> str:
+    dtype: str = request.headers.get(WIRE_DTYPE_HEADER, "float64")
+    if dtype not in WIRE_DTYPE_CODES or dtype in WIRE_RING_DTYPES:
+        dtype = "float64"
+    return dtype
+
+
+def _binary_response(
+    vector: NDArray[numpy.float64],
+    round: int,
+    meta: Dict[str, Any]
+) -> Response:
+    return Response(
+        encode_frame(
+            vector,
+            round=round,
+            dtype=_wire_dtype(),
+            meta=meta
+        ),
+        mimetype=WIRE_MIMETYPE
+    )
+
+
+def _model_version(state: GlobalModelState, round: int) -> str:
+    return f"{state.generation}-{round}"
+
+
+def _representation() -> str:
+    return _wire_dtype() if _wants_binary() else "json"
+
+
+def _not_modified(tag: str) -> Response | None:
+    # Answers a matching If-None-Match before anything is serialized.
+    if request.if_none_match.contains(tag):
+        response: Response = Response(status=304)
+        response.set_etag(tag)
+        return response
+    return None
+
+
+@federation_route("/register", methods=["POST"])
+def register() -> Response | Tuple[Response, int]:
+    state: GlobalModelState = _state()
     data: Dict[str, Any] = request.json
     client_id: str = data["client_id"]
-    model_state.register(client_id=client_id)
+    try:
+        state.register(client_id=client_id, members=data.get("members"))
+    except ValueError as error:
+        return jsonify({"OK": False, "error": "client_limit", "error_message": str(error)}), 409
     return jsonify(
         {
             "OK": True,
-            "clients": model_state.registered
+            "clients": state.registered_clients()
         }
     )
 
 
-@server.route("/roster", methods=["GET"])
+@federation_route("/roster", methods=["GET"])
 def roster() -> Response:
-    return jsonify(
+    state: GlobalModelState = _state()
+    roster_version, clients = state.roster_snapshot()
+    unchanged: Response | None = _not_modified(f"{state.generation}-r{roster_version}")
+    if unchanged is not None:
+        return unchanged
+    response: Response = jsonify(
         {
-            "clients": model_state.registered
+            "clients": clients,
+            "roster_version": roster_version
         }
     )
+    response.set_etag(f"{state.generation}-r{roster_version}")
+    return response
 
 
-@server.route("/model", methods=["GET"])
+@federation_route("/model", methods=["GET"])
 def get_model() -> Response:
+    state: GlobalModelState = _state()
+    unchanged: Response | None = _not_modified(f"{_model_version(state, state.round)}-{_representation()}")
+    if unchanged is not None:
+        return unchanged
+    training_round, weights, compression = state.training_snapshot()
+    meta: Dict[str, Any] = {
+        "feature_weight": state.model._dim - 1,
+        "compression": compression,
+        "scheduling": state.scheduling,
+        "model_version": _model_version(state, training_round)
+    }
+    if _wants_binary():
+        response: Response = _binary_response(weights, round=training_round, meta=meta)
+    else:
+        response = jsonify(
+            {
+                "training_round": training_round,
+                "training_weights": weights.tolist(),
+                **meta
+            }
+        )
+    response.set_etag(f"{meta['model_version']}-{_representation()}")
+    return response
+
+
+@federation_route("/model/delta", methods=["GET"])
+def get_model_delta() -> Response | Tuple[Response, int]:
+    # Change since the `model_version` a client already holds, dense or as a sparse diff.
+    state: GlobalModelState = _state()
+    since: str = request.args.get("since", "")
+    encoding: str = request.args.get("encoding", "auto")
+    if encoding not in DELTA_ENCODINGS:
+        return jsonify({"OK": False, "error": "bad_request", "error_message": f"encoding must be one of {DELTA_ENCODINGS}"}), 400
+    generation, _, base_round = since.rpartition("-")
+    if generation != state.generation or not base_round.isdigit():
+        return jsonify({"OK": False, "error": "version_expired", "error_message": "unknown model version; fetch /model"}), 410
+    if int(base_round) == state.round:
+        return Response(status=304)
+
+    training_round, delta, compression = state.model_delta(int(base_round))
+    if delta is None:
+        return jsonify({"OK": False, "error": "version_expired", "error_message": f"version {since} is no longer kept; fetch /model"}), 410
+    meta: Dict[str, Any] = {
+        "feature_weight": state.model._dim - 1,
+        "compression": compression,
+        "scheduling": state.scheduling,
+        "model_version": _model_version(state, training_round),
+        "base_version": since
+    }
+    indices: NDArray[numpy.intp] = numpy.flatnonzero(delta)
+    if encoding == "sparse" or (encoding == "auto" and 2 * len(indices) < len(delta)):
+        meta["indices"] = indices.tolist()
+        delta = delta[indices]
+    if _wants_binary():
+        return _binary_response(delta, round=training_round, meta=meta)
     return jsonify(
         {
-            "training_round": model_state.round,
-            "training_weights": model_state.model.get_model_weight().tolist(),
-            "feature_weight": model_state.model._dim - 1
+            "training_round": training_round,
+            "delta": delta.tolist(),
+            **meta
         }
     )
 
 
-@server.route("/configure-training-round", methods=["POST"])
-def configure_training_round() -> Response:
+def _selection(data: Dict[str, Any]) -> ClientSelection | None:
+    # {"strategy": "uniform" | "latency", "fraction": ..., "overprovision": ..., ...}
+    return make_selection(**(data.get("selection") or {}))
+
+
+@federation_route("/configure-training-round", methods=["POST"])
+def configure_training_round() -> Response | Tuple[Response, int]:
+    state: GlobalModelState = _state()
     data: Dict[str, Any] = request.json
     participants: Iterable[str] = data.get("participants", [])
-    model_state.configure_training_round(
-        participants=participants
-    )
+    try:
+        chosen: List[str] = state.configure_training_round(
+            participants=participants,
+            quorum=data.get("quorum"),
+            deadline=data.get("deadline"),
+            selection=_selection(data)
+        )
+    except (TypeError, ValueError) as error:
+        return jsonify({"OK": False, "error": "invalid_round", "error_message": str(error)}), 400
     return jsonify(
         {
             "OK": True,
-            "participants": list(participants)
+            "participants": chosen
         }
     )
 
 
-@server.route("/submit-update", methods=["POST"])
-def submit_update() -> Response | Tuple[Response, int]:
+@federation_route("/schedule-rounds", methods=["GET", "POST", "DELETE"])
+def schedule_rounds() -> Response | Tuple[Response, int]:
+    state: GlobalModelState = _state()
+    if request.method == "DELETE":
+        return jsonify({"OK": True, "cancelled": state.cancel_schedule(), "round": state.round})
+    if request.method == "GET":
+        return jsonify({"OK": True, "round": state.round, "schedule": state.schedule_snapshot()})
+
+    data: Dict[str, Any] = request.json or {}
+    try:
+        schedule: RoundSchedule = state.schedule_rounds(
+            rounds=int(data.get("rounds", 1)),
+            participants=data.get("participants"),
+            quorum=data.get("quorum"),
+            deadline=data.get("deadline"),
+            recovery_timeout=float(data.get("recovery_timeout") or RECOVERY_TIMEOUT_SECONDS),
+            selection=_selection(data),
+            max_retries=int(data.get("max_retries", SCHEDULE_MAX_RETRIES))
+        )
+    except (TypeError, ValueError) as error:
+        return jsonify({"OK": False, "error": "invalid_schedule", "error_message": str(error)}), 400
+    return jsonify({"OK": True, "round": state.round, "schedule": schedule.as_dict()})
+
+
+@federation_route("/client-latency", methods=["GET"])
+def client_latency() -> Response:
+    # What the latency-aware selection ranks clients by.
+    return jsonify({"OK": True, "latency": _state().latency_snapshot()})
+
+
+def _read_vector_payload(field: str) -> Tuple[str, int, NDArray[numpy.float64], Dict[str, Any]]:
+    if request.mimetype == WIRE_MIMETYPE:
+        frame = decode_frame(request.get_data(cache=False))
+        return frame.client_id, frame.round, frame.vector, frame.meta
+
     data: Dict[str, Any] = request.json
-    client_id: str = data['client_id']
-    round: int = data['round']
-    vector_array: NDArray[numpy.float64] = numpy.asarray(
-        data['masked_update'],
-        dtype=float
+    return (
+        data['client_id'],
+        data['round'],
+        numpy.asarray(
+            data[field],
+            dtype=float
+        ),
+        data
     )
 
-    if not model_state.expected:
-        return jsonify({"OK": False, "error": "round_not_configured"}), 409
 
-    if client_id not in model_state.expected:
-        return jsonify({"OK": False, "error": "not_expected"}), 409
+@federation_route("/submit-update", methods=["POST"])
+def submit_update() -> Response | Tuple[Response, int]:
+    state: GlobalModelState = _state()
+    try:
+        client_id, round, vector_array, data = _read_vector_payload("masked_update")
+    except ValueError as error:
+        return jsonify({"OK": False, "error": "bad_frame", "error_message": str(error)}), 400
+
+    metrics = data.get("metrics") or {}
+    metric: Dict[str, float] | None = None
+    if "accuracy" in metrics:
+        try:
+            metric = {"accuracy": float(metrics["accuracy"])}
+        except (TypeError, ValueError):
+            pass
+
+    try:
+        outcome: str = state.submit_update(
+            client_id=client_id,
+            round=round,
+            delta=vector_array,
+            members=data.get("members"),
+            metric=metric
+        )
+    except ValueError as error:
+        return jsonify({"OK": False, "error": "bad_shape", "error_message": str(error)}), 400
 
-    if round != model_state.round:
-        print(f"[server] reject {client_id}: wrong_round client={round} server={model_state.round}")
+    if outcome == "wrong_round":
+        print(f"[server] reject {client_id}: wrong_round client={round} server={state.round}")
         return jsonify(
             {
                 "OK": False,
+                "error": outcome,
                 "error_message": "wrong round"
             }
         ), 400
 
-    metrics = data.get("metrics") or {}
-    if "accuracy" in metrics:
-        try:
-            accuracy_value = float(metrics["accuracy"])
-            model_state.add_client_metrics(
-                client_id,
-                metric={
-                    "accuracy": accuracy_value
-                }
-            )
-        except Exception:
-            pass
+    if outcome != SUBMIT_ACCEPTED:
+        print(f"[server] reject {client_id}: {outcome} for round {round}")
+        return jsonify({"OK": False, "error": outcome}), 409
 
-    model_state.add_client_data_to_current_model(
-        client_id=client_id,
-        delta=vector_array
-    )
-    print(f"[server] accepted {client_id}: received={len(model_state.updates)}/{len(model_state.expected)}")
-    completed: bool = model_state.check_all_data_received()
+    for phase, seconds in (metrics.get("timings") or {}).items():
+        if phase in CLIENT_PHASES:
+            CLIENT_PHASE_SECONDS.observe(float(seconds), phase)
+
+    received, expected, completed = state.progress()
+    if LOG_SUBMISSIONS:
+        print(f"[server] accepted {client_id}: received={received}/{expected}")
     return jsonify(
         {
             "OK": True,
-            "received": len(model_state.updates),
+            "received": received,
             "all_received": completed
         }
     )
 
 
-@server.route("/finish-round", methods=["POST"])
+@federation_route("/submit-recovery", methods=["POST"])
+def submit_recovery() -> Response | Tuple[Response, int]:
+    state: GlobalModelState = _state()
+    try:
+        client_id, round, correction, _ = _read_vector_payload("correction")
+        outcome: str = state.submit_recovery(
+            client_id=client_id,
+            round=round,
+            correction=correction
+        )
+    except ValueError as error:
+        return jsonify({"OK": False, "error": "bad_correction", "error_message": str(error)}), 400
+
+    if outcome != SUBMIT_ACCEPTED:
+        print(f"[server] reject recovery from {client_id}: {outcome} for round {round}")
+        return jsonify({"OK": False, "error": outcome}), 409
+    return jsonify({"OK": True})
+
+
+@federation_route("/abort-round", methods=["POST"])
+def abort_round() -> Response:
+    state: GlobalModelState = _state()
+    state.abort_round()
+    return jsonify({"OK": True, "round": state.round})
+
+
+@federation_route("/drop-participants", methods=["POST"])
+def drop_participants() -> Response | Tuple[Response, int]:
+    state: GlobalModelState = _state()
+    data: Dict[str, Any] = request.json
+    dropped: List[str] = []
+    for client_id in data.get("participants", []):
+        try:
+            if state.drop_participant(client_id):
+                dropped.append(client_id)
+        except ValueError as error:
+            return jsonify({"OK": False, "error": "cannot_drop", "error_message": str(error)}), 409
+    return jsonify(
+        {
+            "OK": True,
+            "dropped": dropped,
+            "expected": state.expected_clients()
+        }
+    )
+
+
+@federation_route("/finish-round", methods=["POST"])
 def finish_round() -> Response | Tuple[Response, int]:
-    if not model_state.check_all_data_received():
+    state: GlobalModelState = _state()
+    round_status: int | None = state.finish_round_if_complete()
+    if round_status is None:
         return jsonify(
             {
                 "OK": False,
                 "error_message": "incomplete"
             }
         ), 400
-    round_status: int = model_state.process_and_update_to_global_model()
+    _, weights = state.model_snapshot()
+    if _wants_binary():
+        return _binary_response(
+            weights,
+            round=round_status,
+            meta={
+                "OK": True
+            }
+        )
     return jsonify(
         {
             "OK": True,
             "round": round_status,
-            "weight": model_state.model.get_model_weight().tolist()
+            "weight": weights.tolist()
         }
     )
 
 
-@server.route("/status", methods=["GET"])
+def _model_summary(model_id: str, state: GlobalModelState) -> Dict[str, Any]:
+    return {
+        "model_id": model_id,
+        "round": state.round,
+        "registered": len(state.registered),
+        "feature_weight": state.model._dim - 1,
+        "scheduling": state.scheduling
+    }
+
+
+@server.route("/models", methods=["GET"])
+def list_models() -> Response:
+    models: List[Dict[str, Any]] = [_model_summary(DEFAULT_MODEL_ID, model_state)]
+    for model_id in tenants.model_ids():
+        tenant: Tenant | None = tenants.get(model_id)
+        if tenant is not None:
+            models.append(_model_summary(model_id, tenant.state))
+    return jsonify({"models": models, "limits": tenants.limits._asdict()})
+
+
+@server.route("/models", methods=["POST"])
+def create_model() -> Tuple[Response, int]:
+    options: Dict[str, Any] = dict(request.json or {})
+    model_id: Any = options.pop("model_id", None)
+    try:
+        tenant: Tenant = tenants.create(model_id, **options)
+    except KeyError:
+        return jsonify({"OK": False, "error": "model_exists", "error_message": f"model {model_id!r} already exists"}), 409
+    except TenantLimitError as error:
+        return jsonify({"OK": False, "error": "model_limit", "error_message": str(error)}), 409
+    except (TypeError, ValueError) as error:
+        return jsonify({"OK": False, "error": "invalid_model", "error_message": str(error)}), 400
+    return jsonify({"OK": True, "model_id": model_id, "options": tenant.options}), 201
+
+
+@server.route(TENANT_PREFIX, methods=["DELETE"])
+def delete_model() -> Response | Tuple[Response, int]:
+    if g.model_id == DEFAULT_MODEL_ID:
+        return jsonify({"OK": False, "error": "invalid_model", "error_message": "the default model cannot be deleted"}), 400
+    tenants.remove(g.model_id)
+    return jsonify({"OK": True, "model_id": g.model_id})
+
+
+@server.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    return Response(REGISTRY.render(), content_type=PROMETHEUS_MIMETYPE)
+
+
+@federation_route("/status", methods=["GET"])
 def model_status() -> Response:
-    return jsonify(
-        {
-            "round": model_state.round,
-            "registered": model_state.registered,
-            "expected": list(model_state.expected),
-            "received": list(model_state.updates.keys())
-        }
+    state: GlobalModelState = _state()
+    since: int | None = request.args.get("since", type=int)
+    watch: str = request.args.get("watch", default="epoch")
+    if watch not in WATCH_COUNTERS:
+        watch = "epoch"
+    if since is not None:
+        timeout: float = min(
+            request.args.get("timeout", default=LONG_POLL_MAX_SECONDS, type=float),
+            LONG_POLL_MAX_SECONDS
+        )
+        state.wait_for_change(since=since, timeout=max(timeout, 0.0), watch=watch)
+
+    return jsonify(state.status_snapshot())
+
+
+EXPORT_FORMATS = ("json", "ndjson")
+NDJSON_MIMETYPE: str = "application/x-ndjson"
+
+
+def _gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed: bytes = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _stream_response(chunks: Iterator[bytes], mimetype: str, download_name: str | None = None) -> Response:
+    headers: Dict[str, str] = {}
+    if request.args.get("compress") == "gzip":
+        chunks = _gzip_stream(chunks)
+        mimetype = "application/gzip"
+        download_name = f"{download_name}.gz" if download_name else None
+    if download_name:
+        headers["Content-Disposition"] = f"attachment; filename={download_name}"
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+@federation_route("/history", methods=["GET"])
+def history() -> Response:
+    state: GlobalModelState = _state()
+    # Rounds start <= round < stop as NDJSON, inflating only the chunks in range.
+    return _stream_response(
+        state.history.ndjson(
+            start=request.args.get("start", type=int),
+            stop=request.args.get("stop", type=int)
+        ),
+        NDJSON_MIMETYPE
     )
 
 
-@server.route("/export", methods=["GET"])
-def export_model_data():
+@federation_route("/export", methods=["GET"])
+def export_model_data() -> Response | Tuple[Response, int]:
+    state: GlobalModelState = _state()
+    training_round, weights = state.model_snapshot()
+    export_format: str = request.args.get("format", default="json")
+    start: int | None = request.args.get("start", type=int)
+    stop: int | None = request.args.get("stop", type=int)
+    header: Dict[str, Any] = {
+        "round": training_round,
+        "feature_weight": state.model._dim - 1,
+        "training_weights": weights.tolist()
+    }
+
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"OK": False, "error": "bad_format", "error_message": f"expected one of {EXPORT_FORMATS}"}), 400
+
+    if export_format == "ndjson":
+        # The model on the first line, then one history entry per line.
+        def ndjson_chunks() -> Iterator[bytes]:
+            yield json.dumps({**header, "export_time": time.time()}).encode("utf-8") + b"\n"
+            yield from state.history.ndjson(start, stop)
+
+        return _stream_response(ndjson_chunks(), NDJSON_MIMETYPE, f"model_round_{training_round}.ndjson")
+
+    if request.args.get("pretty", default="1") == "0":
+        # Same document as below, streamed without building it in memory.
+        def json_chunks() -> Iterator[bytes]:
+            yield json.dumps(header)[:-1].encode("utf-8") + b', "history": ['
+            separator: bytes = b""
+            for block in state.history.ndjson(start, stop):
+                yield separator + block.rstrip(b"\n").replace(b"\n", b",")
+                separator = b","
+            yield b'], "export_time": ' + json.dumps(time.time()).encode("utf-8") + b"}"
+
+        return _stream_response(json_chunks(), "application/json", f"model_round_{training_round}.json")
+
     payload = {
-        "round": model_state.round,
-        "feature_weight": model_state.model._dim - 1,
-        "training_weights": model_state.model.get_model_weight().tolist(),
-        "history": getattr(model_state, "history", []),
+        **header,
+        "history": list(state.history.entries(start, stop)),
         "export_time": time.time()
     }
 
@@ -171,9 +699,101 @@ def export_model_data():
         buffer,
         mimetype="application/json",
         as_attachment=True,
-        download_name=f"model_round_{model_state.round}.json"
+        download_name=f"model_round_{training_round}.json"
+    )
+
+
+SERVING_BACKENDS = ("dev", "waitress")
+
+
+def serve(
+    host: str,
+    port: int,
+    backend: str = "dev",
+    threads: int = 128
+) -> None:
+    if backend == "waitress":
+        try:
+            import waitress
+        except ImportError:
+            raise click.ClickException("waitress is not installed (pip install waitress) - use --backend dev")
+        # Long-polling /status holds a worker thread, so size the pool above the number of waiting clients.
+        waitress.serve(server, host=host, port=port, threads=threads, connection_limit=max(threads * 4, 1000))
+        return
+
+    server.run(host=host, port=port, debug=False, threaded=True)
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("--host", default="0.0.0.0", show_default=True, envvar="SERVER_HOST", help="Bind address.")
+@click.option("--port", type=int, default=8000, show_default=True, envvar="SERVER_PORT", help="Bind port.")
+@click.option("--feature-weight", "feature_weight", type=int, default=12, show_default=True, envvar="SKYNET_FEATURE_WEIGHT", help="Number of model features (excluding bias).")
+@click.option("--aggregation", type=click.Choice(AGGREGATION_MODES), default="buffered", show_default=True, envvar="SKYNET_AGGREGATION", help="buffered keeps every delta until finish-round; streaming folds each update into a running sum.")
+@click.option("--backend", type=click.Choice(SERVING_BACKENDS), default="dev", show_default=True, envvar="SERVER_BACKEND", help="HTTP server: Flask dev server or the multi-threaded waitress WSGI server.")
+@click.option("--threads", type=int, default=128, show_default=True, envvar="SERVER_THREADS", help="Worker threads for the waitress backend.")
+@click.option("--compression", type=click.Choice(COMPRESSION_SCHEMES), default="none", show_default=True, envvar="SKYNET_COMPRESSION", help="Update compression announced to clients with the model.")
+@click.option("--compression-bits", "compression_bits", type=click.Choice(["8", "16", "32"]), default=None, envvar="SKYNET_COMPRESSION_BITS", help="Ring width for compressed updates (default 16, 8 for sign). Bounds the participants per round.")
+@click.option("--compression-scale", "compression_scale", type=float, default=None, envvar="SKYNET_COMPRESSION_SCALE", help="Value of one quantization level (sign: server step size).")
+@click.option("--compression-ratio", "compression_ratio", type=float, default=0.1, show_default=True, envvar="SKYNET_COMPRESSION_RATIO", help="Fraction of coordinates sent per round with topk.")
+@click.option("--scheduling", type=click.Choice(SCHEDULING_MODES), default="sync", show_default=True, envvar="SKYNET_SCHEDULING", help="sync rounds, or async buffered updates (FedBuff) without rounds or masking.")
+@click.option("--buffer-size", "buffer_size", type=int, default=10, show_default=True, envvar="SKYNET_BUFFER_SIZE", help="async: updates folded into the model per version.")
+@click.option("--staleness-exponent", "staleness_exponent", type=float, default=0.5, show_default=True, help="async: updates are weighted by 1 / (1 + staleness) ** exponent.")
+@click.option("--max-staleness", "max_staleness", type=int, default=None, help="async: reject updates based on a model this many versions old.")
+@click.option("--server-optimizer", "optimizer", type=click.Choice(SERVER_OPTIMIZERS), default="fedavg", show_default=True, envvar="SKYNET_SERVER_OPTIMIZER", help="How the mean client delta is applied: plain (fedavg), with momentum, or Adam/Yogi-scaled.")
+@click.option("--server-lr", "server_lr", type=float, default=None, envvar="SKYNET_SERVER_LR", help="Server learning rate (default 1.0 for fedavg/fedavgm, 0.1 for fedadam/fedyogi).")
+@click.option("--server-momentum", "server_momentum", type=float, default=0.9, show_default=True, envvar="SKYNET_SERVER_MOMENTUM", help="fedavgm momentum; beta1 for fedadam/fedyogi.")
+@click.option("--server-beta2", "server_beta2", type=float, default=0.99, show_default=True, envvar="SKYNET_SERVER_BETA2", help="fedadam/fedyogi second-moment decay.")
+@click.option("--server-tau", "server_tau", type=float, default=1e-3, show_default=True, envvar="SKYNET_SERVER_TAU", help="fedadam/fedyogi adaptivity; larger is closer to plain momentum.")
+@click.option("--checkpoint-dir", "checkpoint_dir", type=click.Path(file_okay=False), default=None, envvar="SKYNET_CHECKPOINT_DIR", help="Save a snapshot and history log after every round here, and resume from it at startup.")
+@click.option("--max-models", "max_models", type=int, default=None, envvar="SKYNET_MAX_MODELS", help="Named models (POST /models) this server will host.")
+@click.option("--max-feature-weight", "max_feature_weight", type=int, default=None, envvar="SKYNET_MAX_FEATURE_WEIGHT", help="Largest feature_weight a named model may ask for.")
+@click.option("--max-clients", "max_clients", type=int, default=None, envvar="SKYNET_MAX_CLIENTS", help="Registered clients per model.")
+@click.option("--max-inflight", "max_inflight", type=int, default=None, envvar="SKYNET_MAX_INFLIGHT", help="Concurrent requests per named model, long polls included; more get 429.")
+def server_cli(host: str, port: int, feature_weight: int, aggregation: str, backend: str, threads: int, compression: str, compression_bits: str | None, compression_scale: float | None, compression_ratio: float, scheduling: str, buffer_size: int, staleness_exponent: float, max_staleness: int | None, checkpoint_dir: str | None, max_models: int | None, max_feature_weight: int | None, max_clients: int | None, max_inflight: int | None, optimizer: str, server_lr: float | None, server_momentum: float, server_beta2: float, server_tau: float) -> None:
+    global model_state, tenants
+    model_state = GlobalModelState(
+        feature_weight=feature_weight,
+        aggregation=aggregation,
+        compression=compression,
+        compression_bits=int(compression_bits) if compression_bits else None,
+        compression_scale=compression_scale,
+        compression_ratio=compression_ratio,
+        scheduling=scheduling,
+        buffer_size=buffer_size,
+        staleness_exponent=staleness_exponent,
+        max_staleness=max_staleness,
+        max_clients=max_clients,
+        optimizer=optimizer,
+        server_lr=server_lr,
+        server_momentum=server_momentum,
+        server_beta2=server_beta2,
+        server_tau=server_tau
+    )
+    tenants = TenantRegistry(
+        TenantLimits(
+            max_models=max_models,
+            max_feature_weight=max_feature_weight,
+            max_clients=max_clients,
+            max_inflight=max_inflight
+        ),
+        checkpoint_dir=checkpoint_dir,
+        attach=attach_checkpoint
+    )
+    if checkpoint_dir:
+        try:
+            attach_checkpoint(model_state, checkpoint_dir)
+            restored: List[str] = tenants.restore()
+        except ValueError as error:
+            raise click.ClickException(f"cannot resume from {checkpoint_dir}: {error}")
+        if restored:
+            print(f"[server] restored models: {', '.join(restored)}", flush=True)
+    serve(
+        host=host,
+        port=port,
+        backend=backend,
+        threads=threads
     )
 
 
 if __name__ == "__main__":
-    server.run(host="0.0.0.0", port=8000, debug=False)
+    server_cli()
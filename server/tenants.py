@@ -0,0 +1,157 @@
+import os
+import re
+import json
+import shutil
+import threading
+from server.model_state import GlobalModelState
+from typing import Any, Callable, Dict, List, NamedTuple
+
+DEFAULT_MODEL_ID: str = "default"
+MODEL_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+TENANT_FILE: str = "tenant.json"
+# GlobalModelState arguments a tenant may choose when it is created.
+TENANT_OPTIONS = (
+    "feature_weight",
+    "aggregation",
+    "compression",
+    "compression_bits",
+    "compression_scale",
+    "compression_ratio",
+    "scheduling",
+    "buffer_size",
+    "staleness_exponent",
+    "max_staleness",
+    "max_clients",
+    "optimizer",
+    "server_lr",
+    "server_momentum",
+    "server_beta2",
+    "server_tau"
+)
+
+
+class TenantLimitError(ValueError):
+    pass
+
+
+class TenantLimits(NamedTuple):
+    # None means unlimited.
+    max_models: int | None = None
+    max_feature_weight: int | None = None
+    max_clients: int | None = None
+    max_inflight: int | None = None
+
+
+class Tenant:
+    # One named federation: its own GlobalModelState (and so its own lock) plus a
+    # cap on concurrent requests, so one busy model cannot hold every worker thread.
+    def __init__(
+        self,
+        model_id: str,
+        state: GlobalModelState,
+        options: Dict[str, Any],
+        max_inflight: int | None = None
+    ) -> None:
+        self.model_id: str = model_id
+        self.state: GlobalModelState = state
+        self.options: Dict[str, Any] = options
+        self._slots: threading.BoundedSemaphore | None = (
+            threading.BoundedSemaphore(max_inflight) if max_inflight else None
+        )
+
+    def try_enter(self) -> bool:
+        return self._slots is None or self._slots.acquire(blocking=False)
+
+    def leave(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+
+class TenantRegistry:
+    def __init__(
+        self,
+        limits: TenantLimits = TenantLimits(),
+        checkpoint_dir: str | None = None,
+        attach: Callable[[GlobalModelState, str], GlobalModelState] | None = None
+    ) -> None:
+        self.limits: TenantLimits = limits
+        # Each tenant checkpoints to <checkpoint_dir>/models/<model_id>.
+        self.checkpoint_dir: str | None = checkpoint_dir
+        self._attach: Callable[[GlobalModelState, str], GlobalModelState] | None = attach
+        self._tenants: Dict[str, Tenant] = {}
+        # Only guards the table; requests for different tenants never share a lock.
+        self._lock: threading.Lock = threading.Lock()
+
+    def _directory(self, model_id: str) -> str | None:
+        if self.checkpoint_dir is None:
+            return None
+        return os.path.join(self.checkpoint_dir, "models", model_id)
+
+    def create(self, model_id: str, **options: Any) -> Tenant:
+        if not isinstance(model_id, str) or not MODEL_ID_PATTERN.match(model_id) or model_id == DEFAULT_MODEL_ID:
+            raise ValueError(f"invalid model id {model_id!r}")
+        unknown: List[str] = sorted(set(options) - set(TENANT_OPTIONS))
+        if unknown:
+            raise ValueError(f"unknown options {unknown}. Expected some of {TENANT_OPTIONS}")
+        if model_id in self._tenants:
+            raise KeyError(model_id)
+        limits: TenantLimits = self.limits
+        feature_weight: int = int(options.get("feature_weight", 12))
+        if limits.max_feature_weight is not None and feature_weight > limits.max_feature_weight:
+            raise TenantLimitError(f"feature_weight {feature_weight} exceeds the limit of {limits.max_feature_weight}")
+        if limits.max_clients is not None:
+            options["max_clients"] = min(int(options.get("max_clients") or limits.max_clients), limits.max_clients)
+
+        with self._lock:
+            if model_id in self._tenants:
+                raise KeyError(model_id)
+            if limits.max_models is not None and len(self._tenants) >= limits.max_models:
+                raise TenantLimitError(f"server already hosts {limits.max_models} models")
+            state: GlobalModelState = GlobalModelState(**options)
+            directory: str | None = self._directory(model_id)
+            if directory is not None:
+                os.makedirs(directory, exist_ok=True)
+                if self._attach is not None:
+                    self._attach(state, directory)
+                with open(os.path.join(directory, TENANT_FILE), "w", encoding="utf-8") as handle:
+                    json.dump(options, handle)
+            tenant: Tenant = Tenant(model_id, state, options, limits.max_inflight)
+            self._tenants[model_id] = tenant
+            return tenant
+
+    def get(self, model_id: str) -> Tenant | None:
+        return self._tenants.get(model_id)
+
+    def remove(self, model_id: str) -> bool:
+        with self._lock:
+            tenant: Tenant | None = self._tenants.pop(model_id, None)
+        if tenant is None:
+            return False
+        # Ends the tenant's writer thread and timers before its directory goes away.
+        tenant.state.close()
+        directory: str | None = self._directory(model_id)
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+        return True
+
+    def model_ids(self) -> List[str]:
+        with self._lock:
+            return sorted(self._tenants)
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def restore(self) -> List[str]:
+        # Recreates the tenants found under the checkpoint directory, each resuming its rounds.
+        root: str | None = os.path.join(self.checkpoint_dir, "models") if self.checkpoint_dir else None
+        if root is None or not os.path.isdir(root):
+            return []
+        restored: List[str] = []
+        for model_id in sorted(os.listdir(root)):
+            path: str = os.path.join(root, model_id, TENANT_FILE)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as handle:
+                self.create(model_id, **json.load(handle))
+            restored.append(model_id)
+        return restored
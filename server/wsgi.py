@@ -0,0 +1,12 @@
+from server.server import server
+
+# Entry point for external WSGI servers. All federation state lives in this
+# process, so run a single worker with many threads, e.g.
+#   gunicorn -w 1 -k gthread --threads 128 server.wsgi:application
+#   waitress-serve --threads=128 server.wsgi:application
+# Configure the model with SKYNET_FEATURE_WEIGHT / SKYNET_AGGREGATION and the
+# server optimizer with SKYNET_SERVER_OPTIMIZER / SKYNET_SERVER_LR, and
+# set SKYNET_CHECKPOINT_DIR to persist rounds and resume after a restart.
+# Named models (POST /models) are bounded by SKYNET_MAX_MODELS,
+# SKYNET_MAX_FEATURE_WEIGHT, SKYNET_MAX_CLIENTS and SKYNET_MAX_INFLIGHT.
+application = server
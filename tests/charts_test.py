@@ -1,5 +1,11 @@
+import numpy
 from pathlib import Path
 from analytics.charts import (
+    BAND_THRESHOLD,
+    PIXEL_BUDGET,
+    downsample,
+    load_columns,
+    render_charts,
     plot_accuracy,
     plot_weight_normalization,
     plot_final_weight
@@ -28,3 +34,35 @@ def test_plot_functions_write_pngs(tmp_path: Path):
 
     for p in (a, b, c):
         assert p.exists() and p.stat().st_size > 0
+
+
+def test_columns_fill_missing_clients_and_large_rosters_use_bands(tmp_path: Path):
+    history = [
+        {"round": 1, "weight_norm": 0.1, "accuracy": {"B": {"accuracy": 0.5}}},
+        {"round": 2, "weight_norm": 0.2, "accuracy": {"A": {"accuracy": 0.6}, "B": {"accuracy": 0.7}}},
+        {"round": 3, "weight_norm": 0.3},
+    ]
+    columns = load_columns({"history": history})
+    assert columns.clients == ("A", "B")
+    assert columns.rounds.tolist() == [1, 2, 3]
+    assert numpy.isnan(columns.accuracy[0, 0]) and columns.accuracy[0, 1] == 0.5
+    assert numpy.isnan(columns.accuracy[2]).all()
+
+    x, y = downsample(numpy.arange(10), numpy.arange(10, dtype=float), budget=5)
+    assert x.tolist() == [0.5, 2.5, 4.5, 6.5, 8.5] and y.tolist() == x.tolist()
+
+    rounds = 3 * PIXEL_BUDGET
+    wide = {
+        "training_weights": list(numpy.linspace(-1, 1, 5_000)),
+        "history": [
+            {
+                "round": round,
+                "weight_norm": 1.0 / round,
+                "accuracy": {f"c{client:02d}": {"accuracy": 0.5 + client / 100} for client in range(BAND_THRESHOLD + 5) if (round + client) % 3}
+            }
+            for round in range(1, rounds + 1)
+        ],
+    }
+    outputs = render_charts(wide, tmp_path, "wide_", workers=1)
+    assert [p.name for p in outputs] == ["wide_accuracy_per_client.png", "wide_weight_normalization.png", "wide_final_weights.png"]
+    assert all(p.stat().st_size > 0 for p in outputs)
@@ -0,0 +1,126 @@
+import time
+import numpy as np
+import pytest
+from server.checkpoint import Checkpointer
+from server.model_state import GlobalModelState
+
+
+def _run_rounds(state, rounds, rng):
+    for _ in range(rounds):
+        state.configure_training_round(["A", "B"])
+        for client_id in "AB":
+            state.add_client_data_to_current_model(client_id, rng.normal(size=4))
+        state.process_and_update_to_global_model()
+
+
+def test_restart_resumes_weights_roster_and_history(tmp_path):
+    state = GlobalModelState(feature_weight=3, checkpointer=Checkpointer(str(tmp_path)))
+    for client_id in "AB":
+        state.register(client_id)
+    _run_rounds(state, 5, np.random.default_rng(0))
+    state.checkpointer.flush()
+
+    resumed = GlobalModelState(feature_weight=3)
+    resumed.restore(Checkpointer(str(tmp_path)).load())
+    assert resumed.round == 5
+    assert np.array_equal(resumed.model.get_model_weight(), state.model.get_model_weight())
+    assert resumed.registered == ["A", "B"] and resumed.roster_version == state.roster_version
+    assert list(resumed.history) == list(state.history)
+
+
+def test_history_written_after_last_snapshot_is_discarded(tmp_path):
+    checkpointer = Checkpointer(str(tmp_path))
+    state = GlobalModelState(feature_weight=3, checkpointer=checkpointer)
+    _run_rounds(state, 2, np.random.default_rng(1))
+    checkpointer.flush()
+    with open(checkpointer.history_path, "a") as log:
+        log.write('{"round": 3, "weight_no')
+
+    checkpoint = Checkpointer(str(tmp_path)).load()
+    assert [entry["round"] for entry in checkpoint.history] == [1, 2]
+
+
+def test_compression_spec_survives_restart(tmp_path):
+    state = GlobalModelState(feature_weight=20, compression="topk", checkpointer=Checkpointer(str(tmp_path)))
+    state.configure_training_round(["A"])
+    state.add_client_data_to_current_model("A", np.zeros(3, dtype=np.uint64))
+    state.process_and_update_to_global_model()
+    state.checkpointer.flush()
+
+    resumed = GlobalModelState(feature_weight=20, compression="topk")
+    resumed.restore(Checkpointer(str(tmp_path)).load())
+    assert resumed.compression_spec == state.compression_spec
+    with pytest.raises(ValueError):
+        GlobalModelState(feature_weight=3).restore(Checkpointer(str(tmp_path)).load())
+
+
+def test_long_history_loads_quickly(tmp_path):
+    checkpointer = Checkpointer(str(tmp_path))
+    entry = {"round": 0, "participants": ["A", "B"], "received": 2, "dropped": [], "weight_norm": 1.0,
+             "accuracy": {"A": {"accuracy": 0.9}, "B": {"accuracy": 0.8}}}
+    with open(checkpointer.history_path, "w") as log:
+        log.writelines('{"round": %d, "participants": ["A", "B"], "weight_norm": 1.0}\n' % index for index in range(50_000))
+    checkpointer.save(50_000, np.zeros(4), meta={}, entry=entry)
+    checkpointer.flush()
+
+    time_0 = time.perf_counter()
+    checkpoint = Checkpointer(str(tmp_path)).load()
+    assert time.perf_counter() - time_0 < 1.0
+    assert len(checkpoint.history) == 50_001 and checkpoint.round == 50_000
+
+
+def test_named_models_resume_from_their_own_directories(tmp_path):
+    from server.server import attach_checkpoint
+    from server.tenants import TenantRegistry
+
+    registry = TenantRegistry(checkpoint_dir=str(tmp_path), attach=attach_checkpoint)
+    state = registry.create("exp1", feature_weight=3, aggregation="streaming").state
+    for client_id in "AB":
+        state.register(client_id)
+    _run_rounds(state, 3, np.random.default_rng(2))
+    state.checkpointer.flush()
+
+    resumed = TenantRegistry(checkpoint_dir=str(tmp_path), attach=attach_checkpoint)
+    assert resumed.restore() == ["exp1"]
+    tenant = resumed.get("exp1")
+    assert tenant.state.round == 3 and tenant.state.aggregation == "streaming"
+    assert np.array_equal(tenant.state.model.get_model_weight(), state.model.get_model_weight())
+
+
+def test_removing_a_named_model_stops_its_writer_and_timers(tmp_path):
+    from server.server import attach_checkpoint
+    from server.tenants import TenantRegistry
+
+    registry = TenantRegistry(checkpoint_dir=str(tmp_path), attach=attach_checkpoint)
+    state = registry.create("exp1", feature_weight=3).state
+    for client_id in "AB":
+        state.register(client_id)
+    _run_rounds(state, 1, np.random.default_rng(3))
+    writer = state.checkpointer._writer
+    state.schedule_rounds(1, deadline=60.0)
+    assert registry.remove("exp1")
+    assert not writer.is_alive() and state.checkpointer is None
+    assert state.schedule is None and state._deadline_timer is None
+    assert not (tmp_path / "models" / "exp1").exists()
+    # A round finalized by a request already in flight no longer touches the removed directory.
+    for client_id in "AB":
+        state.add_client_data_to_current_model(client_id, np.ones(4))
+    assert state.process_and_update_to_global_model() == 2
+
+
+def test_server_optimizer_state_survives_restart(tmp_path):
+    state = GlobalModelState(feature_weight=3, optimizer="fedadam", checkpointer=Checkpointer(str(tmp_path)))
+    _run_rounds(state, 3, np.random.default_rng(5))
+    state.checkpointer.flush()
+
+    resumed = GlobalModelState(feature_weight=3, optimizer="fedadam")
+    resumed.restore(Checkpointer(str(tmp_path)).load())
+    assert np.array_equal(resumed.model.get_model_weight(), state.model.get_model_weight())
+    assert np.array_equal(resumed.optimizer.slots, state.optimizer.slots) and resumed.optimizer.steps == 3
+    _run_rounds(state, 1, np.random.default_rng(6))
+    _run_rounds(resumed, 1, np.random.default_rng(6))
+    assert np.allclose(resumed.model.get_model_weight(), state.model.get_model_weight())
+
+    plain = GlobalModelState(feature_weight=3)
+    plain.restore(Checkpointer(str(tmp_path)).load())
+    assert plain.optimizer.steps == 0
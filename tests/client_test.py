@@ -0,0 +1,32 @@
+import numpy as np
+from client.masking import MaskEngine, build_mask, build_masks
+
+
+def test_pairwise_masks_cancel_across_roster():
+    roster = ["A", "B", "C", "D"]
+    masks = [build_mask(client_id, roster, dimensions=9, nonce="r0") for client_id in roster]
+    assert np.allclose(np.sum(masks, axis=0), 0.0)
+    assert not np.allclose(masks[0], 0.0)
+    assert not np.allclose(masks[0], build_mask("A", roster, dimensions=9, nonce="r1"))
+
+
+def test_mask_engine_updates_incrementally_when_peers_change():
+    engine = MaskEngine("B", dimensions=9)
+    engine.update_roster(["A", "B", "C"], "r0", version=1)
+    assert np.allclose(engine.mask(), build_mask("B", ["A", "B", "C"], dimensions=9, nonce="r0"))
+
+    engine.prepare(["B", "C", "D"], "r0", version=2)
+    assert np.allclose(engine.mask(), build_mask("B", ["B", "C", "D"], dimensions=9, nonce="r0"))
+    assert engine.roster_version == 2
+    # Same roster in the next round: every pair term is regenerated.
+    engine.prepare(["B", "C", "D"], "r1", version=2)
+    assert np.allclose(engine.mask(), build_mask("B", ["B", "C", "D"], dimensions=9, nonce="r1"))
+    engine.close()
+
+
+def test_build_masks_matches_per_client_masks():
+    roster = ["c3", "c1", "c10", "c2", "c7"]
+    masks = build_masks(roster, 9, "r0")
+    for index, client_id in enumerate(roster):
+        assert np.allclose(masks[index], build_mask(client_id, roster, 9, "r0"))
+    assert np.allclose(masks.sum(axis=0), 0.0)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from client.masking import MaskEngine
+from client.client import prepare_update
+from server.model_state import GlobalModelState
+from models.compression import CompressionSpec, ErrorFeedbackCompressor, decompress, make_spec
+
+
+@pytest.mark.parametrize("scheme", ["q8", "topk", "sign"])
+@pytest.mark.parametrize("aggregation", ["buffered", "streaming"])
+def test_masked_ring_updates_aggregate_to_dequantized_mean(scheme, aggregation):
+    roster = ["A", "B", "C"]
+    state = GlobalModelState(feature_weight=19, aggregation=aggregation, compression=scheme, compression_ratio=0.25)
+    for client_id in roster:
+        state.register(client_id)
+    _, _, compression = state.training_snapshot()
+    spec = CompressionSpec.from_dict(compression)
+    state.configure_training_round(roster)
+
+    rng = np.random.default_rng(0)
+    expected = np.zeros(20)
+    for client_id in roster:
+        engine = MaskEngine(client_id, 20, ring=True)
+        engine.update_roster(roster, state.mask_nonce)
+        compressor = ErrorFeedbackCompressor(20, seed=1)
+        delta = rng.normal(scale=0.2, size=20)
+        masked = prepare_update(delta, engine, compressor, compression)
+        assert masked.dtype == np.dtype(spec.ring_dtype)
+        assert masked.shape == (spec.length(20),)
+        expected += delta - compressor.residual
+        assert state.submit_update(client_id, 0, masked) == "accepted"
+
+    state.process_and_update_to_global_model()
+    assert np.allclose(state.model.get_model_weight(), expected / len(roster))
+
+
+def test_error_feedback_carries_what_was_not_sent():
+    spec = make_spec("topk", 10, ratio=0.2)
+    compressor = ErrorFeedbackCompressor(10, seed=0)
+    deltas = np.random.default_rng(2).normal(size=(5, 10)) * 0.1
+
+    sent = sum(decompress(compressor.compress(delta, spec), spec, 10) for delta in deltas)
+    assert np.allclose(sent + compressor.residual, deltas.sum(axis=0))
+    assert np.count_nonzero(decompress(compressor.compress(deltas[0], spec), spec, 10)) <= 2
+
+
+def test_stochastic_quantization_is_unbiased():
+    spec = make_spec("q8", 4, scale=0.1)
+    value = np.array([0.03, -0.27, 0.55, 0.0])
+    levels = np.mean([ErrorFeedbackCompressor(4, seed=seed).compress(value, spec) for seed in range(2000)], axis=0)
+    assert np.allclose(levels * spec.scale, value, atol=0.01)
+
+
+def test_ring_overflow_is_rejected():
+    state = GlobalModelState(feature_weight=3, compression="sign")
+    with pytest.raises(ValueError):
+        state.configure_training_round([f"c{index}" for index in range(200)])
+
+
+def test_uncompressed_update_rejected_when_compression_enabled():
+    state = GlobalModelState(feature_weight=3, compression="q8")
+    state.configure_training_round(["A"])
+    with pytest.raises(ValueError):
+        state.submit_update("A", 0, np.array([0.5, 0.1, 0.2, 0.3]))
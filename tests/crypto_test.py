@@ -1,5 +1,10 @@
+import pytest
 import numpy as np
-from models.crypto import pseudo_random_generator, derive_pair_seed
+from models.crypto import (
+    derive_pair_seed,
+    pseudo_random_generator,
+    _reference_pseudo_random_generator
+)
 
 
 def test_prg_is_deterministic():
@@ -12,3 +17,24 @@ def test_pairwise_seed_is_symmetric():
     s1 = derive_pair_seed(b"k", "A", "B")
     s2 = derive_pair_seed(b"k", "B", "A")
     assert s1 == s2
+
+
+def test_batched_prg_matches_reference_bit_for_bit():
+    for length in (0, 1, 3, 4, 5, 257):
+        expected = _reference_pseudo_random_generator(b"seed", length)
+        actual = pseudo_random_generator(b"seed", length)
+        assert actual.dtype == np.float64
+        assert np.array_equal(actual.view(np.uint64), expected.view(np.uint64))
+
+
+def test_shake_prg_is_deterministic_and_bounded():
+    a = pseudo_random_generator(b"seed", 1000, mode="shake256")
+    b = pseudo_random_generator(b"seed", 1000, mode="shake256")
+    assert np.array_equal(a, b)
+    assert a.min() >= -0.5 and a.max() < 0.5
+    assert not np.array_equal(a, pseudo_random_generator(b"seed", 1000))
+
+
+def test_prg_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        pseudo_random_generator(b"seed", 4, mode="md5")
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from models.models import Logistic
+from models.trainer import LocalTrainer
+from client.data import generate_dataset_local
+from client.dataset import ChunkedDataset, load_dataset, materialize_dataset
+
+
+@pytest.mark.parametrize("file_format", ["npy", "raw"])
+def test_materialized_dataset_matches_generator(tmp_path, file_format):
+    dataset = materialize_dataset(tmp_path, rows=1_000, n_features=5, seed=7, chunk_rows=128, file_format=file_format)
+    X, y = generate_dataset_local(1_000, 5, seed=7)
+
+    loaded = load_dataset(tmp_path, chunk_rows=300)
+    assert isinstance(loaded.features, np.memmap)
+    assert loaded.chunk_count == 4
+    assert np.array_equal(np.asarray(dataset.features), X)
+    assert np.array_equal(np.concatenate([y_chunk for _, y_chunk in loaded.chunks()]), y.astype(np.float64))
+
+
+def test_chunked_full_batch_matches_in_memory(tmp_path):
+    materialize_dataset(tmp_path, rows=700, n_features=4, seed=1, chunk_rows=256)
+    X, y = generate_dataset_local(700, 4, seed=1)
+
+    in_memory = LocalTrainer(Logistic(4), X, y)
+    chunked = LocalTrainer.from_dataset(Logistic(4), load_dataset(tmp_path, chunk_rows=128))
+
+    assert np.allclose(chunked.update_local(epochs=3, learning_rate=0.5), in_memory.update_local(epochs=3, learning_rate=0.5))
+    assert np.allclose(chunked.predict_probability(), in_memory.predict_probability())
+    assert chunked.accuracy() == in_memory.accuracy()
+
+
+def test_chunked_mini_batch_visits_every_chunk():
+    X, y = generate_dataset_local(512, 3, seed=2)
+    model = Logistic(3)
+    trainer = LocalTrainer.from_dataset(model, ChunkedDataset(X, y, chunk_rows=100), batch_size=32, seed=0)
+
+    delta = trainer.update_local(epochs=1, learning_rate=0.1)
+    assert delta.shape == (4,)
+    assert np.any(delta != 0)
+
+
+def test_chunked_dataset_rejects_mismatched_targets():
+    with pytest.raises(ValueError):
+        ChunkedDataset(np.zeros((10, 3)), np.zeros(9))
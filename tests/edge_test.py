@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from client.masking import MaskEngine
+from client.client import prepare_correction, prepare_update
+from models.compression import ErrorFeedbackCompressor
+from server.edge import EdgeModelState
+from server.model_state import GlobalModelState
+
+
+@pytest.mark.parametrize("compression", ["none", "q8"])
+def test_edge_sums_aggregate_and_recover_like_flat_clients(compression):
+    groups = {"E1": ["A", "B"], "E2": ["C", "D", "Z"]}
+    root = GlobalModelState(feature_weight=5, compression=compression)
+    edges = {edge_id: EdgeModelState(feature_weight=5) for edge_id in groups}
+    for edge_id, members in groups.items():
+        root.register(edge_id, members=members)
+    roster_version, leaves = root.roster_snapshot()
+    assert leaves == ["A", "B", "C", "D", "Z"]
+
+    training_round, weights, spec = root.training_snapshot()
+    root.configure_training_round(groups)
+    rng = np.random.default_rng(7)
+    engines, sent = {}, []
+    for edge_id, edge in edges.items():
+        edge.set_root_roster(roster_version, leaves)
+        edge.mirror(training_round, weights, spec)
+        edge.set_root_round(None, root.status_snapshot()["mask_nonce"])
+        # Z registered behind E2 but never reports; E2 forwards what it has.
+        reporting = [leaf for leaf in groups[edge_id] if leaf != "Z"]
+        edge.configure_training_round(reporting)
+        for leaf in reporting:
+            engines[leaf] = MaskEngine(leaf, 6, ring=spec is not None)
+            engines[leaf].update_roster(edge.roster_snapshot()[1], edge.status_snapshot()["mask_nonce"])
+            compressor = ErrorFeedbackCompressor(6, seed=0)
+            delta = rng.normal(scale=0.1, size=6)
+            assert edge.submit_update(leaf, 0, prepare_update(delta, engines[leaf], compressor, spec)) == "accepted"
+            sent.append(delta - compressor.residual)
+        assert edge.status_snapshot()["phase"] == "ready"
+        members, total, _ = edge.collect()
+        assert root.submit_update(edge_id, 0, total, members=members) == "accepted"
+
+    status = root.status_snapshot()
+    assert status["phase"] == "recovery"
+    assert status["reported"] == ["A", "B", "C", "D"]
+    for edge_id, edge in edges.items():
+        edge.begin_recovery(status["reported"])
+        local = edge.status_snapshot()
+        for leaf in edge.received_clients():
+            dropped = engines[leaf].peers - set(local["received"])
+            assert edge.submit_recovery(leaf, 0, prepare_correction(engines[leaf], dropped, spec)) == "accepted"
+        assert root.submit_recovery(edge_id, 0, edge.recovery_total()) == "accepted"
+
+    assert root.finish_round_if_complete() == 1
+    assert np.allclose(root.model.get_model_weight(), np.mean(sent, axis=0))
+
+
+def test_root_rejects_members_outside_the_edge():
+    root = GlobalModelState(feature_weight=3)
+    root.register("E1", members=["A", "B"])
+    root.configure_training_round(["E1"])
+    assert root.submit_update("E1", 0, np.ones(4), members=["A", "X"]) == "not_expected"
+    assert root.submit_update("E1", 0, np.ones(4), members=["A", "B"]) == "accepted"
@@ -0,0 +1,39 @@
+import numpy
+from pathlib import Path
+from analytics.live import BinnedSeries, LiveDashboard, write_gif
+
+
+def test_binned_series_folds_and_keeps_a_bounded_number_of_points():
+    series = BinnedSeries(width=1, bins=4)
+    for round in range(1, 11):
+        series.append(round, numpy.array([float(round)]))
+
+    x, means = series.series()
+    # 10 rounds in 4 bins of 4: [1-4], [5-8], [9-10].
+    assert series.per_bin == 4
+    assert x.tolist() == [2.5, 6.5, 9.5]
+    assert means[:, 0].tolist() == [2.5, 6.5, 9.5]
+
+    series.append(11, numpy.array([numpy.nan]))
+    x, means = series.series()
+    assert x[-1] == 10.0 and means[-1, 0] == 9.5
+
+
+def test_live_dashboard_updates_in_place_and_writes_frames(tmp_path: Path):
+    dashboard = LiveDashboard(tmp_path, "t_", bins=8, frames=True)
+    try:
+        for round in range(1, 41):
+            accuracy = {f"c{client}": {"accuracy": 0.5 + client / 100} for client in range(round % 4)}
+            dashboard.update({"round": round, "weight_norm": 1.0 / round, "accuracy": accuracy})
+            if round % 10 == 0:
+                dashboard.set_weights(numpy.linspace(-1, 1, 100) * round)
+                dashboard.render()
+        assert dashboard.accuracy.series()[0].size <= 8
+        assert len(dashboard.bands) == 2
+    finally:
+        dashboard.close()
+
+    assert (tmp_path / "t_live.png").stat().st_size > 0
+    assert len(list((tmp_path / "t_frames").glob("round_*.png"))) == 4
+    gif = write_gif(tmp_path / "t_frames", tmp_path / "t_live.gif")
+    assert gif is not None and gif.stat().st_size > 0
@@ -0,0 +1,41 @@
+import threading
+from models.metrics import Histogram, MetricsRegistry, PhaseTimer, TimedLock
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", buckets=(0.1, 1.0), labels=("route",))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/a")
+    assert registry.histogram("demo_seconds", "Again.") is histogram
+
+    lines = registry.render().splitlines()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_timed_lock_works_under_a_condition():
+    wait, hold = Histogram("wait", "Wait."), Histogram("hold", "Hold.")
+    lock = TimedLock(wait, hold)
+    condition = threading.Condition(lock)
+    ready = []
+
+    def producer():
+        with condition:
+            ready.append(True)
+            condition.notify_all()
+
+    with condition:
+        threading.Thread(target=producer).start()
+        assert condition.wait_for(lambda: ready, timeout=2)
+    assert wait.count() >= 2 and hold.count() >= 2 and not lock.locked()
+
+
+def test_phase_timer_accumulates():
+    timer = PhaseTimer()
+    for _ in range(2):
+        with timer.phase("train"):
+            pass
+    assert set(timer.timings) == {"train"} and timer.timings["train"] >= 0.0
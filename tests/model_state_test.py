@@ -0,0 +1,259 @@
+import numpy as np
+import pytest
+from server.model_state import GlobalModelState
+
+
+def _run_round(state, updates):
+    state.configure_training_round(updates.keys())
+    for client_id, delta in updates.items():
+        assert state.add_client_data_to_current_model(client_id, delta)
+    assert state.check_all_data_received()
+    state.process_and_update_to_global_model()
+    return state.model.get_model_weight()
+
+
+def test_streaming_matches_buffered_mean():
+    rng = np.random.default_rng(1)
+    updates = {client_id: rng.normal(size=4) for client_id in "ABCD"}
+    buffered = _run_round(GlobalModelState(feature_weight=3), updates)
+    streaming = _run_round(GlobalModelState(feature_weight=3, aggregation="streaming"), updates)
+    assert np.allclose(buffered, streaming)
+    assert np.allclose(streaming, np.mean(list(updates.values()), axis=0))
+
+
+@pytest.mark.parametrize("aggregation", ["buffered", "streaming"])
+def test_duplicate_submission_is_rejected(aggregation):
+    state = GlobalModelState(feature_weight=3, aggregation=aggregation)
+    state.configure_training_round(["A", "B"])
+    assert state.add_client_data_to_current_model("A", np.ones(4))
+    assert not state.add_client_data_to_current_model("A", np.full(4, 5.0))
+    state.add_client_data_to_current_model("B", np.ones(4))
+    state.process_and_update_to_global_model()
+    assert np.allclose(state.model.get_model_weight(), np.ones(4))
+
+
+def test_dropping_late_client_lets_round_finish():
+    state = GlobalModelState(feature_weight=3, aggregation="streaming")
+    state.configure_training_round(["A", "B"])
+    state.add_client_data_to_current_model("A", np.full(4, 2.0))
+    assert not state.check_all_data_received()
+    assert state.drop_participant("B")
+    assert state.check_all_data_received()
+    assert state.process_and_update_to_global_model() == 1
+    assert np.allclose(state.model.get_model_weight(), np.full(4, 2.0))
+    assert state.history[-1]["participants"] == ["A"]
+
+
+def test_wrong_shape_update_is_rejected():
+    state = GlobalModelState(feature_weight=3, aggregation="streaming")
+    state.configure_training_round(["A"])
+    with pytest.raises(ValueError):
+        state.add_client_data_to_current_model("A", np.ones(7))
+
+
+def test_concurrent_streaming_submissions_are_all_folded():
+    from concurrent.futures import ThreadPoolExecutor
+
+    state = GlobalModelState(feature_weight=99, aggregation="streaming", shards=4)
+    client_ids = [f"c{index}" for index in range(200)]
+    state.configure_training_round(client_ids)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        outcomes = list(executor.map(
+            lambda pair: state.submit_update(pair[1], 0, np.full(100, float(pair[0]))),
+            enumerate(client_ids)
+        ))
+    assert outcomes == ["accepted"] * len(client_ids)
+    assert state.finish_round_if_complete() == 1
+    assert np.allclose(state.model.get_model_weight(), np.mean(range(200)))
+
+
+def test_submit_update_validates_round_and_membership():
+    state = GlobalModelState(feature_weight=3)
+    assert state.submit_update("A", 0, np.ones(4)) == "round_not_configured"
+    state.configure_training_round(["A"])
+    assert state.submit_update("B", 0, np.ones(4)) == "not_expected"
+    assert state.submit_update("A", 1, np.ones(4)) == "wrong_round"
+    assert state.finish_round_if_complete() is None
+    assert state.submit_update("A", 0, np.ones(4)) == "accepted"
+
+
+@pytest.mark.parametrize("compression", ["none", "q8"])
+@pytest.mark.parametrize("aggregation", ["buffered", "streaming"])
+def test_quorum_close_with_mask_recovery(compression, aggregation):
+    from client.masking import MaskEngine
+    from models.compression import ErrorFeedbackCompressor
+    from client.client import prepare_correction, prepare_update
+
+    roster = ["A", "B", "C", "D"]
+    state = GlobalModelState(feature_weight=5, aggregation=aggregation, compression=compression)
+    for client_id in roster:
+        state.register(client_id)
+    _, _, spec = state.training_snapshot()
+    state.configure_training_round(roster, quorum=3)
+
+    rng = np.random.default_rng(4)
+    engines, sent = {}, []
+    for client_id in ["A", "C", "D"]:
+        engines[client_id] = MaskEngine(client_id, 6, ring=spec is not None)
+        engines[client_id].update_roster(roster, state.mask_nonce)
+        compressor = ErrorFeedbackCompressor(6, seed=0)
+        delta = rng.normal(scale=0.1, size=6)
+        assert state.submit_update(client_id, 0, prepare_update(delta, engines[client_id], compressor, spec)) == "accepted"
+        sent.append(delta - compressor.residual)
+
+    status = state.status_snapshot()
+    assert status["phase"] == "recovery"
+    assert state.submit_update("B", 0, np.zeros(6)) == "round_closed"
+    assert state.finish_round_if_complete() is None
+
+    for client_id in ["A", "C", "D"]:
+        correction = prepare_correction(engines[client_id], {"B"}, spec)
+        assert state.submit_recovery(client_id, 0, correction) == "accepted"
+    assert state.status_snapshot()["phase"] == "ready"
+    assert state.finish_round_if_complete() == 1
+    assert np.allclose(state.model.get_model_weight(), np.mean(sent, axis=0))
+    assert state.history[-1]["dropped"] == ["B"]
+
+
+def test_deadline_closes_round_with_reporters():
+    state = GlobalModelState(feature_weight=3)
+    state.configure_training_round(["A", "B", "C"], deadline=0.05)
+    state.add_client_data_to_current_model("A", np.ones(4))
+    state.add_client_data_to_current_model("B", np.ones(4))
+    state.wait_for_change(state.round_epoch, timeout=2, watch="round_epoch")
+    # C was a participant, so the reporters' masks still hold its pair terms.
+    assert state.status_snapshot()["phase"] == "recovery"
+    for client_id in "AB":
+        assert state.submit_recovery(client_id, 0, np.zeros(4)) == "accepted"
+    assert state.status_snapshot()["phase"] == "ready"
+    assert state.finish_round_if_complete() == 1
+
+
+def test_schedule_finalizes_on_quorum_and_opens_next_round():
+    state = GlobalModelState(feature_weight=3)
+    for client_id in "AB":
+        state.register(client_id)
+    schedule = state.schedule_rounds(3, participants=["A", "B"])
+    assert schedule.until == 3
+    for training_round in range(3):
+        status = state.status_snapshot()
+        assert (status["round"], status["phase"], status["expected"]) == (training_round, "collecting", ["A", "B"])
+        assert state.submit_update("A", training_round, np.ones(4), metric={"accuracy": 0.5}) == "accepted"
+        assert state.submit_update("B", training_round, np.ones(4)) == "accepted"
+    status = state.status_snapshot()
+    assert (status["round"], status["phase"], status["schedule"]) == (3, "idle", None)
+    assert np.allclose(state.model.get_model_weight(), 3.0)
+    assert [entry["accuracy"] for entry in state.history] == [{"A": {"accuracy": 0.5}}] * 3
+
+
+def test_schedule_retries_a_round_short_of_survivors():
+    state = GlobalModelState(feature_weight=3)
+    for client_id in "AB":
+        state.register(client_id)
+    state.schedule_rounds(1, deadline=0.05)
+    assert state.submit_update("A", 0, np.ones(4)) == "accepted"
+    epoch = state.round_epoch
+    while state.status_snapshot()["schedule"]["retries"] == 0:
+        epoch = state.wait_for_change(epoch, timeout=2, watch="round_epoch")
+    status = state.status_snapshot()
+    assert (status["round"], status["phase"], status["received"]) == (0, "collecting", [])
+    assert state.cancel_schedule()
+    assert not state.cancel_schedule()
+
+
+def test_schedule_stops_after_max_retries():
+    state = GlobalModelState(feature_weight=3)
+    for client_id in "AB":
+        state.register(client_id)
+    state.schedule_rounds(1, deadline=0.05, max_retries=1)
+    epoch = state.round_epoch
+    while state.status_snapshot()["schedule"] is not None:
+        epoch = state.wait_for_change(epoch, timeout=2, watch="round_epoch")
+    status = state.status_snapshot()
+    assert (status["round"], status["phase"]) == (0, "idle")
+    assert status["schedule_error"].startswith("round 0 failed 2 times")
+
+
+def test_quorum_never_closes_on_a_single_reporter():
+    state = GlobalModelState(feature_weight=3)
+    with pytest.raises(ValueError):
+        state.configure_training_round(["A", "B", "C"], quorum=1)
+    with pytest.raises(ValueError):
+        state.schedule_rounds(1, participants=["A", "B"], quorum=1)
+    state.configure_training_round(["A"], quorum=1)
+    state.configure_training_round(["A", "B", "C"])
+    # Even a quorum set behind validation's back waits for a second reporter.
+    state.quorum = 1
+    state.add_client_data_to_current_model("A", np.ones(4))
+    assert state.status_snapshot()["phase"] == "collecting"
+
+
+def test_abort_round_keeps_model():
+    state = GlobalModelState(feature_weight=3)
+    for client_id in "ABC":
+        state.register(client_id)
+    state.configure_training_round(["A", "B", "C"], quorum=2)
+    state.add_client_data_to_current_model("A", np.ones(4))
+    assert state.status_snapshot()["phase"] == "collecting"
+    state.add_client_data_to_current_model("B", np.ones(4))
+    assert state.status_snapshot()["phase"] == "recovery"
+    state.abort_round()
+    assert state.status_snapshot()["phase"] == "idle"
+    assert state.round == 0 and np.array_equal(state.model.get_model_weight(), np.zeros(4))
+
+
+def test_async_buffer_applies_staleness_weighted_mean():
+    state = GlobalModelState(feature_weight=3, scheduling="async", buffer_size=2, staleness_exponent=1.0)
+    for client_id in "ABC":
+        state.register(client_id)
+
+    assert state.submit_update("A", 0, np.ones(4)) == "accepted"
+    assert state.round == 0
+    assert state.submit_update("A", 0, np.ones(4)) == "duplicate"
+    assert state.submit_update("B", 0, np.full(4, 3.0)) == "accepted"
+    assert state.round == 1
+    assert np.allclose(state.model.get_model_weight(), np.full(4, 2.0))
+
+    # C trained on version 0 while version 1 was published: weight 1 / (1 + 1).
+    assert state.submit_update("C", 0, np.full(4, 4.0)) == "accepted"
+    assert state.submit_update("A", 1, np.zeros(4)) == "accepted"
+    assert np.allclose(state.model.get_model_weight(), np.full(4, 3.0))
+    assert state.history[-1]["staleness"] == [1, 0]
+    assert state.submit_update("Z", 2, np.zeros(4)) == "not_expected"
+
+
+def test_async_rejects_replays_across_buffer_flushes():
+    state = GlobalModelState(feature_weight=3, scheduling="async", buffer_size=2, max_staleness=4)
+    for client_id in "AB":
+        state.register(client_id)
+    assert state.submit_update("A", 0, np.ones(4)) == "accepted"
+    assert state.submit_update("B", 0, np.ones(4)) == "accepted"
+    assert state.round == 1
+    # The buffer was flushed, but A already sent its update for version 0.
+    assert state.submit_update("A", 0, np.ones(4)) == "duplicate"
+    assert state.submit_update("A", 1, np.ones(4)) == "accepted"
+    assert state.submit_update("Z", None, np.ones(4)) == "not_expected"
+    assert len(state.async_contributors) == 1
+
+
+def test_async_rejects_round_configuration_and_stale_updates():
+    state = GlobalModelState(feature_weight=3, scheduling="async", buffer_size=1, max_staleness=1)
+    state.register("A")
+    with pytest.raises(ValueError):
+        state.configure_training_round(["A"])
+    for version in range(3):
+        state.submit_update("A", version, np.zeros(4))
+    assert state.submit_update("A", 0, np.zeros(4)) == "stale"
+
+
+def test_history_store_seals_chunks_and_answers_round_ranges():
+    from server.history import HistoryStore
+
+    store = HistoryStore(chunk_rounds=4)
+    for round in range(1, 12):
+        store.append({"round": round, "weight_norm": float(round)})
+    assert len(store) == 11 and store[-1]["round"] == 11 and store[2]["round"] == 3
+    assert [entry["round"] for entry in store.entries(3, 10)] == list(range(3, 10))
+    assert [entry["round"] for entry in store.entries(9)] == [9, 10, 11]
+    restored = HistoryStore.from_ndjson(b"".join(store.ndjson()), chunk_rounds=4)
+    assert list(restored) == list(store)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from models.network import decode_frame, encode_frame
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32", "float16"])
+def test_frame_round_trip(dtype):
+    vector = np.linspace(-1, 1, 13)
+    frame = decode_frame(
+        encode_frame(vector, round=4, client_id="A", dtype=dtype, meta={"metrics": {"accuracy": 0.5}})
+    )
+    assert frame.round == 4
+    assert frame.client_id == "A"
+    assert frame.dtype == dtype
+    assert frame.meta == {"metrics": {"accuracy": 0.5}}
+    assert frame.vector.dtype == np.float64
+    assert np.allclose(frame.vector, vector, atol=1e-3)
+
+
+def test_float64_frame_is_exact():
+    vector = np.random.default_rng(0).normal(size=100)
+    assert np.array_equal(decode_frame(encode_frame(vector, round=0)).vector, vector)
+
+
+def test_truncated_frame_is_rejected():
+    payload = encode_frame(np.ones(8), round=1, client_id="A")
+    with pytest.raises(ValueError):
+        decode_frame(payload[:-1])
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from server.model_state import GlobalModelState
+from server.optimizers import ServerOptimizer
+
+
+def _reference_steps(name, gradients, learning_rate, momentum=0.9, beta2=0.99, tau=1e-3):
+    first, second, steps = np.zeros_like(gradients[0]), np.zeros_like(gradients[0]), []
+    for gradient in gradients:
+        if name == "fedavgm":
+            first = momentum * first + gradient
+            steps.append(learning_rate * first)
+            continue
+        first = momentum * first + (1 - momentum) * gradient
+        if name == "fedadam":
+            second = beta2 * second + (1 - beta2) * gradient ** 2
+        else:
+            second = second - (1 - beta2) * gradient ** 2 * np.sign(second - gradient ** 2)
+        steps.append(learning_rate * first / (np.sqrt(second) + tau))
+    return steps
+
+
+@pytest.mark.parametrize("name", ["fedavgm", "fedadam", "fedyogi"])
+def test_optimizer_steps_match_reference(name):
+    gradients = list(np.random.default_rng(0).normal(size=(5, 6)))
+    optimizer = ServerOptimizer(name, 6, learning_rate=0.5)
+    buffers = [array.ctypes.data for array in (optimizer.slots, optimizer._step)]
+    for gradient, expected in zip(gradients, _reference_steps(name, gradients, 0.5)):
+        assert np.allclose(optimizer.step(gradient), expected)
+    assert [array.ctypes.data for array in (optimizer.slots, optimizer._step)] == buffers
+    assert optimizer.steps == 5
+
+
+def test_fedavg_with_server_lr_scales_the_mean():
+    state = GlobalModelState(feature_weight=3, optimizer="fedavg", server_lr=0.5)
+    state.configure_training_round(["A", "B"])
+    state.add_client_data_to_current_model("A", np.ones(4))
+    state.add_client_data_to_current_model("B", np.full(4, 3.0))
+    state.process_and_update_to_global_model()
+    assert np.allclose(state.model.get_model_weight(), 1.0)
+    with pytest.raises(ValueError):
+        GlobalModelState(optimizer="sgd")
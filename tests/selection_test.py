@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from client.masking import MaskEngine, build_mask
+from server.model_state import GlobalModelState
+from server.selection import make_selection
+
+
+def test_uniform_selection_is_seeded_and_overprovisions():
+    selection = make_selection("uniform", fraction=0.25, overprovision=0.5, seed=7)
+    candidates = [f"c{index:02d}" for index in range(20)]
+    chosen, quorum = selection.select(candidates, {}, np.random.default_rng(7))
+    assert (len(chosen), quorum) == (8, 5)
+    assert chosen == selection.select(candidates, {}, np.random.default_rng(7))[0]
+    assert make_selection("all") is None
+    with pytest.raises(ValueError):
+        make_selection("uniform", fraction=0.0)
+    # One participant would have no peers to mask against.
+    with pytest.raises(ValueError):
+        make_selection("uniform", fraction=0.1, min_participants=1)
+
+
+def test_sampled_round_needs_two_candidates():
+    state = GlobalModelState(feature_weight=3)
+    state.register("A")
+    selection = make_selection("uniform", fraction=0.5)
+    with pytest.raises(ValueError):
+        state.configure_training_round(["A"], selection=selection)
+    with pytest.raises(ValueError):
+        state.schedule_rounds(1, selection=selection)
+    assert state.status_snapshot()["phase"] == "idle"
+
+
+def test_latency_selection_times_new_clients_then_prefers_fast_ones():
+    latency = {"A": 0.1, "B": 5.0, "C": 0.2, "D": 3.0}
+    selection = make_selection("latency", fraction=0.4)
+    rng = np.random.default_rng(0)
+    assert selection.select(list("ABCDE"), latency, rng) == (["A", "E"], None)
+    assert selection.select(list("ABCD"), latency, rng) == (["A", "C"], None)
+    within = make_selection("latency", fraction=0.25, target_seconds=4.0)
+    picks = {client_id for _ in range(50) for client_id in within.select(list("ABCD"), latency, rng)[0]}
+    assert picks == {"A", "C", "D"}
+
+
+def test_selected_round_masks_only_participants():
+    state = GlobalModelState(feature_weight=3)
+    roster = [f"c{index}" for index in range(6)]
+    for client_id in roster:
+        state.register(client_id)
+    state.schedule_rounds(1, selection=make_selection("uniform", fraction=0.5, seed=1))
+    status = state.status_snapshot()
+    assert len(status["expected"]) == 3 and status["participants"] == status["expected"]
+
+    deltas = []
+    for index, client_id in enumerate(status["expected"]):
+        engine = MaskEngine(client_id, 4)
+        engine.update_roster(roster, status["mask_nonce"])
+        # Drops every peer left out of the round with one rebuild.
+        engine.update_roster(status["participants"], status["mask_nonce"])
+        deltas.append(np.full(4, float(index)))
+        assert state.submit_update(client_id, 0, deltas[-1] + engine.mask()) == "accepted"
+    assert state.round == 1 and state.status_snapshot()["schedule"] is None
+    assert np.allclose(state.model.get_model_weight(), np.mean(deltas, axis=0))
+    assert sorted(state.latency_snapshot()) == status["expected"]
+
+
+def test_mask_rebuild_matches_fresh_mask():
+    engine = MaskEngine("B", 5, ring=True)
+    engine.update_roster(["A", "B", "C"], "r0")
+    engine.update_roster(["B", "D", "E", "F"], "r0")
+    assert engine.peers == {"D", "E", "F"}
+    assert np.allclose(engine.mask(), build_mask("B", ["D", "E", "F"], 5, "r0"))
+    fresh = MaskEngine("B", 5, ring=True)
+    fresh.update_roster(["D", "E", "F"], "r0")
+    assert np.array_equal(engine.ring_mask(), fresh.ring_mask())
+
+
+def test_correction_does_not_unmask_a_later_round():
+    state = GlobalModelState(feature_weight=3)
+    for client_id in "ABC":
+        state.register(client_id)
+    engines = {client_id: MaskEngine(client_id, 4) for client_id in "AB"}
+    state.configure_training_round(list("ABC"), quorum=2)
+    for client_id, engine in engines.items():
+        engine.update_roster(state.status_snapshot()["participants"], state.status_snapshot()["mask_nonce"])
+        assert state.submit_update(client_id, 0, np.ones(4) + engine.mask()) == "accepted"
+    # C was cut off: A reveals its round-0 pair term with C.
+    corrections = {client_id: engine.correction({"C"}) for client_id, engine in engines.items()}
+    for client_id, correction in corrections.items():
+        assert state.submit_recovery(client_id, 0, correction) == "accepted"
+    assert state.finish_round_if_complete() == 1
+
+    # A round of only A and C: A's whole mask is the pair term with C.
+    delta = np.array([0.123, -0.456, 0.789, 0.5])
+    state.configure_training_round(["A", "C"])
+    round_zero_nonce = engines["A"].nonce
+    engines["A"].update_roster(["A", "C"], state.status_snapshot()["mask_nonce"])
+    masked = delta + engines["A"].mask()
+    assert not np.allclose(masked - corrections["A"], delta)
+    # The same subtraction unmasks A when the round-0 stream is reused.
+    engines["A"].update_roster(["A", "C"], round_zero_nonce)
+    assert np.allclose(delta + engines["A"].mask() - corrections["A"], delta)
@@ -0,0 +1,272 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from server import server as server_module
+from server.model_state import GlobalModelState
+from models.network import WIRE_MIMETYPE, WIRE_DTYPE_HEADER, decode_frame, encode_frame
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(server_module, "model_state", GlobalModelState(feature_weight=3))
+    return server_module.server.test_client()
+
+
+def _configure(app, participants):
+    for client_id in participants:
+        app.post("/register", json={"client_id": client_id})
+    app.post("/configure-training-round", json={"participants": participants})
+
+
+def test_binary_model_download(app):
+    response = app.get("/model", headers={"Accept": WIRE_MIMETYPE, WIRE_DTYPE_HEADER: "float32"})
+    assert response.mimetype == WIRE_MIMETYPE
+    frame = decode_frame(response.data)
+    assert frame.dtype == "float32"
+    assert frame.meta["feature_weight"] == 3
+    assert np.array_equal(frame.vector, np.zeros(4))
+
+
+def test_json_model_download_is_default(app):
+    assert app.get("/model").json["feature_weight"] == 3
+
+
+def test_binary_and_json_submissions_aggregate(app):
+    _configure(app, ["A", "B"])
+    binary = app.post(
+        "/submit-update",
+        data=encode_frame(np.full(4, 1.0), round=0, client_id="A", meta={"metrics": {"accuracy": 0.9}}),
+        content_type=WIRE_MIMETYPE
+    )
+    assert binary.json["OK"] is True
+    app.post("/submit-update", json={"client_id": "B", "round": 0, "masked_update": [3.0] * 4})
+
+    finished = app.post("/finish-round", headers={"Accept": WIRE_MIMETYPE})
+    frame = decode_frame(finished.data)
+    assert frame.round == 1
+    assert np.array_equal(frame.vector, np.full(4, 2.0))
+
+
+def test_malformed_binary_submission_is_rejected(app):
+    _configure(app, ["A"])
+    response = app.post("/submit-update", data=b"nonsense", content_type=WIRE_MIMETYPE)
+    assert response.status_code == 400
+
+
+def test_duplicate_submission_returns_conflict(app):
+    _configure(app, ["A", "B"])
+    body = {"client_id": "A", "round": 0, "masked_update": [1.0] * 4}
+    assert app.post("/submit-update", json=body).status_code == 200
+    assert app.post("/submit-update", json=body).json["error"] == "duplicate"
+
+
+def test_status_long_poll_wakes_on_round_configuration(app):
+    import threading
+
+    epoch = app.get("/status").json["epoch"]
+    timer = threading.Timer(0.2, server_module.model_state.configure_training_round, args=(["A"],))
+    timer.start()
+    status = app.get(f"/status?since={epoch}&timeout=5").json
+    timer.join()
+    assert status["epoch"] > epoch
+    assert status["expected"] == ["A"]
+
+
+def test_schedule_rounds_route(app):
+    for client_id in "ABC":
+        app.post("/register", json={"client_id": client_id})
+    response = app.post("/schedule-rounds", json={"rounds": 2, "quorum": 2})
+    assert response.json["schedule"]["until"] == 2
+    assert app.get("/status").json["expected"] == ["A", "B", "C"]
+    app.post("/submit-update", json={"client_id": "B", "round": 0, "masked_update": [1.0] * 4, "metrics": {"accuracy": 0.7}})
+    app.post("/submit-update", json={"client_id": "C", "round": 0, "masked_update": [1.0] * 4})
+    assert app.get("/status").json["phase"] == "recovery"
+    for client_id in "BC":
+        app.post("/submit-recovery", json={"client_id": client_id, "round": 0, "correction": [0.0] * 4})
+    assert app.get("/status").json["round"] == 1
+    assert app.get("/export").json["history"][0]["accuracy"] == {"B": {"accuracy": 0.7}}
+    assert app.delete("/schedule-rounds").json["cancelled"] is True
+    assert app.get("/schedule-rounds").json["schedule"] is None
+    assert app.post("/schedule-rounds", json={"rounds": 0}).json["error"] == "invalid_schedule"
+
+
+def test_status_long_poll_times_out_unchanged(app):
+    epoch = app.get("/status").json["epoch"]
+    assert app.get(f"/status?since={epoch}&timeout=0.05").json["epoch"] == epoch
+
+
+def test_compressed_binary_submission(monkeypatch):
+    monkeypatch.setattr(server_module, "model_state", GlobalModelState(feature_weight=3, compression="q8"))
+    app = server_module.server.test_client()
+    compression = app.get("/model").json["compression"]
+    assert compression["scheme"] == "q8" and compression["bits"] == 16
+
+    _configure(app, ["A"])
+    response = app.post(
+        "/submit-update",
+        data=encode_frame(np.array([1, 2, 65535, 0], dtype=np.uint16), round=0, client_id="A", dtype="uint16"),
+        content_type=WIRE_MIMETYPE
+    )
+    assert response.json["OK"] is True
+    app.post("/finish-round")
+    assert np.allclose(server_module.model_state.model.get_model_weight(), np.array([1, 2, -1, 0]) * compression["scale"])
+
+
+def test_export_formats_and_history_ranges(monkeypatch):
+    import gzip
+    import json
+    from server.history import HistoryStore
+
+    state = GlobalModelState(feature_weight=3)
+    state.history = HistoryStore(chunk_rounds=4)
+    monkeypatch.setattr(server_module, "model_state", state)
+    app = server_module.server.test_client()
+    for _ in range(10):
+        state.configure_training_round(["A"])
+        state.add_client_data_to_current_model("A", np.ones(4))
+        state.process_and_update_to_global_model()
+
+    pretty = app.get("/export").json
+    compact = json.loads(app.get("/export?pretty=0").data)
+    assert list(compact) == list(pretty) == ["round", "feature_weight", "training_weights", "history", "export_time"]
+    assert compact["history"] == pretty["history"] and len(compact["history"]) == 10
+
+    lines = gzip.decompress(app.get("/export?format=ndjson&compress=gzip").data).splitlines()
+    assert json.loads(lines[0])["round"] == 10
+    assert [json.loads(line) for line in lines[1:]] == pretty["history"]
+
+    ranged = app.get("/history?start=3&stop=9").data.splitlines()
+    assert [json.loads(line)["round"] for line in ranged] == list(range(3, 9))
+    assert app.get("/export?format=xml").status_code == 400
+
+
+def test_metrics_endpoint_reports_routes_and_client_phases(app):
+    _configure(app, ["A"])
+    app.post("/submit-update", json={
+        "client_id": "A",
+        "round": 0,
+        "masked_update": [1.0] * 4,
+        "metrics": {"accuracy": 0.5, "timings": {"train": 0.2, "bogus": 1.0}}
+    })
+    app.post("/finish-round")
+
+    response = app.get("/metrics")
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'skynet_request_seconds_count{route="/submit-update",status="200"}' in body
+    assert 'skynet_submission_bytes_count{route="/submit-update"}' in body
+    assert 'skynet_client_phase_seconds_bucket{phase="train",le="0.25"}' in body
+    assert 'phase="bogus"' not in body
+    assert "skynet_state_lock_wait_seconds_count" in body
+    assert 'skynet_aggregation_seconds_count{mode="buffered"}' in body
+
+
+def test_named_models_are_isolated_and_limited(monkeypatch, tmp_path):
+    from server.tenants import TenantLimits, TenantRegistry
+
+    monkeypatch.setattr(server_module, "model_state", GlobalModelState(feature_weight=3))
+    monkeypatch.setattr(
+        server_module,
+        "tenants",
+        TenantRegistry(TenantLimits(max_models=2, max_feature_weight=8, max_clients=2, max_inflight=1), checkpoint_dir=str(tmp_path))
+    )
+    app = server_module.server.test_client()
+
+    assert app.post("/models", json={"model_id": "small", "feature_weight": 1}).status_code == 201
+    assert app.post("/models", json={"model_id": "small"}).json["error"] == "model_exists"
+    assert app.post("/models", json={"model_id": "huge", "feature_weight": 64}).json["error"] == "model_limit"
+    assert app.post("/models", json={"model_id": "bad/id"}).status_code == 400
+    assert app.post("/models", json={"model_id": "wide", "feature_weight": 5}).status_code == 201
+    assert app.post("/models", json={"model_id": "third"}).json["error"] == "model_limit"
+    assert app.get("/models/nope/model").status_code == 404
+
+    for model_id, value in (("small", 1.0), ("wide", 5.0)):
+        base = f"/models/{model_id}"
+        for client_id in "AB":
+            app.post(f"{base}/register", json={"client_id": client_id})
+        assert app.post(f"{base}/register", json={"client_id": "C"}).json["error"] == "client_limit"
+        app.post(f"{base}/configure-training-round", json={"participants": ["A", "B"]})
+        dim = app.get(f"{base}/model").json["feature_weight"] + 1
+        for client_id in "AB":
+            app.post(f"{base}/submit-update", json={"client_id": client_id, "round": 0, "masked_update": [value] * dim})
+        assert app.post(f"{base}/finish-round").json["weight"] == [value] * dim
+
+    assert app.get("/model").json["training_round"] == 0
+    assert app.get("/models/default/roster").json["clients"] == []
+    listed = {model["model_id"]: model["round"] for model in app.get("/models").json["models"]}
+    assert listed == {"default": 0, "small": 1, "wide": 1}
+
+    tenant = server_module.tenants.get("small")
+    assert tenant.try_enter()
+    assert app.get("/models/small/status").status_code == 429
+    tenant.leave()
+    assert app.get("/models/small/status").json["round"] == 1
+
+    assert app.delete("/models/small").json["OK"] is True
+    assert app.get("/models/small/model").status_code == 404
+    assert not (tmp_path / "models" / "small").exists()
+    assert (tmp_path / "models" / "wide" / "tenant.json").exists()
+
+
+def test_model_and_roster_revalidate_with_etags(app):
+    _configure(app, ["A"])
+    model = app.get("/model")
+    assert app.get("/model", headers={"If-None-Match": model.headers["ETag"]}).status_code == 304
+    binary = app.get("/model", headers={"Accept": WIRE_MIMETYPE, WIRE_DTYPE_HEADER: "float32"})
+    assert binary.headers["ETag"] != model.headers["ETag"]
+    assert decode_frame(binary.data).meta["model_version"] == model.json["model_version"]
+
+    version = model.json["model_version"]
+    assert app.get("/model/delta", query_string={"since": version}).status_code == 304
+    app.post("/submit-update", json={"client_id": "A", "round": 0, "masked_update": [0.0, 2.0, 0.0, 0.0]})
+    app.post("/finish-round")
+    assert app.get("/model", headers={"If-None-Match": model.headers["ETag"]}).status_code == 200
+    sparse = app.get("/model/delta", query_string={"since": version}).json
+    assert (sparse["training_round"], sparse["indices"], sparse["delta"]) == (1, [1], [2.0])
+    assert app.get("/model/delta", query_string={"since": version, "encoding": "dense"}).json["delta"] == [0.0, 2.0, 0.0, 0.0]
+    assert app.get("/model/delta", query_string={"since": "0-0"}).json["error"] == "version_expired"
+
+    roster = app.get("/roster")
+    assert app.get("/roster", headers={"If-None-Match": roster.headers["ETag"]}).status_code == 304
+    app.post("/register", json={"client_id": "B"})
+    assert app.get("/roster", headers={"If-None-Match": roster.headers["ETag"]}).json["clients"] == ["A", "B"]
+
+
+class _RequestsAdapter:
+    # Just enough of requests.Session for ModelCache, served by the Flask test client.
+    def __init__(self, app):
+        self.app = app
+        self.paths = []
+
+    def get(self, url, params=None, headers=None):
+        self.paths.append(url)
+        response = self.app.get(url, query_string=params, headers=headers)
+        return SimpleNamespace(
+            status_code=response.status_code,
+            headers=response.headers,
+            content=response.data,
+            json=response.get_json
+        )
+
+
+@pytest.mark.parametrize("wire", ["json", "float64"])
+def test_model_cache_follows_rounds_with_deltas(monkeypatch, wire):
+    from client.client import ModelCache
+    from server import model_state as model_state_module
+
+    monkeypatch.setattr(model_state_module, "MODEL_VERSIONS_KEPT", 2)
+    state = GlobalModelState(feature_weight=3)
+    monkeypatch.setattr(server_module, "model_state", state)
+    session = _RequestsAdapter(server_module.server.test_client())
+    cache = ModelCache("", wire, session=session)
+
+    assert cache.fetch()["training_round"] == 0
+    assert cache.fetch()["training_round"] == 0
+    for skipped in (0, 0, 2):
+        for _ in range(skipped + 1):
+            state.configure_training_round(["A"])
+            state.add_client_data_to_current_model("A", np.arange(4.0))
+            state.process_and_update_to_global_model()
+        assert np.array_equal(cache.fetch()["training_weights"], state.model.get_model_weight())
+    # Two rounds behind is past the versions kept, so the last pull falls back to /model.
+    assert session.paths == ["/model"] + ["/model/delta"] * 4 + ["/model"]
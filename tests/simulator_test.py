@@ -0,0 +1,17 @@
+import numpy as np
+from analytics.charts import load_columns
+from client.simulator import export_document, simulate
+
+
+def test_masked_simulation_matches_unmasked_and_exports_history():
+    masked = simulate(clients=6, samples=80, n_features=4, rounds=3, aggregation="buffered")
+    plain = simulate(clients=6, samples=80, n_features=4, rounds=3, masking=False)
+
+    assert masked.round == plain.round == 3
+    assert np.allclose(masked.model.get_model_weight(), plain.model.get_model_weight())
+
+    document = export_document(masked)
+    assert document["feature_weight"] == 4 and len(document["training_weights"]) == 5
+    columns = load_columns(document)
+    assert columns.rounds.tolist() == [1, 2, 3]
+    assert columns.accuracy.shape == (3, 6) and not np.isnan(columns.accuracy).any()
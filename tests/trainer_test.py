@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from models.models import Logistic
+from models.trainer import BatchedTrainer, LocalTrainer
+from client.data import generate_dataset_local
+
+
+@pytest.fixture
+def dataset():
+    X, y = generate_dataset_local(500, 6, seed=3)
+    return X, y.astype(np.float64)
+
+
+def test_full_batch_matches_logistic_update(dataset):
+    X, y = dataset
+    reference = Logistic(6)
+    expected = reference.update_local(X, y, epochs=3, learning_rate=0.5)
+
+    trainer = LocalTrainer(Logistic(6), X, y)
+    assert np.allclose(trainer.update_local(epochs=3, learning_rate=0.5), expected)
+    assert np.allclose(trainer.predict_probability(), reference.predict_probability(X))
+    assert trainer.accuracy() == np.mean(reference.predict(X) == y)
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_mini_batch_sgd_reduces_loss(dataset, dtype):
+    X, y = dataset
+    model = Logistic(6)
+    trainer = LocalTrainer(model, X, y, batch_size=64, dtype=dtype, seed=0)
+
+    def loss():
+        p = np.clip(model.predict_probability(X), 1e-9, 1 - 1e-9)
+        return -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))
+
+    before = loss()
+    delta = trainer.update_local(epochs=2, learning_rate=0.5)
+    assert delta.dtype == np.float64
+    assert loss() < before
+
+
+def test_shuffled_batches_follow_a_fresh_row_permutation_each_epoch(dataset):
+    X, y = dataset[0][:10], dataset[1][:10]
+    trainer = LocalTrainer(Logistic(6), X, y, batch_size=4, seed=3)
+    rng, weight = np.random.default_rng(3), np.zeros(7)
+    for _ in range(2):
+        order = rng.permutation(10)
+        for start in range(0, 10, 4):
+            rows = order[start: start + 4]
+            residual = 1.0 / (1.0 + np.exp(-(X[rows] @ weight[:-1] + weight[-1]))) - y[rows]
+            weight[:-1] -= 0.5 * residual @ X[rows] / len(rows)
+            weight[-1] -= 0.5 * residual.mean()
+    assert np.allclose(trainer.update_local(epochs=2, learning_rate=0.5), weight)
+
+
+def test_trainer_rejects_mismatched_model(dataset):
+    X, y = dataset
+    with pytest.raises(ValueError):
+        LocalTrainer(Logistic(4), X, y)
+
+
+def test_batched_trainer_matches_logistic_update_per_client():
+    stacked = [generate_dataset_local(200, 6, seed=seed) for seed in range(4)]
+    X = np.stack([features for features, _ in stacked])
+    y = np.stack([targets for _, targets in stacked]).astype(np.float64)
+    weight = np.random.default_rng(0).normal(size=7)
+
+    deltas, local = BatchedTrainer(X, y).update_local(weight, epochs=3, learning_rate=0.5)
+    accuracy = BatchedTrainer(X, y).accuracy(local)
+    for index in range(4):
+        reference = Logistic(6)
+        reference.set_model_weight(weight)
+        assert np.allclose(deltas[index], reference.update_local(X[index], y[index], epochs=3, learning_rate=0.5))
+        assert accuracy[index] == np.mean(reference.predict(X[index]) == y[index])